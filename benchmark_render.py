@@ -0,0 +1,279 @@
+"""
+benchmark_render.py
+
+Render performance benchmark driven by synthetic lavfi clips.
+
+Generates synthetic intros, outros, theme music and montages with ffmpeg's
+lavfi sources (no NAS or real footage needed), then times
+generate_title_overlay, render_montage_clip, generate_thumbnail and the
+one-decode multi-output render across encoding profiles and orientations.
+Each run is appended to a JSON history and compared with previous runs so
+regressions from filter or preset changes show up immediately.
+
+Usage:
+    python benchmark_render.py
+    python benchmark_render.py --profiles draft final --montage-seconds 60 --repeat 3
+    python benchmark_render.py --fail-on-regression
+
+Author: Llama Chile Shop
+"""
+
+import sys
+import json
+import time
+import socket
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+from pathlib import Path
+from datetime import datetime
+
+from modules.config import FONT_PATH, ENCODING_PROFILES, BENCHMARK_HISTORY_PATH
+from modules.encoding_profiles import NATIVE_WIDE, NATIVE_VERTICAL
+from modules.ffmpeg_runner import run_ffmpeg
+from modules.title_utils import generate_title_overlay, format_overlay_text
+from modules.render_engine import render_montage_clip, render_montage_multi_output, default_output_specs
+from modules.thumbnail_utils import generate_thumbnail
+
+# A case is flagged when it is this much slower than the median of previous runs
+REGRESSION_THRESHOLD = 0.20
+# Number of previous runs the median is taken over
+HISTORY_WINDOW = 5
+
+
+def generate_synthetic_clip(output_path: Path, seconds: float, size: tuple[int, int], fps: int, tone: int):
+    """
+    Generates a test-pattern clip with a sine tone using lavfi sources.
+    """
+    width, height = size
+    run_ffmpeg([
+        "ffmpeg", "-y",
+        "-f", "lavfi", "-i", f"testsrc2=size={width}x{height}:rate={fps}:duration={seconds}",
+        "-f", "lavfi", "-i", f"sine=frequency={tone}:sample_rate=48000:duration={seconds}",
+        "-c:v", "libx264", "-preset", "ultrafast", "-pix_fmt", "yuv420p",
+        "-c:a", "aac", "-shortest",
+        str(output_path),
+    ], stage="bench-generate", show_progress=False)
+
+
+def generate_synthetic_music(output_path: Path, seconds: float):
+    run_ffmpeg([
+        "ffmpeg", "-y",
+        "-f", "lavfi", "-i", f"sine=frequency=220:beep_factor=4:sample_rate=44100:duration={seconds}",
+        "-c:a", "libmp3lame", "-b:a", "192k",
+        str(output_path),
+    ], stage="bench-generate", show_progress=False)
+
+
+def build_fixtures(work_dir: Path, montage_seconds: float, intro_seconds: float, scale: float) -> dict:
+    """
+    Creates intro/outro/montage fixtures for both orientations plus a music bed.
+
+    Args:
+        scale (float): Resolution multiplier on the native 1080p geometry (e.g. 0.5 for 540p).
+    """
+    fixtures = {"music": work_dir / "music.mp3"}
+    generate_synthetic_music(fixtures["music"], montage_seconds + 2 * intro_seconds)
+
+    for orientation, native in (("wide", NATIVE_WIDE), ("vertical", NATIVE_VERTICAL)):
+        size = (int(native[0] * scale) // 2 * 2, int(native[1] * scale) // 2 * 2)
+        for label, seconds, fps, tone in (
+            ("intro", intro_seconds, 60, 660),
+            ("outro", intro_seconds, 60, 550),
+            ("montage", montage_seconds, 60, 440),
+        ):
+            path = work_dir / f"{label}-{orientation}.mp4"
+            print(f"🧪 Generating {path.name} ({size[0]}x{size[1]}, {seconds}s)")
+            generate_synthetic_clip(path, seconds, size, fps, tone)
+            fixtures[f"{label}_{orientation}"] = path
+    return fixtures
+
+
+def _timed(fn, **kwargs) -> float:
+    started = time.perf_counter()
+    fn(**kwargs)
+    return time.perf_counter() - started
+
+
+def run_cases(fixtures: dict, work_dir: Path, profiles: list[str], font_path: Path,
+              montage_seconds: float, repeat: int) -> list[dict]:
+    """
+    Times each stage for every profile × orientation and returns one result per case.
+    """
+    overlay_text = format_overlay_text("Fortnite Highlights", "with Gramps", "July 25, 2025")
+    results = []
+
+    for profile in profiles:
+        for orientation in ("wide", "vertical"):
+            is_vertical = orientation == "vertical"
+            intro_path = work_dir / f"title-{profile}-{orientation}.mp4"
+            output_path = work_dir / f"render-{profile}-{orientation}.mp4"
+            thumb_path = work_dir / f"thumb-{profile}-{orientation}.jpg"
+
+            stages = {
+                "title_overlay": lambda: _timed(
+                    generate_title_overlay,
+                    intro_path=fixtures[f"intro_{orientation}"],
+                    overlay_text=overlay_text,
+                    output_path=intro_path,
+                    font_path=font_path,
+                    is_vertical=is_vertical,
+                    profile=profile,
+                ),
+                "render_montage": lambda: _timed(
+                    render_montage_clip,
+                    title_card_path=intro_path,
+                    montage_path=fixtures[f"montage_{orientation}"],
+                    output_path=output_path,
+                    intro_path=intro_path,
+                    outro_path=fixtures[f"outro_{orientation}"],
+                    music_path=fixtures["music"],
+                    is_vertical=is_vertical,
+                    profile=profile,
+                ),
+                "thumbnail": lambda: _timed(
+                    generate_thumbnail,
+                    video_path=str(output_path),
+                    output_path=str(thumb_path),
+                ),
+                # Final + proxy + stills from one decode, to compare with the separate runs above
+                "multi_output": lambda: _timed(
+                    render_montage_multi_output,
+                    stock_intro_path=fixtures[f"intro_{orientation}"],
+                    overlay_text=overlay_text,
+                    font_path=font_path,
+                    montage_path=fixtures[f"montage_{orientation}"],
+                    outro_path=fixtures[f"outro_{orientation}"],
+                    music_path=fixtures["music"],
+                    outputs=default_output_specs(work_dir / f"multi-{profile}-{orientation}.mp4", profile=profile),
+                    is_vertical=is_vertical,
+                ),
+            }
+
+            for stage, run in stages.items():
+                timings = [run() for _ in range(repeat)]
+                result = {
+                    "case": f"{stage}/{profile}/{orientation}",
+                    "stage": stage,
+                    "profile": profile,
+                    "orientation": orientation,
+                    "seconds": round(min(timings), 3),
+                    "seconds_all": [round(t, 3) for t in timings],
+                }
+                if stage == "render_montage":
+                    result["output_bytes"] = output_path.stat().st_size
+                    result["realtime_factor"] = round(montage_seconds / result["seconds"], 3)
+                print(f"⏱️ {result['case']:<40} {result['seconds']:8.2f}s")
+                results.append(result)
+
+    return results
+
+
+def load_history(history_path: Path) -> list[dict]:
+    if history_path.exists():
+        with open(history_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return []
+
+
+def find_regressions(history: list[dict], results: list[dict]) -> list[str]:
+    """
+    Compares each case with the median of its last HISTORY_WINDOW runs with the
+    same fixture parameters.
+    """
+    regressions = []
+    for result in results:
+        previous = [
+            case["seconds"]
+            for run in history
+            for case in run["results"]
+            if case["case"] == result["case"]
+        ][-HISTORY_WINDOW:]
+        if not previous:
+            continue
+        baseline = statistics.median(previous)
+        if baseline > 0 and result["seconds"] > baseline * (1 + REGRESSION_THRESHOLD):
+            regressions.append(
+                f"{result['case']}: {result['seconds']:.2f}s vs median {baseline:.2f}s "
+                f"(+{(result['seconds'] / baseline - 1) * 100:.0f}%)"
+            )
+    return regressions
+
+
+def ffmpeg_version() -> str:
+    try:
+        out = subprocess.run(["ffmpeg", "-version"], capture_output=True, text=True, check=True).stdout
+        return out.splitlines()[0]
+    except Exception:
+        return "unknown"
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=Path(__file__).parent
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark render stages on synthetic lavfi clips.")
+    parser.add_argument("--profiles", nargs="+", choices=list(ENCODING_PROFILES), default=["draft", "final"])
+    parser.add_argument("--montage-seconds", type=float, default=30.0)
+    parser.add_argument("--intro-seconds", type=float, default=5.0)
+    parser.add_argument("--scale", type=float, default=1.0, help="Fixture resolution multiplier on 1080p")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per case (fastest is recorded)")
+    parser.add_argument("--font", type=Path, default=FONT_PATH)
+    parser.add_argument("--history", type=Path, default=BENCHMARK_HISTORY_PATH)
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args(argv)
+
+    if not args.font.exists():
+        print(f"❌ Font not found: {args.font} (pass --font)")
+        sys.exit(1)
+
+    with tempfile.TemporaryDirectory(prefix="lcs-bench-") as tmp:
+        work_dir = Path(tmp)
+        fixtures = build_fixtures(work_dir, args.montage_seconds, args.intro_seconds, args.scale)
+        results = run_cases(fixtures, work_dir, args.profiles, args.font, args.montage_seconds, args.repeat)
+
+    # History is only comparable between runs with the same fixture parameters
+    params = {
+        "montage_seconds": args.montage_seconds,
+        "intro_seconds": args.intro_seconds,
+        "scale": args.scale,
+    }
+    history = load_history(args.history)
+    comparable = [run for run in history if run.get("params") == params and run.get("host") == socket.gethostname()]
+    regressions = find_regressions(comparable, results)
+
+    history.append({
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "host": socket.gethostname(),
+        "platform": platform.platform(),
+        "ffmpeg": ffmpeg_version(),
+        "git": git_revision(),
+        "params": params,
+        "results": results,
+    })
+    args.history.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.history, "w", encoding="utf-8") as f:
+        json.dump(history, f, indent=2)
+    print(f"📁 Appended results to {args.history}")
+
+    if regressions:
+        print("\n🐢 Possible regressions:")
+        for line in regressions:
+            print(f"   {line}")
+        if args.fail_on_regression:
+            sys.exit(1)
+    else:
+        print("✅ No regressions against previous runs")
+
+
+if __name__ == "__main__":
+    main()
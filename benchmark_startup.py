@@ -0,0 +1,93 @@
+"""
+benchmark_startup.py
+
+Import-time benchmark for the CLI entry points.
+
+Imports each entry point in a fresh interpreter with `python -X importtime`
+and reports the median cumulative import time, the slowest modules, and any
+heavy network/LLM libraries that got pulled in. Exits non-zero when an entry
+point goes over the budget or imports a forbidden module, so render-only
+startup stays fast as modules are added.
+
+Usage:
+    python benchmark_startup.py
+    python benchmark_startup.py --budget-ms 150 --repeat 10
+    python benchmark_startup.py --modules main upload_youtube_montage --top 15
+
+Author: Llama Chile Shop
+"""
+
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+from pathlib import Path
+
+# Entry points that must start without loading any of FORBIDDEN_MODULES
+DEFAULT_MODULES = ["main", "upload_youtube_montage"]
+FORBIDDEN_MODULES = ["openai", "googleapiclient", "google.auth", "google_auth_oauthlib", "requests", "PIL", "numpy"]
+# Cumulative import time allowed per entry point (median of the runs)
+DEFAULT_BUDGET_MS = 200.0
+
+PROJECT_ROOT = Path(__file__).resolve().parent
+
+
+def measure_import(module: str) -> tuple[float, list[tuple[float, str]], list[str]]:
+    """
+    Imports `module` once in a fresh interpreter.
+
+    Returns:
+        tuple: (cumulative ms, [(self ms, module name), ...], forbidden modules that were loaded)
+    """
+    probe = (
+        f"import sys, json; import {module}; "
+        f"print(json.dumps([m for m in {FORBIDDEN_MODULES!r} if m in sys.modules]))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True,
+    )
+
+    total_us = None
+    self_times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        self_times.append((int(self_us) / 1000, name.strip()))
+        if name.rstrip() == f" {module}":
+            total_us = int(cumulative_us)
+
+    loaded = json.loads(result.stdout.strip().splitlines()[-1])
+    return (total_us or 0) / 1000, sorted(self_times, reverse=True), loaded
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark cold import time of the CLI entry points.")
+    parser.add_argument("--modules", nargs="+", default=DEFAULT_MODULES)
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per module (median is reported)")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--top", type=int, default=10, help="Slowest modules to list (by self time)")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for module in args.modules:
+        runs = [measure_import(module) for _ in range(max(1, args.repeat))]
+        median_ms = statistics.median(total for total, _, _ in runs)
+        _, self_times, loaded = runs[-1]
+
+        status = "✅" if median_ms <= args.budget_ms and not loaded else "❌"
+        print(f"\n{status} import {module}: {median_ms:.1f} ms median over {len(runs)} run(s) "
+              f"(budget {args.budget_ms:.0f} ms)")
+        for self_ms, name in self_times[:args.top]:
+            print(f"   {self_ms:7.1f} ms  {name}")
+        if loaded:
+            print(f"   ⚠️ Heavy modules loaded at import: {', '.join(loaded)}")
+        failed |= status == "❌"
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,8 @@
+import os
 import sys
+import argparse
+from functools import partial
+from contextlib import ExitStack
 import subprocess
 from pathlib import Path
 from datetime import datetime
@@ -10,34 +14,70 @@ from modules.config import (
     OUTRO_VERTICAL_PATH,
     THEME_MUSIC_PATH,
     FONT_PATH,
-    NAS_MOUNT_ROOT
+    RENDER_MODE,
+    RENDER_PROFILE,
+    ENCODING_PROFILES,
+    PIPELINE_CONCURRENCY,
+    STAGING_ENABLED,
+    STAGING_LOOKAHEAD,
+    UPLOAD_QUEUE_PATH
 )
 from modules.date_utils import parse_stream_date
+from modules.format_utils import detect_format
+from modules.encoding_profiles import get_profile
 from modules.title_utils import (
-    generate_title_overlay,
     format_overlay_text,
     generate_montage_title,
     generate_output_filename,
     extract_session_metadata
 )
-from modules.render_engine import render_montage_clip
+from modules.render_engine import (
+    render_montage_clip,
+    render_montage_single_pass,
+    render_montage_multi_output,
+    default_output_specs,
+    RENDER_MODES
+)
+from modules.intro_cache import get_title_intro
+from modules.mezzanine import prepare_mezzanine_assets, prepared_music, can_stream_copy, render_montage_stream_copy
+from modules.scheduler import run_render_batch, threads_per_job, resolve_job_count
+from modules.upload_queue import UploadQueue, drain, drain_in_background
+from modules.session_scanner import get_snapshot
+from modules.storage_root import nas_root, map_path, health_check
+from modules.startup import verify_assets
+from modules.staging_cache import (
+    stage_file,
+    staged_inputs,
+    local_output_path,
+    publish_output,
+    discard_on_failure,
+    Prefetcher
+)
+from modules.render_manifest import (
+    load_manifest,
+    save_manifest,
+    filter_pending_clips,
+    record_render,
+    render_settings,
+    asset_versions
+)
 
 def scan_for_montage_clips(nas_root: Path) -> list[Path]:
-    """Scan the NAS for montage clips to process."""
-    montage_clips = []
-    for session_dir in nas_root.iterdir():
-        if not session_dir.is_dir():
-            continue
-        montage_dir = session_dir / "montages"
-        if not montage_dir.exists():
-            continue
-        for file in montage_dir.glob("*.mp4"):
-            if file.name.lower() != "title_card.mp4":
-                montage_clips.append(file)
-    return montage_clips
-
-def process_clip(clip_path: Path):
-    is_vertical = clip_path.stem.endswith(("-vert", "-vertical"))
+    """Scan the NAS for montage clips to process (via the shared session snapshot)."""
+    return [
+        clip.path
+        for clip in get_snapshot(nas_root).clips("montages")
+        if clip.name.lower() != "title_card.mp4"
+    ]
+
+def process_clip(
+    clip_path: Path,
+    threads: int | None = None,
+    render_mode: str = RENDER_MODE,
+    profile: str = RENDER_PROFILE,
+    staging: bool = STAGING_ENABLED
+) -> Path:
+    is_vertical = detect_format(clip_path) == "vertical"
     stream_date = parse_stream_date(clip_path)
 
     # ⏺️ Compose overlay text for title overlay
@@ -50,59 +90,364 @@ def process_clip(clip_path: Path):
     # 🪪 Create session metadata
     session_name = extract_session_metadata(clip_path)
 
-    # 🖼️ Generate title overlay baked into intro (2s fade before end)
-    output_name = generate_output_filename(clip_path)
+    # Non-final profiles get a suffix (e.g. -draft) so previews never overwrite finals
+    output_name = generate_output_filename(clip_path, is_vertical=is_vertical)
+    output_name = f"{Path(output_name).stem}{get_profile(profile)['suffix']}.mp4"
     output_path = clip_path.parents[1] / "rendered" / output_name
-    temp_intro_path = output_path.parent / "intro_with_title.mp4"
-
-    stock_intro = INTRO_VERTICAL_PATH if is_vertical else INTRO_WIDE_PATH
-    print(f"[DEBUG] Generating intro with title overlay at: {temp_intro_path}")
-    generate_title_overlay(
-        intro_path=stock_intro,
-        overlay_text=overlay_text,
-        output_path=temp_intro_path,
-        font_path=FONT_PATH,
-        is_vertical=is_vertical
-    )
+    stock_intro = map_path(INTRO_VERTICAL_PATH if is_vertical else INTRO_WIDE_PATH)
 
     # 🎞️ Final outro (unchanged)
-    outro_path = OUTRO_VERTICAL_PATH if is_vertical else OUTRO_WIDE_PATH
-
-    # 🎬 Render final video
-    render_montage_clip(
-        title_card_path=temp_intro_path,
-        montage_path=clip_path,
-        output_path=output_path,
-        intro_path=temp_intro_path,  # semantic placeholder
-        outro_path=outro_path,
-        music_path=THEME_MUSIC_PATH,
-        is_vertical=is_vertical
+    outro_path = map_path(OUTRO_VERTICAL_PATH if is_vertical else OUTRO_WIDE_PATH)
+    # Decoded PCM copy prepared by startup.verify_assets (falls back to the MP3).
+    # The WAV already lives on local disk, so it isn't staged.
+    music_path = prepared_music(THEME_MUSIC_PATH)
+
+    # 💽 Decode from / encode to local disk; the NAS only sees sequential copies.
+    # Staged inputs stay pinned in the cache until the render is done with them.
+    montage_path = clip_path
+    render_path = output_path
+    with ExitStack() as pinned:
+        if staging:
+            montage_path, stock_intro, outro_path = pinned.enter_context(
+                staged_inputs([clip_path, stock_intro, outro_path])
+            )
+            render_path = local_output_path(output_path)
+            # A failed render or publish leaves no partial files on the local disk
+            pinned.enter_context(discard_on_failure(render_path))
+
+        rendered = False
+        extra_outputs = []
+        if render_mode == "multi-output":
+            # 🎬 Final encode, proxy and preview stills split from one decode
+            produced = render_montage_multi_output(
+                stock_intro_path=stock_intro,
+                overlay_text=overlay_text,
+                font_path=FONT_PATH,
+                montage_path=montage_path,
+                outro_path=outro_path,
+                music_path=music_path,
+                outputs=default_output_specs(render_path, profile=profile),
+                is_vertical=is_vertical,
+                threads=threads
+            )
+            extra_outputs = [path for name, paths in produced.items() if name != "final" for path in paths]
+            rendered = True
+
+        elif render_mode == "single-pass":
+            # 🎬 Title overlay, concat and music mix in one ffmpeg invocation
+            render_montage_single_pass(
+                stock_intro_path=stock_intro,
+                overlay_text=overlay_text,
+                font_path=FONT_PATH,
+                montage_path=montage_path,
+                output_path=render_path,
+                outro_path=outro_path,
+                music_path=music_path,
+                is_vertical=is_vertical,
+                threads=threads,
+                profile=profile
+            )
+            rendered = True
+
+        elif render_mode == "stream-copy":
+            if can_stream_copy(montage_path, is_vertical):
+                # 🧱 Only the montage body is encoded; intro/outro segments are stream-copied
+                orientation = "vertical" if is_vertical else "wide"
+                segments = prepare_mezzanine_assets(threads=threads, profile=profile)
+                title_intro_path = get_title_intro(
+                    intro_path=segments[f"intro_{orientation}"],
+                    overlay_text=overlay_text,
+                    font_path=FONT_PATH,
+                    is_vertical=is_vertical,
+                    threads=threads,
+                    mezzanine=True,
+                    profile=profile
+                )
+                render_montage_stream_copy(
+                    title_intro_path=title_intro_path,
+                    montage_path=montage_path,
+                    outro_segment_path=segments[f"outro_{orientation}"],
+                    music_path=music_path,
+                    output_path=render_path,
+                    is_vertical=is_vertical,
+                    threads=threads,
+                    profile=profile
+                )
+                rendered = True
+            else:
+                print(f"[INFO] {clip_path.name} doesn't match mezzanine parameters; using two-pass render")
+
+        if not rendered:
+            # 🖼️ Title overlay baked into intro (2s fade before end), shared by every clip of the session
+            title_intro_path = get_title_intro(
+                intro_path=stock_intro,
+                overlay_text=overlay_text,
+                font_path=FONT_PATH,
+                is_vertical=is_vertical,
+                threads=threads,
+                profile=profile
+            )
+
+            # 🎬 Render final video
+            render_montage_clip(
+                title_card_path=title_intro_path,
+                montage_path=montage_path,
+                output_path=render_path,
+                intro_path=title_intro_path,  # semantic placeholder
+                outro_path=outro_path,
+                music_path=music_path,
+                is_vertical=is_vertical,
+                threads=threads,
+                profile=profile
+            )
+
+        if render_path != output_path:
+            publish_output(render_path, output_path)
+            # Extras are named after the local render file; publish them under the final name
+            for extra in extra_outputs:
+                publish_output(extra, output_path.with_name(extra.name.replace(render_path.stem, output_path.stem, 1)))
+    return output_path
+
+def render_stage(job: dict, threads: int | None = None, render_mode: str = RENDER_MODE,
+                 profile: str = RENDER_PROFILE, staging: bool = STAGING_ENABLED) -> dict:
+    """Pipeline render stage: renders the job's clip and records the output path."""
+    job["output"] = process_clip(job["clip"], threads=threads, render_mode=render_mode, profile=profile,
+                                 staging=staging)
+    job["is_vertical"] = detect_format(job["clip"]) == "vertical"
+    return job
+
+def print_plan(pending_clips: list[Path], args) -> None:
+    """
+    Lists what a run with these arguments would do. Touches only the filesystem:
+    no clips are rendered and no OpenAI/YouTube/PeerTube clients are loaded.
+    """
+    stages = ["render"]
+    if args.pipeline:
+        stages += ["thumbnail", "describe"]
+        if not args.no_upload:
+            stages += ["upload (queued)" if args.queue_uploads else "upload", "archive"]
+    print(f"\n📝 Plan: {' → '.join(stages)} "
+          f"[{args.render_mode}, {args.profile}{', staged' if args.stage else ''}]")
+    for clip_path in pending_clips:
+        print(f"   🎞️ {clip_path}")
+
+    if UPLOAD_QUEUE_PATH.exists():
+        for platform, states in UploadQueue().counts().items():
+            waiting = states.get("pending", 0) + states.get("running", 0)
+            if waiting:
+                print(f"   📦 {waiting} {platform} upload(s) already queued")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Render Fortnite montage clips found on the NAS.")
+    parser.add_argument(
+        "--jobs", "-j", type=int, default=0,
+        help="Number of clips to render concurrently (0 = auto from core count)"
+    )
+    parser.add_argument(
+        "--render-mode", choices=RENDER_MODES, default=RENDER_MODE,
+        help="two-pass (cached title intro + concat), single-pass (one fused ffmpeg graph), "
+             "stream-copy (mezzanine intro/outro joined by stream copy) "
+             "or multi-output (single-pass split into final, proxy and preview stills)"
+    )
+    parser.add_argument(
+        "--profile", choices=list(ENCODING_PROFILES), default=RENDER_PROFILE,
+        help="Encoding profile: draft (fast low-res review), preview, final or archive"
+    )
+    parser.add_argument(
+        "--force", action="store_true",
+        help="Re-render every clip, ignoring the render manifest"
+    )
+    parser.add_argument(
+        "--since", type=lambda s: datetime.strptime(s, "%Y-%m-%d"), default=None,
+        metavar="YYYY-MM-DD",
+        help="Only consider sessions streamed on or after this date"
+    )
+    parser.add_argument(
+        "--stage", action=argparse.BooleanOptionalAction, default=STAGING_ENABLED,
+        help="Copy inputs to the local staging cache and render to local disk before moving to rendered/"
+    )
+    parser.add_argument(
+        "--pipeline", action="store_true",
+        help="Run render → thumbnail → describe → upload → archive as overlapping async stages"
+    )
+    parser.add_argument(
+        "--stage-limits", default=os.getenv("PIPELINE_STAGE_LIMITS"),
+        metavar="STAGE=N,...",
+        help="Per-stage worker counts for --pipeline, e.g. render=2,upload=1"
+    )
+    parser.add_argument(
+        "--no-upload", action="store_true",
+        help="With --pipeline, stop after the describe stage"
     )
+    parser.add_argument(
+        "--queue-uploads", action="store_true",
+        help="With --pipeline, enqueue uploads in the durable upload queue and drain it in the background"
+    )
+    parser.add_argument(
+        "--watch", action="store_true",
+        help="Keep running and feed montage clips into the pipeline as soon as they finish writing"
+    )
+    parser.add_argument(
+        "--plan", "--dry-run", action="store_true",
+        help="List the clips that would be rendered and the stages they would go through, then exit"
+    )
+    parser.add_argument(
+        "--check-storage", action="store_true",
+        help="Report NAS root reachability and latency, then exit"
+    )
+    parser.add_argument(
+        "--drain-uploads", action="store_true",
+        help="Only work the durable upload queue (including jobs left by earlier runs), then exit"
+    )
+    args = parser.parse_args(argv)
+    if args.plan and args.watch:
+        parser.error("--plan can't be combined with --watch")
+    return args
 
-    # 🧹 Cleanup
-    if temp_intro_path.exists():
-        try:
-            temp_intro_path.unlink()
-        except Exception as e:
-            print(f"[WARN] Couldn't delete temp intro file: {e}")
+def main(argv=None):
+    args = parse_args(argv)
+    if args.drain_uploads:
+        drain()
+        return
 
-def main():
     print(f"🐛 DEBUG: main.py loaded from: {__file__}")
     print(f"⏱️ LAUNCH TIMESTAMP: {datetime.now().isoformat()}")
     print(f"🔧 modules_path = {Path(__file__).parent / 'modules'}")
-    print(f"🔍 Scanning NAS for montage clips under: {NAS_MOUNT_ROOT}")
+    if args.check_storage:
+        health = health_check()
+        print(f"🗄️ {health}")
+        sys.exit(0 if health["reachable"] else 1)
 
-    montage_clips = scan_for_montage_clips(NAS_MOUNT_ROOT)
-    if not montage_clips:
-        print("📭 No montage clips found.")
-        return
+    root = nas_root()
+    manifest = load_manifest()
+    settings = render_settings(render_mode=args.render_mode, profile=args.profile)
+    assets = asset_versions()
+
+    def is_pending(clip_path):
+        return clip_path.name.lower() != "title_card.mp4" and bool(filter_pending_clips(
+            [clip_path], manifest, force=args.force, since=args.since,
+            session_date_fn=parse_stream_date, settings=settings
+        ))
+
+    if args.watch:
+        from modules.clip_watcher import ClipWatcher
+
+        # Clips go into the pipeline as soon as they finish writing; runs until interrupted
+        watcher = ClipWatcher(root, wanted=is_pending)
+        pending_clips = watcher.stream()
+    else:
+        print(f"🔍 Scanning NAS for montage clips under: {root}")
+
+        montage_clips = scan_for_montage_clips(root)
+        if not montage_clips:
+            print("📭 No montage clips found.")
+            return
+
+        pending_clips = filter_pending_clips(
+            montage_clips,
+            manifest,
+            force=args.force,
+            since=args.since,
+            session_date_fn=parse_stream_date,
+            settings=settings
+        )
+        print(f"🧾 {len(pending_clips)} of {len(montage_clips)} clip(s) need rendering")
+        if args.plan:
+            print_plan(pending_clips, args)
+            return
+        if not pending_clips:
+            return
+
+    def remember(result):
+        if result["ok"]:
+            record_render(manifest, Path(result["clip"]), settings, assets)
+            save_manifest(manifest)
+
+    # Verified assets; segments and decoded music are prepared up front so pool workers don't race to build them
+    verify_assets(render_mode=args.render_mode, profile=args.profile)
+
+    prefetcher = None
+    if args.stage:
+        # Shared assets are staged once; montages are prefetched a few jobs ahead
+        # (the theme music is read once, by verify_assets, when it decodes the local WAV)
+        for asset in (INTRO_WIDE_PATH, INTRO_VERTICAL_PATH, OUTRO_WIDE_PATH, OUTRO_VERTICAL_PATH):
+            stage_file(map_path(asset))
+        if not args.watch:
+            # --jobs 0 means "auto": look ahead of as many renders as will actually run
+            jobs = resolve_job_count(args.jobs, len(pending_clips))
+            prefetcher = Prefetcher(pending_clips, lookahead=jobs + STAGING_LOOKAHEAD)
+
+    if args.pipeline or args.watch:
+        # asyncio and the stage handlers are only loaded for pipeline runs
+        from modules.pipeline import (
+            run_pipeline,
+            parse_stage_limits,
+            thumbnail_stage,
+            describe_stage,
+            upload_stage,
+            enqueue_upload_stage,
+            archive_stage
+        )
+
+        limits = parse_stage_limits(args.stage_limits)
+        if args.jobs:
+            limits.setdefault("render", args.jobs)
+        render_workers = limits.get("render", PIPELINE_CONCURRENCY["render"])
+        handlers = {
+            "render": partial(
+                render_stage,
+                threads=threads_per_job(render_workers),
+                render_mode=args.render_mode,
+                profile=args.profile,
+                staging=args.stage
+            ),
+            "thumbnail": thumbnail_stage,
+            "describe": describe_stage,
+        }
+        upload_drainer = None
+        if args.queue_uploads and not args.no_upload:
+            # Queue workers archive each clip once its upload is done
+            handlers["upload"] = enqueue_upload_stage
+            upload_drainer = drain_in_background()
+        elif not args.no_upload:
+            handlers.update({"upload": upload_stage, "archive": archive_stage})
+
+        # Top up the description pool while the first renders are still running
+        from modules.description_utils import montage_pool
+        montage_pool.refill_in_background()
+
+        def remember_job(job):
+            if prefetcher:
+                prefetcher.done()
+            # Only clips that made it through every stage; a failed upload or
+            # archive leaves the clip to be picked up again next run
+            if job["error"] is None:
+                remember({"ok": True, "clip": str(job["clip"])})
 
-    for clip_path in montage_clips:
-        print(f"📦 Sending clip to processor: {clip_path} (type: {type(clip_path)})")
         try:
-            process_clip(clip_path)
-        except Exception as e:
-            print(f"❌ Error processing {clip_path} (is_vertical={clip_path.stem.endswith(('-vert', '-vertical'))}) → {e}")
+            run_pipeline(pending_clips, handlers, concurrency=limits, on_result=remember_job)
+        except KeyboardInterrupt:
+            if not args.watch:
+                raise
+            print("🛑 Watch stopped")
+        if prefetcher:
+            prefetcher.close()
+        if upload_drainer:
+            thread, stop_event = upload_drainer
+            print("📦 Waiting for queued uploads to finish...")
+            stop_event.set()
+            thread.join()
+        return
+
+    def remember_result(result):
+        if prefetcher:
+            prefetcher.done()
+        remember(result)
+
+    worker = partial(process_clip, render_mode=args.render_mode, profile=args.profile, staging=args.stage)
+    run_render_batch(worker, pending_clips, jobs=args.jobs, on_result=remember_result)
+    if prefetcher:
+        prefetcher.close()
 
 if __name__ == "__main__":
     main()
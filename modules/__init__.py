@@ -1 +1 @@
-from . import render_engine
+# Submodules are imported where they are used, so "import modules" stays cheap
@@ -0,0 +1,265 @@
+# modules/clip_watcher.py
+#
+# Watch mode: notices montage clips as they land on the NAS.
+# Session folders are watched with filesystem events (watchdog, when installed
+# and the root is a local disk) or by polling, which on network mounts only
+# re-lists the montages/ folders of recent sessions each tick. A clip counts as
+# finished once its size and mtime have stayed the same for WATCH_SETTLE_SECONDS,
+# so half-written exports are never picked up.
+
+import os
+import sys
+import time
+import asyncio
+import threading
+from pathlib import Path
+from datetime import date, timedelta
+
+from modules.config import (
+    WATCH_BACKEND,
+    WATCH_POLL_INTERVAL,
+    WATCH_SETTLE_SECONDS,
+    WATCH_RECENT_DAYS,
+    WATCH_FULL_RESCAN,
+    DEBUG,
+)
+from modules.session_scanner import SESSION_PATTERN, scan_sessions
+
+# Filesystem types whose changes inotify never hears about (writes happen on the server)
+NETWORK_FILESYSTEMS = {"cifs", "smb3", "smbfs", "nfs", "nfs4", "fuse.sshfs", "9p"}
+
+
+def is_network_path(path: Path) -> bool:
+    """
+    Best-effort check for a network mount (UNC share, mapped drive, or cifs/nfs mount).
+    """
+    text = str(path).replace("\\", "/")
+    if text.startswith("//"):
+        return True
+    if sys.platform == "win32":
+        import ctypes
+
+        drive = os.path.splitdrive(text)[0]
+        # DRIVE_REMOTE
+        return bool(drive) and ctypes.windll.kernel32.GetDriveTypeW(f"{drive}\\") == 4
+    try:
+        with open("/proc/mounts", "r", encoding="utf-8") as f:
+            mounts = [line.split()[1:3] for line in f if len(line.split()) >= 3]
+    except OSError:
+        return False
+    resolved = str(Path(path).resolve())
+    fstype = max(
+        ((mount_point, fs) for mount_point, fs in mounts
+         if resolved == mount_point or resolved.startswith(mount_point.rstrip("/") + "/")),
+        key=lambda m: len(m[0]),
+        default=(None, None),
+    )[1]
+    return fstype in NETWORK_FILESYSTEMS
+
+
+def choose_backend(root: Path, backend: str = WATCH_BACKEND) -> str:
+    """
+    Returns "events" or "polling" for the requested backend and this root.
+    """
+    if backend == "polling":
+        return "polling"
+    try:
+        import watchdog.observers  # noqa: F401
+    except ImportError:
+        if backend == "events":
+            print("[WARN] watchdog is not installed; falling back to polling")
+        return "polling"
+    if backend == "auto" and is_network_path(root):
+        return "polling"
+    return "events"
+
+
+class StabilityTracker:
+    """
+    Tracks candidate files until their size and mtime stop changing.
+
+    Args:
+        settle (float): Seconds a file must stay unchanged to count as finished.
+    """
+
+    def __init__(self, settle: float = WATCH_SETTLE_SECONDS):
+        self.settle = settle
+        self._seen: dict[Path, tuple[int, int, float]] = {}
+
+    def observe(self, path: Path, size: int, mtime_ns: int, now: float | None = None) -> bool:
+        """
+        Records one observation. Returns True once the file has settled.
+        """
+        now = time.monotonic() if now is None else now
+        previous = self._seen.get(path)
+        if previous is None or previous[:2] != (size, mtime_ns):
+            self._seen[path] = (size, mtime_ns, now)
+            return False
+        return size > 0 and now - previous[2] >= self.settle
+
+    def forget(self, path: Path) -> None:
+        self._seen.pop(path, None)
+
+    def pending(self) -> list[Path]:
+        return list(self._seen)
+
+    def __contains__(self, path: Path) -> bool:
+        return path in self._seen
+
+
+class ClipWatcher:
+    """
+    Finds montage clips under root that have finished writing.
+
+    Args:
+        root (Path): NAS root holding YYYY.MM.DD[.N] session folders.
+        wanted: Optional callable(path) -> bool; clips it rejects (e.g. already
+            rendered) are remembered and never tracked.
+        backend (str): "auto", "events" or "polling".
+        interval (float): Seconds between polls.
+        settle (float): Seconds a clip must stay unchanged.
+        recent_days (int): Sessions this recent are re-listed on every poll.
+        full_rescan (float): Seconds between walks of the whole tree.
+    """
+
+    def __init__(self, root: Path, wanted=None, backend: str = WATCH_BACKEND,
+                 interval: float = WATCH_POLL_INTERVAL, settle: float = WATCH_SETTLE_SECONDS,
+                 recent_days: int = WATCH_RECENT_DAYS, full_rescan: float = WATCH_FULL_RESCAN):
+        self.root = Path(root)
+        self.wanted = wanted
+        self.backend = choose_backend(self.root, backend)
+        self.interval = interval
+        self.recent_days = recent_days
+        self.full_rescan = full_rescan
+        self.tracker = StabilityTracker(settle)
+        self._handled: dict[Path, tuple[int, int]] = {}
+        self._dirty: set[Path] = set()
+        self._dirty_lock = threading.Lock()
+        self._last_full: float | None = None
+        self._observer = None
+        self._stopped = threading.Event()
+
+    def start(self) -> None:
+        print(f"👀 Watching {self.root} for new montage clips ({self.backend})")
+        if self.backend != "events":
+            return
+        from watchdog.observers import Observer
+        from watchdog.events import FileSystemEventHandler
+
+        watcher = self
+
+        class _Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                watcher._mark_dirty(event)
+
+        self._observer = Observer()
+        self._observer.schedule(_Handler(), str(self.root), recursive=True)
+        self._observer.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+
+    def _mark_dirty(self, event) -> None:
+        for raw in (event.src_path, getattr(event, "dest_path", "")):
+            if not raw:
+                continue
+            path = Path(os.fsdecode(raw))
+            if path.parent.name == "montages" and path.suffix.lower() == ".mp4":
+                montages_dir = path.parent
+            elif event.is_directory and path.name == "montages":
+                montages_dir = path
+            else:
+                continue
+            with self._dirty_lock:
+                self._dirty.add(montages_dir)
+
+    def _recent_montage_dirs(self) -> list[Path]:
+        cutoff = (date.today() - timedelta(days=self.recent_days)).isoformat()
+        dirs = []
+        with os.scandir(self.root) as entries:
+            for entry in entries:
+                match = SESSION_PATTERN.match(entry.name)
+                if match and "-".join(match.groups()[:3]) >= cutoff and entry.is_dir():
+                    dirs.append(Path(entry.path) / "montages")
+        return dirs
+
+    @staticmethod
+    def _list_montages(montages_dir: Path) -> dict[Path, tuple[int, int]]:
+        found = {}
+        try:
+            with os.scandir(montages_dir) as entries:
+                for entry in entries:
+                    if entry.name.lower().endswith(".mp4") and entry.is_file():
+                        st = entry.stat()
+                        found[Path(entry.path)] = (st.st_size, st.st_mtime_ns)
+        except (FileNotFoundError, NotADirectoryError):
+            pass
+        return found
+
+    def poll(self, now: float | None = None) -> list[Path]:
+        """
+        Looks for new or changed clips once.
+
+        Returns:
+            list[Path]: Clips that have finished writing since the last poll.
+        """
+        now = time.monotonic() if now is None else now
+        observed: dict[Path, tuple[int, int]] = {}
+
+        if self._last_full is None or now - self._last_full >= self.full_rescan:
+            snapshot = scan_sessions(self.root, categories=("montages",))
+            observed.update({clip.path: (clip.size, clip.mtime_ns) for clip in snapshot.clips("montages")})
+            self._last_full = now
+            with self._dirty_lock:
+                self._dirty.clear()
+        else:
+            if self.backend == "events":
+                with self._dirty_lock:
+                    dirs, self._dirty = self._dirty, set()
+            else:
+                dirs = self._recent_montage_dirs()
+            for montages_dir in dirs:
+                observed.update(self._list_montages(montages_dir))
+
+        # Clips still settling are re-checked directly, wherever they are
+        for path in self.tracker.pending():
+            if path in observed:
+                continue
+            try:
+                st = path.stat()
+                observed[path] = (st.st_size, st.st_mtime_ns)
+            except FileNotFoundError:
+                self.tracker.forget(path)
+
+        ready = []
+        for path, stamp in observed.items():
+            if self._handled.get(path) == stamp:
+                continue
+            if self.wanted is not None and path not in self.tracker and not self.wanted(path):
+                self._handled[path] = stamp
+                continue
+            if self.tracker.observe(path, *stamp, now=now):
+                self.tracker.forget(path)
+                self._handled[path] = stamp
+                ready.append(path)
+            elif DEBUG:
+                print(f"[DEBUG] Waiting for {path.name} to settle")
+        return sorted(ready)
+
+    async def stream(self):
+        """
+        Async iterator of finished clips, polling every `interval` seconds until stop().
+        """
+        self.start()
+        try:
+            while not self._stopped.is_set():
+                for path in await asyncio.to_thread(self.poll):
+                    print(f"🆕 New montage clip ready: {path.name}")
+                    yield path
+                await asyncio.sleep(self.interval)
+        finally:
+            self.stop()
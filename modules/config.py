@@ -10,7 +10,15 @@ DEBUG = os.getenv("DEBUG_MODE", "false").lower() == "true"
 
 # 🔧 Project Root
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
+# Logical NAS root used in paths below; modules/storage_root.py maps it onto the
+# working mount (NAS_ROOT env, Z:, or the UNC share) detected at runtime
 NAS_MOUNT_ROOT = Path("Z:/")
+NAS_ROOT_CANDIDATES = [
+    root for root in (os.getenv("NAS_ROOT"), "Z:/", "//chong/LCS/Videos/eklipse/") if root
+]
+# Seconds a cached NAS stat stays valid, and how long a mount probe may block
+STORAGE_STAT_TTL = float(os.getenv("STORAGE_STAT_TTL", 30))
+STORAGE_PROBE_TIMEOUT = float(os.getenv("STORAGE_PROBE_TIMEOUT", 5))
 
 # 📁 Assets
 ASSETS_DIR = PROJECT_ROOT / "assets"
@@ -21,6 +29,9 @@ THEME_MUSIC_PATH = ASSETS_DIR / "The_Llama_Song.mp3"
 # Font
 FONT_PATH = ASSETS_DIR / "BurbankBigCondensed-Black.otf"
 
+# Logo composited onto branded thumbnails
+LOGO_PATH = ASSETS_DIR / "LlamaLlama.png"
+
 # Brand colors
 FONT_COLOR = "#f7338f"
 SHADING_COLOR = "#10abba"
@@ -35,6 +46,101 @@ BRANDING_COLORS = {
 RENDER_PRESET = "slow"  # or "medium" for faster encode
 RENDER_CRF = 18         # lower = better quality, 18–23 is typical
 
+# 🎚️ Encoding profile ladder (selected per run with RENDER_PROFILE / --profile)
+# short_side: output height for wide / width for vertical (None = native 1080)
+# suffix: appended to the rendered filename so previews never overwrite finals
+ENCODING_PROFILES = {
+    "draft":   {"preset": "ultrafast", "crf": 30, "short_side": 540,  "audio_bitrate": "96k",  "suffix": "-draft"},
+    "preview": {"preset": "veryfast",  "crf": 26, "short_side": 720,  "audio_bitrate": "128k", "suffix": "-preview"},
+    "final":   {"preset": RENDER_PRESET, "crf": RENDER_CRF, "short_side": None, "audio_bitrate": "192k", "suffix": ""},
+    "archive": {"preset": "veryslow",  "crf": 14, "short_side": None, "audio_bitrate": "320k", "suffix": "-archive"},
+}
+RENDER_PROFILE = os.getenv("RENDER_PROFILE", "final")
+# "two-pass" = title intro encoded separately, then concatenated
+# "single-pass" = title, concat and music mix fused into one ffmpeg graph
+# "stream-copy" = only the montage body is encoded; mezzanine intro/outro are stream-copied
+# "multi-output" = single-pass graph split into the final encode, a proxy and preview stills
+RENDER_MODE = os.getenv("RENDER_MODE", "two-pass")
+# Multi-output extras: proxy size (short side, encoded with the draft profile) and seconds between stills
+PROXY_SHORT_SIDE = int(os.getenv("PROXY_SHORT_SIDE", 540))
+PREVIEW_STILL_INTERVAL = float(os.getenv("PREVIEW_STILL_INTERVAL", 10))
+
+# 🧾 Manifest of already-rendered clips (lets reruns skip unchanged montages)
+MANIFEST_PATH = Path(os.getenv("RENDER_MANIFEST_PATH", PROJECT_ROOT / "metadata" / "render_manifest.json"))
+
+# 🪪 Cache of rendered title-overlay intros (one encode per session/orientation)
+INTRO_CACHE_DIR = Path(os.getenv("INTRO_CACHE_DIR", PROJECT_ROOT / "cache" / "intros"))
+INTRO_CACHE_MAX_BYTES = int(os.getenv("INTRO_CACHE_MAX_BYTES", 2 * 1024**3))
+
+# 🧱 Intro/outro pre-transcoded to output codec parameters for stream-copy concat
+MEZZANINE_DIR = Path(os.getenv("MEZZANINE_DIR", PROJECT_ROOT / "cache" / "mezzanine"))
+
+# ✅ Fingerprints and probe results of the branded assets, checked by startup.verify_assets
+ASSET_STATE_PATH = Path(os.getenv("ASSET_STATE_PATH", PROJECT_ROOT / "cache" / "asset_state.json"))
+
+# 🗂️ Session scanner: session folders listed in parallel, and how long a snapshot is reused
+SCAN_WORKERS = int(os.getenv("SCAN_WORKERS", 8))
+SCAN_SNAPSHOT_TTL = float(os.getenv("SCAN_SNAPSHOT_TTL", 60))
+
+# 👀 Watch mode: "auto" uses filesystem events (watchdog) on local disks and polling on network mounts
+WATCH_BACKEND = os.getenv("WATCH_BACKEND", "auto")  # auto | events | polling
+WATCH_POLL_INTERVAL = float(os.getenv("WATCH_POLL_INTERVAL", 10))
+# A clip is ready once its size and mtime haven't changed for this many seconds
+WATCH_SETTLE_SECONDS = float(os.getenv("WATCH_SETTLE_SECONDS", 30))
+# Polling only re-lists sessions this recent; everything is re-listed every WATCH_FULL_RESCAN seconds
+WATCH_RECENT_DAYS = int(os.getenv("WATCH_RECENT_DAYS", 2))
+WATCH_FULL_RESCAN = float(os.getenv("WATCH_FULL_RESCAN", 3600))
+
+# 💽 Local staging cache: NAS inputs copied to local disk, renders written locally then moved
+STAGING_ENABLED = os.getenv("STAGING_ENABLED", "0") == "1"
+STAGING_DIR = Path(os.getenv("STAGING_DIR", PROJECT_ROOT / "cache" / "staging"))
+STAGING_MAX_BYTES = int(os.getenv("STAGING_MAX_BYTES", 20 * 1024**3))
+STAGING_COPY_BUFFER = int(os.getenv("STAGING_COPY_BUFFER", 16 * 1024**2))
+# Montages staged ahead of the renders that are running
+STAGING_LOOKAHEAD = int(os.getenv("STAGING_LOOKAHEAD", 2))
+
+# 🔎 Persistent ffprobe results keyed by path + size + mtime
+PROBE_CACHE_PATH = Path(os.getenv("PROBE_CACHE_PATH", PROJECT_ROOT / "cache" / "probe_cache.sqlite3"))
+
+# 📈 One JSON metrics record per ffmpeg stage, LLM request and upload (modules/metrics.py)
+METRICS_LOG_PATH = Path(os.getenv("METRICS_LOG_PATH", PROJECT_ROOT / "logs" / "render_metrics.jsonl"))
+
+# 🧪 Render benchmark history (benchmark_render.py)
+BENCHMARK_HISTORY_PATH = Path(os.getenv("BENCHMARK_HISTORY_PATH", PROJECT_ROOT / "logs" / "benchmark_history.json"))
+
+# 🔀 Staged pipeline (main.py --pipeline): workers per stage and queue depth between stages
+PIPELINE_CONCURRENCY = {"render": 1, "thumbnail": 2, "describe": 4, "upload": 2, "archive": 1}
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", 2))
+
+# 🖼️ Keyframe positions sampled and scored by the fast thumbnail picker
+THUMBNAIL_CANDIDATES = int(os.getenv("THUMBNAIL_CANDIDATES", 8))
+
+# 🗃️ Metadata history database (default: history.sqlite3 inside metadata_utils.HISTORY_DIR)
+HISTORY_DB_PATH = os.getenv("HISTORY_DB_PATH")
+# Also write the legacy one-JSON-per-clip files alongside the database
+HISTORY_JSON_EXPORT = os.getenv("HISTORY_JSON_EXPORT", "1") == "1"
+
+# 📤 Resumable uploads: chunk size (multiple of 256 KiB) and persisted session URIs
+YOUTUBE_CHUNK_SIZE = int(os.getenv("YOUTUBE_CHUNK_SIZE", 32 * 1024**2))
+UPLOAD_SESSION_DIR = Path(os.getenv("UPLOAD_SESSION_DIR", PROJECT_ROOT / "cache" / "upload_sessions"))
+UPLOAD_MAX_RETRIES = int(os.getenv("UPLOAD_MAX_RETRIES", 8))
+
+# 🐘 PeerTube instance, account and resumable upload settings
+PEERTUBE_URL = os.getenv("PEERTUBE_URL")
+PEERTUBE_USERNAME = os.getenv("PEERTUBE_USERNAME")
+PEERTUBE_PASSWORD = os.getenv("PEERTUBE_PASSWORD")
+PEERTUBE_CHANNEL_ID = int(os.getenv("PEERTUBE_CHANNEL_ID", 1))
+PEERTUBE_PRIVACY = int(os.getenv("PEERTUBE_PRIVACY", 1))  # 1 = public
+PEERTUBE_CHUNK_SIZE = int(os.getenv("PEERTUBE_CHUNK_SIZE", 8 * 1024**2))
+PEERTUBE_TOKEN_CACHE = Path(os.getenv("PEERTUBE_TOKEN_CACHE", PROJECT_ROOT / "cache" / "peertube_token.json"))
+
+# 📦 Durable upload queue: database, workers per platform, attempts per job
+UPLOAD_QUEUE_PATH = Path(os.getenv("UPLOAD_QUEUE_PATH", PROJECT_ROOT / "cache" / "upload_queue.sqlite3"))
+UPLOAD_CONCURRENCY = {"youtube": 2, "peertube": 1}
+UPLOAD_MAX_ATTEMPTS = int(os.getenv("UPLOAD_MAX_ATTEMPTS", 3))
+# A running job whose worker hasn't renewed its lease for this long is treated as abandoned
+UPLOAD_LEASE_SECONDS = int(os.getenv("UPLOAD_LEASE_SECONDS", 300))
+
 TITLE_TEMPLATE = {
     "main": "Fortnite Highlights",
     "sub": "from livestream",
@@ -52,21 +158,34 @@ FFMPEG_PATH = Path("C:/ffmpeg/bin/ffmpeg.exe")
 # 🧠 OpenAI API Key
 # os.environ["OPENAI_API_KEY"] = os.getenv("OPENAI_API_KEY")
 openai_api_key = os.getenv("OPENAI_API_KEY")
+# Point at a local OpenAI-compatible stand-in for testing (e.g. http://127.0.0.1:8080/v1)
+OPENAI_API_BASE = os.getenv("OPENAI_API_BASE")
+OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", 30))
+
+# 🚦 Shared LLM client limits (modules/llm_client.py)
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 4))
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", 60))
+LLM_BURST = int(os.getenv("LLM_BURST", 5))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", 4))
+# Seconds one request may take across all of its attempts
+LLM_DEADLINE = float(os.getenv("LLM_DEADLINE", 90))
+
+# 📝 Pre-generated description pool + notes-keyed description cache
+DESCRIPTION_STORE_PATH = Path(os.getenv("DESCRIPTION_STORE_PATH", PROJECT_ROOT / "cache" / "descriptions.sqlite3"))
+DESCRIPTION_POOL_SIZE = int(os.getenv("DESCRIPTION_POOL_SIZE", 20))
+DESCRIPTION_POOL_LOW_WATER = int(os.getenv("DESCRIPTION_POOL_LOW_WATER", 5))
 
 # 📂 Path resolver (Z: → UNC fallback), now exception wrapped
 def resolve_path(path_obj: Path) -> str:
     """
     Safely resolves a path for use in subprocess calls.
-    Falls back from Z:/ to UNC if necessary and logs issues.
+    Maps Z:/ onto the detected NAS mount (Z:, UNC or NAS_ROOT) with a cached
+    existence check, and logs issues.
     """
+    from modules.storage_root import resolve
+
     try:
-        if path_obj.exists():
-            return str(path_obj)
-        # Try UNC fallback
-        fallback = Path(str(path_obj).replace("Z:/", "//chong/LCS/Videos/eklipse/"))
-        if fallback.exists():
-            return str(fallback)
-        raise FileNotFoundError(f"❌ Path not found: {path_obj} or fallback {fallback}")
+        return str(resolve(path_obj))
     except Exception as e:
         logging.error(f"[resolve_path] Failed to resolve: {path_obj} → {e}")
         raise
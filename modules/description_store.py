@@ -0,0 +1,180 @@
+# modules/description_store.py
+#
+# Persistent store for OpenAI-generated copy.
+# - A pool of pre-generated montage descriptions, refilled on a background
+#   thread whenever it drops below DESCRIPTION_POOL_LOW_WATER, so the pipeline
+#   takes a description in milliseconds instead of waiting on the API.
+# - A cache of notes-driven descriptions keyed by notes + date + video type,
+#   so re-running a session never pays for the same copy twice.
+
+import time
+import sqlite3
+import hashlib
+import threading
+from contextlib import closing
+from pathlib import Path
+
+from modules.config import (
+    DESCRIPTION_STORE_PATH,
+    DESCRIPTION_POOL_SIZE,
+    DESCRIPTION_POOL_LOW_WATER,
+    DEBUG,
+)
+
+
+def _connect(db_path: Path) -> sqlite3.Connection:
+    db_path = Path(db_path)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS pool ("
+        " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+        " kind TEXT NOT NULL,"
+        " text TEXT NOT NULL,"
+        " created REAL NOT NULL)"
+    )
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS notes_cache ("
+        " key TEXT PRIMARY KEY,"
+        " date TEXT,"
+        " video_type TEXT,"
+        " text TEXT NOT NULL,"
+        " created REAL NOT NULL)"
+    )
+    return conn
+
+
+def notes_cache_key(notes_text: str, date: str, video_type: str) -> str:
+    """
+    Cache key for a notes-driven description. Whitespace-only edits to the
+    notes don't change the key.
+    """
+    normalised = " ".join((notes_text or "").split())
+    payload = "\x1f".join((normalised, date or "", video_type or ""))
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class DescriptionPool:
+    """
+    Pool of interchangeable pre-generated descriptions of one kind (e.g. "montage").
+
+    Args:
+        generator: Blocking callable returning one fresh description (may raise).
+        batch_generator: Optional blocking callable `(count) -> list[str]` used by
+            refill to request several descriptions at once.
+        kind (str): Pool name, so several kinds can share one database.
+        db_path (Path): SQLite store location.
+        target (int): Pool size a refill tops up to.
+        low_water (int): Taking below this size kicks off a background refill.
+    """
+
+    def __init__(self, generator, kind: str = "montage", db_path: Path = DESCRIPTION_STORE_PATH,
+                 target: int = DESCRIPTION_POOL_SIZE, low_water: int = DESCRIPTION_POOL_LOW_WATER,
+                 batch_generator=None):
+        self.generator = generator
+        self.batch_generator = batch_generator
+        self.kind = kind
+        self.db_path = Path(db_path)
+        self.target = target
+        self.low_water = low_water
+        self._refill_thread = None
+        self._refill_lock = threading.Lock()
+
+    def size(self) -> int:
+        with closing(_connect(self.db_path)) as conn:
+            return conn.execute("SELECT COUNT(*) FROM pool WHERE kind = ?", (self.kind,)).fetchone()[0]
+
+    def take(self) -> str | None:
+        """
+        Removes and returns the oldest pooled description, or None if the pool is empty.
+        Triggers a background refill when the pool runs low.
+        """
+        conn = _connect(self.db_path)
+        try:
+            # IMMEDIATE takes the write lock up front so two processes never pop the same row
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT id, text FROM pool WHERE kind = ? ORDER BY id LIMIT 1", (self.kind,)
+            ).fetchone()
+            if row:
+                conn.execute("DELETE FROM pool WHERE id = ?", (row[0],))
+            remaining = conn.execute("SELECT COUNT(*) FROM pool WHERE kind = ?", (self.kind,)).fetchone()[0]
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+        if remaining < self.low_water:
+            self.refill_in_background()
+        return row[1] if row else None
+
+    def add(self, text: str) -> None:
+        with closing(_connect(self.db_path)) as conn:
+            conn.execute(
+                "INSERT INTO pool (kind, text, created) VALUES (?, ?, ?)",
+                (self.kind, text, time.time()),
+            )
+
+    def refill(self, max_failures: int = 3) -> int:
+        """
+        Tops the pool up to `target` by calling the generator. Stops after
+        `max_failures` consecutive errors so an API outage can't spin forever.
+
+        Returns:
+            int: Number of descriptions added.
+        """
+        added = failures = 0
+        while failures < max_failures:
+            needed = self.target - self.size()
+            if needed <= 0:
+                break
+            try:
+                texts = self.batch_generator(needed) if self.batch_generator else [self.generator()]
+            except Exception as e:
+                texts = []
+                print(f"[WARN] Description pool refill failed ({failures + 1}/{max_failures}): {e}")
+            texts = [text for text in texts if text]
+            if not texts:
+                failures += 1
+                continue
+            failures = 0
+            for text in texts:
+                self.add(text)
+            added += len(texts)
+        if DEBUG:
+            print(f"[DEBUG] Description pool '{self.kind}' refilled with {added} (size {self.size()})")
+        return added
+
+    def refill_in_background(self) -> threading.Thread | None:
+        """
+        Starts a daemon refill thread unless one is already running.
+        """
+        with self._refill_lock:
+            if self._refill_thread is not None and self._refill_thread.is_alive():
+                return None
+            self._refill_thread = threading.Thread(target=self.refill, name=f"{self.kind}-pool-refill", daemon=True)
+            self._refill_thread.start()
+            return self._refill_thread
+
+    def wait_for_refill(self, timeout: float | None = None) -> None:
+        thread = self._refill_thread
+        if thread is not None:
+            thread.join(timeout)
+
+
+def get_cached_description(notes_text: str, date: str, video_type: str,
+                           db_path: Path = DESCRIPTION_STORE_PATH) -> str | None:
+    key = notes_cache_key(notes_text, date, video_type)
+    with closing(_connect(db_path)) as conn:
+        row = conn.execute("SELECT text FROM notes_cache WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else None
+
+
+def cache_description(notes_text: str, date: str, video_type: str, text: str,
+                      db_path: Path = DESCRIPTION_STORE_PATH) -> None:
+    key = notes_cache_key(notes_text, date, video_type)
+    with closing(_connect(db_path)) as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO notes_cache (key, date, video_type, text, created) VALUES (?, ?, ?, ?, ?)",
+            (key, date, video_type, text, time.time()),
+        )
@@ -5,31 +5,27 @@ Utility functions for generating video descriptions dynamically using OpenAI's A
 Includes brand-aware humor, format-aware descriptions, and dynamic prompt generation.
 
 This module currently supports:
-- Montage descriptions (fun, quirky, "Cool-Hand Gramps" themed)
+- Montage descriptions (fun, quirky, "Cool-Hand Gramps" themed), served from a
+  pre-generated pool (see description_store.py) with a live API call only when
+  the pool is empty
 
 Author: Llama Chile Shop
 Created: 2025-07-22
 """
 
-import os
 import random
-import openai
 
 # 🛠 Global debug flag (imported by design elsewhere)
 from modules.config import DEBUG
+from modules.description_store import DescriptionPool
+from modules.llm_client import get_client
 
-# Set up OpenAI API key from environment
-openai.api_key = os.getenv("OPENAI_API_KEY")
+FALLBACK_MONTAGE_DESCRIPTION = "Join Gramps for another action-packed Fortnite montage! Subscribe and watch live ➡ https://youtube.com/@llamachileshop 🎮🦙 #Fortnite #CoolHandGramps"
 
 
-def generate_montage_description() -> str:
+def _montage_request() -> dict:
     """
-    Generates a creative, humorous description for a montage highlight video.
-    Leverages the "Cool-Hand Gramps" branding identity and inserts dynamic randomness
-    to keep each description fresh and engaging.
-
-    Returns:
-        str: A YouTube/PeerTube-ready video description.
+    Builds the chat request for one montage description.
     """
     # 🎲 Add entropy to reduce prompt caching / same-seed behavior
     creativity_seed = random.randint(0, 999999)
@@ -48,20 +44,62 @@ to subscribe and check out the stream calendar.
 Entropy seed: {creativity_seed}
 """
 
-    try:
-        response = openai.ChatCompletion.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": "You are a creative and humorous copywriter."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.9,
-            max_tokens=250
-        )
-        return response.choices[0].message.content.strip()
+    return {
+        "model": "gpt-4",
+        "messages": [
+            {"role": "system", "content": "You are a creative and humorous copywriter."},
+            {"role": "user", "content": prompt}
+        ],
+        "temperature": 0.9,
+        "max_tokens": 250,
+        "purpose": "montage-description",
+    }
+
 
+def request_montage_description() -> str:
+    """
+    Asks the API for one fresh montage description via the shared LLM client.
+
+    Raises:
+        Exception: The last error once retries or the deadline are exhausted.
+    """
+    return get_client().complete_sync(**_montage_request())
+
+
+def request_montage_descriptions(count: int) -> list[str]:
+    """
+    Requests `count` descriptions in parallel (within the client's rate limits).
+    Failed requests are reported and left out of the result.
+    """
+    results = get_client().complete_many([_montage_request() for _ in range(count)])
+    failures = [r for r in results if isinstance(r, Exception)]
+    if failures:
+        print(f"[WARN] {len(failures)}/{count} montage description requests failed: {failures[0]}")
+    return [r for r in results if isinstance(r, str) and r]
+
+
+montage_pool = DescriptionPool(
+    request_montage_description,
+    kind="montage",
+    batch_generator=request_montage_descriptions,
+)
+
+
+def generate_montage_description() -> str:
+    """
+    Returns a creative, humorous description for a montage highlight video.
+    Leverages the "Cool-Hand Gramps" branding identity; descriptions come from the
+    pre-generated pool, falling back to a live request and then a canned string.
+
+    Returns:
+        str: A YouTube/PeerTube-ready video description.
+    """
+    pooled = montage_pool.take()
+    if pooled:
+        return pooled
+
+    try:
+        return request_montage_description()
     except Exception as e:
-        fallback = "Join Gramps for another action-packed Fortnite montage! Subscribe and watch live ➡ https://youtube.com/@llamachileshop 🎮🦙 #Fortnite #CoolHandGramps"
-        if DEBUG:
-            print(f"[ERROR] Failed to generate montage description: {e}")
-        return fallback
+        print(f"[WARN] Montage description request failed, using fallback copy: {type(e).__name__}: {e}")
+        return FALLBACK_MONTAGE_DESCRIPTION
@@ -0,0 +1,64 @@
+# modules/encoding_profiles.py
+#
+# Named encoding profiles (draft / preview / final / archive).
+# Every render stage builds its codec arguments and output geometry from the
+# same profile, so a quick draft and the expensive final encode differ only in
+# the profile name passed through the pipeline.
+
+from modules.config import ENCODING_PROFILES, RENDER_PROFILE
+
+# Native output geometry before any profile downscale
+NATIVE_WIDE = (1920, 1080)
+NATIVE_VERTICAL = (1080, 1920)
+
+
+def get_profile(name: str | None = None) -> dict:
+    """
+    Returns the named encoding profile (defaults to config.RENDER_PROFILE).
+
+    Raises:
+        ValueError: If the profile name is unknown.
+    """
+    name = name or RENDER_PROFILE
+    if name not in ENCODING_PROFILES:
+        raise ValueError(f"Unknown encoding profile '{name}' (choose from {', '.join(ENCODING_PROFILES)})")
+    return {"name": name, **ENCODING_PROFILES[name]}
+
+
+def video_encode_args(profile: dict) -> list[str]:
+    return [
+        "-c:v", "libx264",
+        "-preset", profile["preset"],
+        "-crf", str(profile["crf"]),
+        "-pix_fmt", "yuv420p",
+    ]
+
+
+def audio_encode_args(profile: dict) -> list[str]:
+    return [
+        "-c:a", "aac",
+        "-b:a", profile["audio_bitrate"],
+    ]
+
+
+def output_geometry(profile: dict, is_vertical: bool) -> tuple[int, int]:
+    """
+    Returns the (width, height) a profile renders to for the given orientation.
+    """
+    width, height = NATIVE_VERTICAL if is_vertical else NATIVE_WIDE
+    short_side = profile.get("short_side")
+    if not short_side:
+        return width, height
+    factor = short_side / min(width, height)
+    # x264 with yuv420p needs even dimensions
+    return int(width * factor) // 2 * 2, int(height * factor) // 2 * 2
+
+
+def scale_filter(profile: dict, is_vertical: bool) -> str | None:
+    """
+    Returns a scale filter for profiles that downscale, or None for native output.
+    """
+    if not profile.get("short_side"):
+        return None
+    width, height = output_geometry(profile, is_vertical)
+    return f"scale={width}:{height}"
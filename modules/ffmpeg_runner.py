@@ -0,0 +1,227 @@
+# modules/ffmpeg_runner.py
+#
+# Single entry point for every ffmpeg invocation in the pipeline.
+# Runs ffmpeg with `-progress pipe:1`, prints live fps/speed/ETA while it works
+# and appends one JSON metrics record per stage (wall time, CPU time, output
+# bytes, realtime factor) to the metrics log (modules/metrics.py) so we can
+# see where the hours go.
+
+import os
+import sys
+import time
+import threading
+import subprocess
+from collections import deque
+from pathlib import Path
+from datetime import datetime
+
+from modules.config import DEBUG
+from modules.metrics import record_metrics
+
+# Seconds between progress lines when stdout isn't a terminal (e.g. logs)
+NON_TTY_PROGRESS_INTERVAL = 10.0
+
+
+def _format_eta(seconds: float | None) -> str:
+    if seconds is None or seconds < 0:
+        return "--:--"
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes}:{secs:02d}"
+
+
+def _parse_speed(value: str | None) -> float | None:
+    if not value or value in ("N/A", "0x"):
+        return None
+    try:
+        return float(value.rstrip("x"))
+    except ValueError:
+        return None
+
+
+def _with_progress_flags(cmd: list[str]) -> list[str]:
+    """
+    Inserts the progress flags right after the ffmpeg executable.
+    """
+    return [cmd[0], "-hide_banner", "-nostats", "-progress", "pipe:1", *cmd[1:]]
+
+
+def run_ffmpeg(
+    cmd: list[str],
+    stage: str,
+    duration: float | None = None,
+    output_path: Path | None = None,
+    show_progress: bool = True,
+) -> dict:
+    """
+    Runs an ffmpeg command with live progress and records its metrics.
+
+    Args:
+        cmd (list[str]): Full ffmpeg command (cmd[0] is the executable).
+        stage (str): Stage name for progress output and metrics (e.g. "render").
+        duration (float | None): Expected output duration in seconds, used for % and ETA.
+        output_path (Path | None): Output file to measure; defaults to the last argument.
+        show_progress (bool): Print live progress lines.
+
+    Returns:
+        dict: The metrics record for this stage.
+
+    Raises:
+        subprocess.CalledProcessError: If ffmpeg exits non-zero (stderr tail attached).
+    """
+    full_cmd = _with_progress_flags(cmd)
+    output_path = Path(output_path or cmd[-1])
+    if DEBUG:
+        print(f"[DEBUG] ffmpeg ({stage}): {full_cmd}")
+
+    stderr_tail = deque(maxlen=40)
+    progress = {}
+    is_tty = sys.stdout.isatty()
+    last_print = 0.0
+
+    started_wall = time.perf_counter()
+    started_times = os.times()
+    proc = subprocess.Popen(
+        full_cmd,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        encoding="utf-8",
+        errors="replace",
+    )
+
+    # Drain stderr on a thread so a chatty ffmpeg can never block on a full pipe
+    def _drain_stderr():
+        for line in proc.stderr:
+            stderr_tail.append(line.rstrip())
+
+    stderr_thread = threading.Thread(target=_drain_stderr, daemon=True)
+    stderr_thread.start()
+
+    try:
+        for line in proc.stdout:
+            key, _, value = line.strip().partition("=")
+            if not key:
+                continue
+            progress[key] = value
+            if key != "progress" or not show_progress:
+                continue
+
+            now = time.perf_counter()
+            if value != "end" and not is_tty and now - last_print < NON_TTY_PROGRESS_INTERVAL:
+                continue
+            last_print = now
+
+            out_seconds = _out_time_seconds(progress)
+            speed = _parse_speed(progress.get("speed"))
+            pct = f"{min(out_seconds / duration * 100, 100):5.1f}%" if duration and out_seconds else "  ?  %"
+            eta = (duration - out_seconds) / speed if duration and out_seconds is not None and speed else None
+            status = (
+                f"⏳ [{stage}] {pct} fps={progress.get('fps', '?')} "
+                f"speed={progress.get('speed', '?')} ETA {_format_eta(eta)}"
+            )
+            print(f"\r{status}   ", end="" if is_tty and value != "end" else "\n", flush=True)
+    except BaseException:
+        # Interrupted (e.g. Ctrl+C or a failed print): don't leave ffmpeg running
+        proc.kill()
+        proc.wait()
+        stderr_thread.join(timeout=5)
+        proc.stdout.close()
+        proc.stderr.close()
+        raise
+
+    cpu_seconds = None
+    if hasattr(os, "wait4"):
+        # Per-child rusage: correct even when several ffmpegs run in parallel threads
+        _, status, rusage = os.wait4(proc.pid, 0)
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        cpu_seconds = rusage.ru_utime + rusage.ru_stime
+    else:
+        proc.wait()
+        ended_times = os.times()
+        cpu_seconds = (
+            (ended_times.children_user - started_times.children_user)
+            + (ended_times.children_system - started_times.children_system)
+        ) or None
+    stderr_thread.join(timeout=5)
+    proc.stdout.close()
+    proc.stderr.close()
+    wall_seconds = time.perf_counter() - started_wall
+
+    out_seconds = _out_time_seconds(progress)
+    try:
+        output_bytes = output_path.stat().st_size
+    except OSError:
+        output_bytes = None
+
+    record = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "stage": stage,
+        "output": str(output_path),
+        "returncode": proc.returncode,
+        "wall_seconds": round(wall_seconds, 3),
+        "cpu_seconds": round(cpu_seconds, 3) if cpu_seconds is not None else None,
+        "output_bytes": output_bytes,
+        "media_seconds": round(out_seconds, 3) if out_seconds is not None else None,
+        "realtime_factor": round(out_seconds / wall_seconds, 3) if out_seconds and wall_seconds else None,
+    }
+    record_metrics(record)
+
+    if proc.returncode != 0:
+        tail = "\n".join(stderr_tail)
+        print(f"❌ FFmpeg ({stage}) failed with exit code {proc.returncode}:\n{tail}")
+        raise subprocess.CalledProcessError(proc.returncode, full_cmd, stderr=tail)
+
+    if show_progress:
+        rtf = f"{record['realtime_factor']:.2f}x" if record["realtime_factor"] else "n/a"
+        print(f"⏱️ [{stage}] {wall_seconds:.1f}s wall, realtime factor {rtf}")
+    return record
+
+
+def capture_ffmpeg(cmd: list[str], stage: str) -> bytes:
+    """
+    Runs an ffmpeg command that writes its output to stdout (`pipe:1`) and
+    returns those bytes. Meant for short grabs such as single frames, so no
+    progress is shown; the metrics record is written like run_ffmpeg's.
+
+    Raises:
+        subprocess.CalledProcessError: If ffmpeg exits non-zero (stderr tail attached).
+    """
+    full_cmd = [cmd[0], "-hide_banner", "-nostats", *cmd[1:]]
+    if DEBUG:
+        print(f"[DEBUG] ffmpeg ({stage}): {full_cmd}")
+
+    started_wall = time.perf_counter()
+    proc = subprocess.run(full_cmd, stdin=subprocess.DEVNULL, capture_output=True)
+    wall_seconds = time.perf_counter() - started_wall
+
+    record_metrics({
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "stage": stage,
+        "output": "pipe:1",
+        "returncode": proc.returncode,
+        "wall_seconds": round(wall_seconds, 3),
+        "cpu_seconds": None,
+        "output_bytes": len(proc.stdout),
+        "media_seconds": None,
+        "realtime_factor": None,
+    })
+
+    if proc.returncode != 0:
+        tail = "\n".join(proc.stderr.decode("utf-8", errors="replace").splitlines()[-40:])
+        print(f"❌ FFmpeg ({stage}) failed with exit code {proc.returncode}:\n{tail}")
+        raise subprocess.CalledProcessError(proc.returncode, full_cmd, output=proc.stdout, stderr=tail)
+    return proc.stdout
+
+
+def _out_time_seconds(progress: dict) -> float | None:
+    # out_time_us is authoritative; out_time_ms is (despite its name) also microseconds
+    for key in ("out_time_us", "out_time_ms"):
+        value = progress.get(key)
+        if value and value != "N/A":
+            try:
+                return max(int(value), 0) / 1_000_000
+            except ValueError:
+                pass
+    return None
@@ -13,3 +13,20 @@ def detect_format_from_filename(clip_path):
         return "vertical"
     return "wide"
 
+
+
+def detect_format(clip_path):
+    """
+    Determines if a clip is 'wide' or 'vertical' from its probed geometry.
+    Falls back to the filename rules if the clip can't be probed.
+    """
+    from modules.media_probe import probe_media, is_vertical_media
+
+    try:
+        is_vertical = is_vertical_media(probe_media(clip_path))
+    except Exception as e:
+        print(f"[WARN] Couldn't probe {clip_path}, using filename format rules: {e}")
+        is_vertical = None
+    if is_vertical is None:
+        return detect_format_from_filename(clip_path)
+    return "vertical" if is_vertical else "wide"
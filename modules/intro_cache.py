@@ -0,0 +1,158 @@
+# modules/intro_cache.py
+#
+# Content-addressed cache for title-overlay intros.
+# A rendered intro only depends on the stock intro, orientation, overlay text,
+# font and brand colours, so every clip of a session shares one encode.
+# Entries are keyed by a hash of those inputs and evicted LRU once the cache
+# grows past INTRO_CACHE_MAX_BYTES.
+
+import os
+import json
+import uuid
+import hashlib
+from pathlib import Path
+
+from modules.config import (
+    INTRO_CACHE_DIR,
+    INTRO_CACHE_MAX_BYTES,
+    BRANDING_COLORS,
+    DEBUG,
+)
+from modules.title_utils import generate_title_overlay, build_title_filter, title_timing
+from modules.mezzanine import encode_segment
+from modules.encoding_profiles import get_profile
+
+# Bump when generate_title_overlay's filter graph changes so stale intros are not reused
+OVERLAY_VERSION = 2
+
+
+def _file_stamp(path: Path) -> str:
+    st = Path(path).stat()
+    return f"{st.st_size}:{st.st_mtime_ns}"
+
+
+def intro_cache_key(
+    intro_path: Path,
+    overlay_text: list[str],
+    font_path: Path,
+    is_vertical: bool,
+    mezzanine: bool = False,
+    profile: str | None = None,
+) -> str:
+    """
+    Returns the cache key for a title intro: a hash of everything that affects its pixels.
+    """
+    payload = {
+        "version": OVERLAY_VERSION,
+        "intro": [str(intro_path), _file_stamp(intro_path)],
+        "font": [str(font_path), _file_stamp(font_path)],
+        "text": list(overlay_text),
+        "vertical": bool(is_vertical),
+        "colors": BRANDING_COLORS,
+        "mezzanine": bool(mezzanine),
+        "profile": get_profile(profile),
+    }
+    encoded = json.dumps(payload, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()[:32]
+
+
+def get_title_intro(
+    intro_path: Path,
+    overlay_text: list[str],
+    font_path: Path,
+    is_vertical: bool = False,
+    threads: int | None = None,
+    mezzanine: bool = False,
+    profile: str | None = None,
+    cache_dir: Path = INTRO_CACHE_DIR,
+    max_bytes: int = INTRO_CACHE_MAX_BYTES,
+) -> Path:
+    """
+    Returns a rendered title intro, encoding it only on a cache miss.
+
+    The encode writes to a unique per-job temp file which is then atomically renamed
+    into place, so concurrent renders never read a half-written intro.
+    With mezzanine=True the intro is encoded to mezzanine parameters (see
+    modules/mezzanine.py) so it can be joined to the montage by stream copy.
+
+    Returns:
+        Path: Cached intro with the title overlay baked in. Do not delete it after use.
+    """
+    cache_dir = Path(cache_dir)
+    key = intro_cache_key(intro_path, overlay_text, font_path, is_vertical, mezzanine, profile)
+    cached_path = cache_dir / f"{key}.mp4"
+
+    if cached_path.exists():
+        if DEBUG:
+            print(f"[DEBUG] Title intro cache hit: {cached_path}")
+        # mtime doubles as the LRU timestamp (atime is often disabled on NAS/SSD mounts)
+        os.utime(cached_path)
+        return cached_path
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    temp_path = cache_dir / f"{key}.{uuid.uuid4().hex}.tmp.mp4"
+    print(f"🪪 Rendering title intro (cache miss): {cached_path.name}")
+    try:
+        if mezzanine:
+            segment_seconds, fade_start = title_timing(intro_path)
+            encode_segment(
+                source_path=intro_path,
+                output_path=temp_path,
+                is_vertical=is_vertical,
+                pre_filter=build_title_filter(overlay_text, font_path, fade_start=fade_start),
+                duration=segment_seconds,
+                threads=threads,
+                profile=profile,
+            )
+        else:
+            generate_title_overlay(
+                intro_path=intro_path,
+                overlay_text=overlay_text,
+                output_path=temp_path,
+                font_path=font_path,
+                is_vertical=is_vertical,
+                threads=threads,
+                profile=profile,
+            )
+        os.replace(temp_path, cached_path)
+    finally:
+        if temp_path.exists():
+            temp_path.unlink()
+
+    evict_intro_cache(cache_dir, max_bytes, keep=cached_path)
+    return cached_path
+
+
+def evict_intro_cache(cache_dir: Path, max_bytes: int, keep: Path | None = None) -> int:
+    """
+    Deletes least-recently-used intros until the cache fits in max_bytes.
+
+    Returns:
+        int: Number of bytes freed.
+    """
+    entries = []
+    for path in Path(cache_dir).glob("*.mp4"):
+        if path.name.endswith(".tmp.mp4"):
+            continue
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            continue  # evicted by another process
+        entries.append((st.st_mtime, st.st_size, path))
+
+    total = sum(size for _, size, _ in entries)
+    freed = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        if keep is not None and path == keep:
+            continue
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+        total -= size
+        freed += size
+        if DEBUG:
+            print(f"[DEBUG] Evicted cached intro: {path.name}")
+    return freed
@@ -0,0 +1,272 @@
+# modules/llm_client.py
+#
+# Shared client for every OpenAI chat completion the pipeline makes.
+# Requests run on one background event loop with:
+# - a concurrency cap (LLM_MAX_CONCURRENCY requests in flight)
+# - a token bucket (LLM_REQUESTS_PER_MINUTE sustained, LLM_BURST burst)
+# - a per-request deadline covering all attempts
+# - bounded retries with full-jitter exponential backoff on transient errors
+# and one usage/latency record per request in the metrics log, so a backlog
+# of descriptions can be generated in parallel without tripping rate limits.
+
+import time
+import random
+import asyncio
+import threading
+from datetime import datetime
+
+from modules.config import (
+    OPENAI_API_BASE,
+    OPENAI_TIMEOUT,
+    LLM_MAX_CONCURRENCY,
+    LLM_REQUESTS_PER_MINUTE,
+    LLM_BURST,
+    LLM_MAX_RETRIES,
+    LLM_DEADLINE,
+    DEBUG,
+)
+from modules.metrics import record_metrics
+
+# Exception class names (from any client library) worth retrying
+RETRYABLE_ERRORS = {
+    "RateLimitError",
+    "Timeout",
+    "APITimeoutError",
+    "APIConnectionError",
+    "ServiceUnavailableError",
+    "TryAgain",
+    "TimeoutError",
+    "ConnectionError",
+}
+
+
+def openai_transport(model: str, messages: list[dict], timeout: float, **params) -> tuple[str, dict]:
+    """
+    Default blocking transport: one ChatCompletion call.
+
+    Returns:
+        tuple[str, dict]: Completion text and the usage block.
+    """
+    import openai
+    from modules.config import openai_api_key
+
+    openai.api_key = openai_api_key
+    if OPENAI_API_BASE:
+        openai.api_base = OPENAI_API_BASE
+    response = openai.ChatCompletion.create(
+        model=model,
+        messages=messages,
+        request_timeout=timeout,
+        **params,
+    )
+    return response["choices"][0]["message"]["content"].strip(), dict(response.get("usage") or {})
+
+
+def is_retryable(error: Exception) -> bool:
+    status = getattr(error, "http_status", None) or getattr(error, "status_code", None)
+    if status is not None:
+        return status == 429 or status >= 500
+    return any(cls.__name__ in RETRYABLE_ERRORS for cls in type(error).__mro__)
+
+
+class TokenBucket:
+    """
+    Async token bucket: `rate` tokens per second, holding at most `capacity`.
+    """
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> float:
+        """
+        Waits for a token. Returns the seconds spent waiting.
+        """
+        waited = 0.0
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+                waited += delay
+                await asyncio.sleep(delay)
+
+
+class LLMClient:
+    """
+    Rate-limited, retrying chat-completion client shared across modules.
+
+    Args:
+        transport: Blocking callable `(model, messages, timeout, **params) -> (text, usage)`.
+        max_concurrency (int): Requests in flight at once.
+        requests_per_minute (float): Sustained request rate.
+        burst (int): Token bucket capacity.
+        max_retries (int): Retries after the first attempt.
+        deadline (float): Default seconds a request (all attempts) may take.
+        backoff_base (float): First backoff ceiling in seconds (doubles per retry).
+    """
+
+    def __init__(self, transport=openai_transport, max_concurrency: int = LLM_MAX_CONCURRENCY,
+                 requests_per_minute: float = LLM_REQUESTS_PER_MINUTE, burst: int = LLM_BURST,
+                 max_retries: int = LLM_MAX_RETRIES, deadline: float = LLM_DEADLINE,
+                 backoff_base: float = 1.0):
+        self.transport = transport
+        self.max_concurrency = max_concurrency
+        self.requests_per_minute = requests_per_minute
+        self.burst = burst
+        self.max_retries = max_retries
+        self.deadline = deadline
+        self.backoff_base = backoff_base
+        self.stats = {"requests": 0, "succeeded": 0, "failed": 0, "retries": 0,
+                      "prompt_tokens": 0, "completion_tokens": 0, "latencies": []}
+        self._loop = None
+        self._loop_lock = threading.Lock()
+
+    # -- event loop ----------------------------------------------------------
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._loop_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="llm-client", daemon=True).start()
+                # Limiter primitives must be created on (and only used from) the client loop
+                asyncio.run_coroutine_threadsafe(self._init_limiters(), loop).result()
+                self._loop = loop
+            return self._loop
+
+    async def _init_limiters(self):
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._bucket = TokenBucket(self.requests_per_minute / 60.0, self.burst)
+
+    # -- requests ------------------------------------------------------------
+
+    async def _complete(self, messages, model, deadline, purpose, params) -> str:
+        deadline = deadline or self.deadline
+        started = time.monotonic()
+        expires = started + deadline
+        attempt = 0
+        self.stats["requests"] += 1
+
+        async with self._semaphore:
+            while True:
+                await self._bucket.acquire()
+                remaining = expires - time.monotonic()
+                try:
+                    if remaining <= 0:
+                        raise TimeoutError(f"deadline of {deadline:.0f}s exceeded")
+                    text, usage = await asyncio.wait_for(
+                        asyncio.to_thread(self.transport, model, messages, min(OPENAI_TIMEOUT, remaining), **params),
+                        timeout=remaining,
+                    )
+                except Exception as e:
+                    if isinstance(e, asyncio.TimeoutError):
+                        e = TimeoutError(f"deadline of {deadline:.0f}s exceeded")
+                    retry = attempt < self.max_retries and is_retryable(e)
+                    backoff = random.uniform(0, self.backoff_base * 2 ** attempt) if retry else 0.0
+                    if not retry or time.monotonic() + backoff >= expires:
+                        self._record(purpose, model, started, attempt, error=e)
+                        raise e
+                    attempt += 1
+                    self.stats["retries"] += 1
+                    print(f"[WARN] LLM {purpose} attempt {attempt} failed ({type(e).__name__}: {e}); retrying in {backoff:.1f}s")
+                    await asyncio.sleep(backoff)
+                    continue
+
+                self._record(purpose, model, started, attempt, usage=usage)
+                return text
+
+    def _record(self, purpose, model, started, attempt, usage=None, error=None):
+        latency = time.monotonic() - started
+        usage = usage or {}
+        self.stats["succeeded" if error is None else "failed"] += 1
+        self.stats["prompt_tokens"] += usage.get("prompt_tokens", 0)
+        self.stats["completion_tokens"] += usage.get("completion_tokens", 0)
+        self.stats["latencies"].append(latency)
+        record_metrics({
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "stage": f"llm:{purpose}",
+            "model": model,
+            "wall_seconds": round(latency, 3),
+            "retries": attempt,
+            "prompt_tokens": usage.get("prompt_tokens"),
+            "completion_tokens": usage.get("completion_tokens"),
+            "error": f"{type(error).__name__}: {error}" if error else None,
+        })
+        if DEBUG:
+            print(f"[DEBUG] LLM {purpose} ({model}) {latency:.1f}s, retries={attempt}, error={error}")
+
+    async def complete(self, messages: list[dict], model: str, deadline: float | None = None,
+                       purpose: str = "completion", **params) -> str:
+        """
+        Awaitable from any event loop; the request itself runs on the client loop.
+        """
+        future = asyncio.run_coroutine_threadsafe(
+            self._complete(messages, model, deadline, purpose, params), self._ensure_loop()
+        )
+        return await asyncio.wrap_future(future)
+
+    def complete_sync(self, messages: list[dict], model: str, deadline: float | None = None,
+                      purpose: str = "completion", **params) -> str:
+        """
+        Blocking variant for threads and scripts.
+
+        Raises:
+            Exception: The last error once retries or the deadline are exhausted.
+        """
+        future = asyncio.run_coroutine_threadsafe(
+            self._complete(messages, model, deadline, purpose, params), self._ensure_loop()
+        )
+        return future.result()
+
+    def complete_many(self, requests: list[dict], return_exceptions: bool = True) -> list:
+        """
+        Runs many requests in parallel (within the concurrency and rate limits).
+
+        Args:
+            requests (list[dict]): Keyword arguments for complete_sync, one dict per request.
+            return_exceptions (bool): Put exceptions in the result list instead of raising.
+
+        Returns:
+            list: Completion texts (or exceptions), in request order.
+        """
+        loop = self._ensure_loop()
+
+        async def run_all():
+            return await asyncio.gather(
+                *(self._complete(r["messages"], r["model"], r.get("deadline"), r.get("purpose", "completion"),
+                                 {k: v for k, v in r.items() if k not in ("messages", "model", "deadline", "purpose")})
+                  for r in requests),
+                return_exceptions=return_exceptions,
+            )
+
+        return asyncio.run_coroutine_threadsafe(run_all(), loop).result()
+
+    def metrics_summary(self) -> dict:
+        latencies = sorted(self.stats["latencies"])
+        summary = {k: v for k, v in self.stats.items() if k != "latencies"}
+        if latencies:
+            summary["latency_p50"] = round(latencies[len(latencies) // 2], 3)
+            summary["latency_p95"] = round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 3)
+        return summary
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> LLMClient:
+    """
+    Returns the process-wide client, so all modules share one set of limits.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = LLMClient()
+        return _client
@@ -0,0 +1,168 @@
+# modules/media_probe.py
+#
+# ffprobe-backed media probe with a persistent cache.
+# Each file is probed once; duration, frame rate, geometry, codecs and audio
+# presence are stored in a small SQLite database keyed by path + size + mtime,
+# so render, thumbnail and metadata code can make decisions without re-probing
+# (or re-reading the file over SMB) on every run.
+
+import json
+import sqlite3
+import subprocess
+import threading
+from fractions import Fraction
+from pathlib import Path
+
+from modules.config import PROBE_CACHE_PATH, DEBUG
+
+_memory_cache: dict[str, tuple[int, int, dict]] = {}
+_lock = threading.Lock()
+
+
+def _connect(cache_path: Path) -> sqlite3.Connection:
+    cache_path = Path(cache_path)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(cache_path, timeout=30)
+    # WAL lets parallel render processes read while one of them writes
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS probes ("
+        " path TEXT PRIMARY KEY,"
+        " size INTEGER NOT NULL,"
+        " mtime_ns INTEGER NOT NULL,"
+        " data TEXT NOT NULL)"
+    )
+    return conn
+
+
+def _parse_rate(rate: str | None) -> float | None:
+    if not rate or rate in ("0/0", "N/A"):
+        return None
+    try:
+        return float(Fraction(rate))
+    except (ValueError, ZeroDivisionError):
+        return None
+
+
+def _run_ffprobe(path: Path) -> dict:
+    """
+    Runs ffprobe once and condenses its output into the fields the pipeline uses.
+    """
+    cmd = [
+        "ffprobe", "-v", "error",
+        "-show_entries",
+        "format=duration:stream=codec_type,codec_name,width,height,avg_frame_rate,"
+        "r_frame_rate,sample_aspect_ratio,pix_fmt,sample_rate,channels,duration",
+        "-of", "json",
+        str(path),
+    ]
+    result = subprocess.run(cmd, check=True, capture_output=True, text=True)
+    raw = json.loads(result.stdout)
+    streams = raw.get("streams", [])
+    video = next((s for s in streams if s.get("codec_type") == "video"), None)
+    audio = next((s for s in streams if s.get("codec_type") == "audio"), None)
+
+    duration = raw.get("format", {}).get("duration") or (video or {}).get("duration")
+    info = {
+        "duration": float(duration) if duration not in (None, "N/A") else None,
+        "has_video": video is not None,
+        "has_audio": audio is not None,
+        "width": None,
+        "height": None,
+        "fps": None,
+        "sar": None,
+        "pix_fmt": None,
+        "video_codec": None,
+        "audio_codec": None,
+        "sample_rate": None,
+        "channels": None,
+    }
+    if video:
+        info.update({
+            "width": video.get("width"),
+            "height": video.get("height"),
+            "fps": _parse_rate(video.get("avg_frame_rate")) or _parse_rate(video.get("r_frame_rate")),
+            "sar": video.get("sample_aspect_ratio"),
+            "pix_fmt": video.get("pix_fmt"),
+            "video_codec": video.get("codec_name"),
+        })
+    if audio:
+        info.update({
+            "audio_codec": audio.get("codec_name"),
+            "sample_rate": int(audio["sample_rate"]) if audio.get("sample_rate") else None,
+            "channels": audio.get("channels"),
+        })
+    return info
+
+
+def probe_media(path: Path, cache_path: Path = PROBE_CACHE_PATH) -> dict:
+    """
+    Returns probe information for a media file, running ffprobe only on a cache miss.
+
+    Args:
+        path (Path): Media file to probe.
+        cache_path (Path): SQLite probe cache location.
+
+    Returns:
+        dict: duration, fps, width, height, sar, pix_fmt, video_codec, audio_codec,
+              sample_rate, channels, has_video, has_audio.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+    """
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"Media file not found: {path}")
+
+    st = path.stat()
+    key = str(path)
+
+    with _lock:
+        cached = _memory_cache.get(key)
+    if cached and cached[:2] == (st.st_size, st.st_mtime_ns):
+        return dict(cached[2])
+
+    conn = _connect(cache_path)
+    try:
+        row = conn.execute(
+            "SELECT size, mtime_ns, data FROM probes WHERE path = ?", (key,)
+        ).fetchone()
+        if row and (row[0], row[1]) == (st.st_size, st.st_mtime_ns):
+            info = json.loads(row[2])
+        else:
+            if DEBUG:
+                print(f"[DEBUG] ffprobe cache miss: {path}")
+            info = _run_ffprobe(path)
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO probes (path, size, mtime_ns, data) VALUES (?, ?, ?, ?)",
+                    (key, st.st_size, st.st_mtime_ns, json.dumps(info)),
+                )
+    finally:
+        conn.close()
+
+    with _lock:
+        _memory_cache[key] = (st.st_size, st.st_mtime_ns, info)
+    return dict(info)
+
+
+def is_vertical_media(info: dict) -> bool | None:
+    """
+    Returns True/False from probed geometry, or None if the geometry is unknown.
+    """
+    if not info.get("width") or not info.get("height"):
+        return None
+    return info["height"] > info["width"]
+
+
+def concat_normalise_filter(info: dict, fps: int = 30) -> str:
+    """
+    Returns the fps/setsar normalisation needed before concat, skipping whichever
+    parts the probed stream already satisfies ("null" if nothing is needed).
+    """
+    filters = []
+    if info.get("fps") is None or abs(info["fps"] - fps) > 0.01:
+        filters.append(f"fps={fps}")
+    if info.get("sar") != "1:1":
+        filters.append("setsar=1")
+    return ",".join(filters) or "null"
@@ -0,0 +1,345 @@
+# modules/metadata_store.py
+#
+# Indexed SQLite history of processed sessions, clips and upload URLs.
+# Replaces walking thousands of HISTORY_DIR/YYYY.MM.DD/<stem>.json files over
+# SMB with indexed lookups ("was this clip uploaded, and where?").
+# The full original record is kept alongside the indexed columns (with its URL
+# lists merged across saves), so the JSON tree can be re-exported at any time.
+#
+# Usage:
+#     python -m modules.metadata_store import Z:/LCS/Logs/processed
+#     python -m modules.metadata_store lookup <stem>
+#     python -m modules.metadata_store export <out_dir>
+
+import re
+import sys
+import json
+import sqlite3
+import argparse
+from contextlib import closing
+from pathlib import Path
+from datetime import datetime
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_name TEXT NOT NULL UNIQUE,
+    session_date TEXT NOT NULL,
+    session_number INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS sessions_date ON sessions (session_date);
+
+CREATE TABLE IF NOT EXISTS clips (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id INTEGER NOT NULL REFERENCES sessions (id),
+    stem TEXT NOT NULL,
+    filename TEXT,
+    clip_type TEXT,
+    format TEXT,
+    title TEXT,
+    record TEXT NOT NULL,
+    updated TEXT NOT NULL,
+    UNIQUE (session_id, stem)
+);
+CREATE INDEX IF NOT EXISTS clips_stem ON clips (stem);
+CREATE INDEX IF NOT EXISTS clips_type_format ON clips (clip_type, format);
+
+CREATE TABLE IF NOT EXISTS upload_urls (
+    clip_id INTEGER NOT NULL REFERENCES clips (id) ON DELETE CASCADE,
+    platform TEXT NOT NULL,
+    url TEXT NOT NULL,
+    UNIQUE (clip_id, platform, url)
+);
+CREATE INDEX IF NOT EXISTS upload_urls_url ON upload_urls (url);
+CREATE INDEX IF NOT EXISTS upload_urls_platform ON upload_urls (platform, clip_id);
+"""
+
+# Record keys holding upload URLs, per platform ("youtube_url" is what yt_poster appends)
+URL_FIELDS = {
+    "youtube": ("youtube_urls", "youtube_url"),
+    "peertube": ("peertube_urls", "peertube_url"),
+}
+
+
+def connect(db_path: Path) -> sqlite3.Connection:
+    db_path = Path(db_path)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30)
+    # The history usually lives on the NAS: WAL's shared memory doesn't work over SMB,
+    # so keep the default rollback journal.
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _session_key(record: dict) -> tuple[str, str, int]:
+    """
+    Returns (session_name, session_date, session_number) for a record.
+    """
+    session_date = record["session_date"]
+    session_number = int(record.get("session_number") or 1)
+    session_name = record.get("session_name")
+    if session_name:
+        match = re.match(r"\d{4}\.\d{2}\.\d{2}\.(\d+)", session_name)
+        session_number = int(match.group(1)) if match else session_number
+    else:
+        session_name = session_date.replace("-", ".") + (f".{session_number}" if session_number > 1 else "")
+    return session_name, session_date, session_number
+
+
+def _record_urls(record: dict) -> list[tuple[str, str]]:
+    urls = []
+    for platform, fields in URL_FIELDS.items():
+        for field in fields:
+            value = record.get(field) or []
+            for url in [value] if isinstance(value, str) else value:
+                if url and (platform, url) not in urls:
+                    urls.append((platform, url))
+    return urls
+
+
+def _with_urls(conn: sqlite3.Connection, clip_id: int, record: dict) -> dict:
+    """
+    Returns the record with its URL lists rebuilt from every URL stored for the clip.
+    """
+    urls = conn.execute(
+        "SELECT platform, url FROM upload_urls WHERE clip_id = ? ORDER BY rowid", (clip_id,)
+    ).fetchall()
+    merged = dict(record)
+    for platform, (list_field, _) in URL_FIELDS.items():
+        merged[list_field] = [url for p, url in urls if p == platform]
+    return merged
+
+
+def upsert_record(conn: sqlite3.Connection, record: dict) -> int:
+    """
+    Inserts or updates one clip record (no commit). URLs are merged, never dropped,
+    and the stored record's URL lists include those added by earlier saves.
+
+    Returns:
+        int: The clip's row ID.
+    """
+    stem = record.get("stem") or Path(record["filename"]).stem
+    session_name, session_date, session_number = _session_key(record)
+
+    conn.execute(
+        "INSERT INTO sessions (session_name, session_date, session_number) VALUES (?, ?, ?)"
+        " ON CONFLICT (session_name) DO NOTHING",
+        (session_name, session_date, session_number),
+    )
+    session_id = conn.execute("SELECT id FROM sessions WHERE session_name = ?", (session_name,)).fetchone()[0]
+
+    conn.execute(
+        "INSERT INTO clips (session_id, stem, filename, clip_type, format, title, record, updated)"
+        " VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+        " ON CONFLICT (session_id, stem) DO UPDATE SET"
+        " filename = excluded.filename, clip_type = excluded.clip_type, format = excluded.format,"
+        " title = excluded.title, record = excluded.record, updated = excluded.updated",
+        (
+            session_id,
+            stem,
+            record.get("filename"),
+            record.get("clip_type"),
+            record.get("format"),
+            record.get("title"),
+            json.dumps(record, default=str),
+            datetime.now().isoformat(timespec="seconds"),
+        ),
+    )
+    clip_id = conn.execute(
+        "SELECT id FROM clips WHERE session_id = ? AND stem = ?", (session_id, stem)
+    ).fetchone()[0]
+    conn.executemany(
+        "INSERT OR IGNORE INTO upload_urls (clip_id, platform, url) VALUES (?, ?, ?)",
+        [(clip_id, platform, url) for platform, url in _record_urls(record)],
+    )
+    conn.execute(
+        "UPDATE clips SET record = ? WHERE id = ?",
+        (json.dumps(_with_urls(conn, clip_id, record), default=str), clip_id),
+    )
+    return clip_id
+
+
+def save_record(record: dict, db_path: Path) -> dict:
+    """
+    Saves one clip record.
+
+    Returns:
+        dict: The record as stored, with URLs from earlier saves merged in.
+    """
+    with closing(connect(db_path)) as conn, conn:
+        clip_id = upsert_record(conn, record)
+        return json.loads(conn.execute("SELECT record FROM clips WHERE id = ?", (clip_id,)).fetchone()[0])
+
+
+def _clip_rows_to_dicts(conn: sqlite3.Connection, rows) -> list[dict]:
+    clips = []
+    for row in rows:
+        urls = conn.execute(
+            "SELECT platform, url FROM upload_urls WHERE clip_id = ? ORDER BY rowid", (row["id"],)
+        ).fetchall()
+        clips.append({
+            "session_name": row["session_name"],
+            "session_date": row["session_date"],
+            "stem": row["stem"],
+            "filename": row["filename"],
+            "clip_type": row["clip_type"],
+            "format": row["format"],
+            "title": row["title"],
+            "urls": {platform: [u for p, u in urls if p == platform] for platform in {p for p, _ in urls}},
+            "record": json.loads(row["record"]),
+        })
+    return clips
+
+
+_CLIP_SELECT = (
+    "SELECT clips.*, sessions.session_name, sessions.session_date"
+    " FROM clips JOIN sessions ON sessions.id = clips.session_id"
+)
+
+
+def find_clip(db_path: Path, stem: str) -> list[dict]:
+    """
+    Returns every stored clip with this stem (normally one), with its URLs.
+    """
+    with closing(connect(db_path)) as conn, conn:
+        rows = conn.execute(f"{_CLIP_SELECT} WHERE clips.stem = ?", (stem,)).fetchall()
+        return _clip_rows_to_dicts(conn, rows)
+
+
+def find_by_url(db_path: Path, url: str) -> dict | None:
+    """
+    Returns the clip an upload URL belongs to, or None.
+    """
+    with closing(connect(db_path)) as conn, conn:
+        rows = conn.execute(
+            f"{_CLIP_SELECT} JOIN upload_urls ON upload_urls.clip_id = clips.id WHERE upload_urls.url = ?",
+            (url,),
+        ).fetchall()
+        clips = _clip_rows_to_dicts(conn, rows)
+    return clips[0] if clips else None
+
+
+def query_clips(
+    db_path: Path,
+    start_date: str | None = None,
+    end_date: str | None = None,
+    clip_type: str | None = None,
+    format: str | None = None,
+    platform: str | None = None,
+    uploaded: bool | None = None,
+) -> list[dict]:
+    """
+    Filters clips by session date range (inclusive, "YYYY-MM-DD"), clip type,
+    format and upload state.
+
+    Args:
+        platform (str | None): With uploaded=True/False, restrict the upload check to one platform.
+        uploaded (bool | None): True = has an upload URL, False = has none, None = either.
+    """
+    where, params = [], []
+    if start_date:
+        where.append("sessions.session_date >= ?")
+        params.append(start_date)
+    if end_date:
+        where.append("sessions.session_date <= ?")
+        params.append(end_date)
+    if clip_type:
+        where.append("clips.clip_type = ?")
+        params.append(clip_type)
+    if format:
+        where.append("clips.format = ?")
+        params.append(format)
+    if uploaded is not None:
+        exists = "EXISTS (SELECT 1 FROM upload_urls WHERE upload_urls.clip_id = clips.id" + (
+            " AND upload_urls.platform = ?)" if platform else ")"
+        )
+        where.append(exists if uploaded else f"NOT {exists}")
+        if platform:
+            params.append(platform)
+
+    sql = _CLIP_SELECT + (" WHERE " + " AND ".join(where) if where else "")
+    sql += " ORDER BY sessions.session_date, sessions.session_name, clips.stem"
+    with closing(connect(db_path)) as conn, conn:
+        return _clip_rows_to_dicts(conn, conn.execute(sql, params).fetchall())
+
+
+def import_json_tree(history_dir: Path, db_path: Path) -> dict:
+    """
+    Bulk-imports an existing HISTORY_DIR/YYYY.MM.DD/<stem>.json tree in one transaction.
+
+    Returns:
+        dict: {"imported": n, "skipped": n}
+    """
+    imported = skipped = 0
+    with closing(connect(db_path)) as conn, conn:
+        for json_path in sorted(Path(history_dir).glob("*/*.json")):
+            try:
+                with open(json_path, "r", encoding="utf-8") as f:
+                    record = json.load(f)
+                # Folders are named by date only; the session name comes from
+                # session_date + session_number (see _session_key)
+                record.setdefault("session_date", json_path.parent.name.replace(".", "-")[:10])
+                record.setdefault("stem", json_path.stem)
+                upsert_record(conn, record)
+                imported += 1
+            except Exception as e:
+                skipped += 1
+                print(f"[WARN] Skipping {json_path}: {e}")
+    print(f"📥 Imported {imported} metadata record(s) into {db_path} ({skipped} skipped)")
+    return {"imported": imported, "skipped": skipped}
+
+
+def export_json_tree(db_path: Path, out_dir: Path) -> int:
+    """
+    Writes every stored record back out as OUT_DIR/YYYY.MM.DD/<stem>.json.
+
+    Returns:
+        int: Number of files written.
+    """
+    count = 0
+    with closing(connect(db_path)) as conn, conn:
+        rows = conn.execute(_CLIP_SELECT).fetchall()
+        # Records saved before URL lists were merged on write still get every URL
+        records = [_with_urls(conn, row["id"], json.loads(row["record"])) for row in rows]
+    for row, record in zip(rows, records):
+        dest_dir = Path(out_dir) / row["session_date"].replace("-", ".")
+        dest_dir.mkdir(parents=True, exist_ok=True)
+        with open(dest_dir / f"{row['stem']}.json", "w", encoding="utf-8") as f:
+            json.dump(record, f, indent=2)
+        count += 1
+    print(f"📤 Exported {count} metadata record(s) to {out_dir}")
+    return count
+
+
+def main(argv=None):
+    from modules.metadata_utils import history_db_path
+
+    parser = argparse.ArgumentParser(description="Manage the SQLite metadata history.")
+    parser.add_argument("--db", type=Path, default=None, help="History database (default: next to HISTORY_DIR)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("import", help="Import a JSON history tree").add_argument("history_dir", type=Path)
+    commands.add_parser("export", help="Export records as a JSON tree").add_argument("out_dir", type=Path)
+    commands.add_parser("lookup", help="Show where a clip was uploaded").add_argument("stem")
+    args = parser.parse_args(argv)
+    db_path = args.db or history_db_path()
+
+    if args.command == "import":
+        import_json_tree(args.history_dir, db_path)
+    elif args.command == "export":
+        export_json_tree(db_path, args.out_dir)
+    else:
+        clips = find_clip(db_path, args.stem)
+        if not clips:
+            print(f"📭 No record for {args.stem}")
+            sys.exit(1)
+        for clip in clips:
+            print(f"🎞️ {clip['session_name']}/{clip['stem']} ({clip['clip_type']}, {clip['format']})")
+            for platform, urls in clip["urls"].items():
+                for url in urls:
+                    print(f"   {platform}: {url}")
+
+
+if __name__ == "__main__":
+    main()
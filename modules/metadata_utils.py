@@ -2,7 +2,8 @@
 metadata_utils.py
 
 Handles metadata extraction from video clip structure and notes.json,
-and manages persistent storage of finalized metadata records.
+and manages persistent storage of finalized metadata records in the indexed
+SQLite history (see metadata_store.py), optionally mirrored as JSON files.
 
 Author: Llama Chile Shop
 """
@@ -10,12 +11,35 @@ Author: Llama Chile Shop
 import json
 import re
 from pathlib import Path
-from modules.config import NAS_MOUNT_ROOT
+from modules.config import NAS_MOUNT_ROOT, HISTORY_DB_PATH, HISTORY_JSON_EXPORT
+from modules import metadata_store
+from modules.session_scanner import find_session
 
 # Define where to persist finalized metadata records after upload
 HISTORY_DIR = Path("Z:/LCS/Logs/processed")
 
 
+def history_db_path() -> Path:
+    """
+    Returns the history database path (resolved at call time so HISTORY_DIR can be overridden).
+    """
+    return Path(HISTORY_DB_PATH) if HISTORY_DB_PATH else HISTORY_DIR / "history.sqlite3"
+
+
+def find_uploads(stem: str) -> dict:
+    """
+    Answers "was this clip uploaded, and where?" from the history database.
+
+    Returns:
+        dict: Platform → list of URLs (empty if the clip is unknown or not uploaded).
+    """
+    urls = {}
+    for clip in metadata_store.find_clip(history_db_path(), stem):
+        for platform, platform_urls in clip["urls"].items():
+            urls.setdefault(platform, []).extend(platform_urls)
+    return urls
+
+
 def derive_session_metadata(session_dir: Path) -> dict:
     """
     Derives session-level metadata from a session directory.
@@ -39,10 +63,13 @@ def derive_session_metadata(session_dir: Path) -> dict:
     session_date = f"{year}-{month}-{day}"
     session_number = int(session_index) if session_index else 1
 
+    # One listing of the session (reused from the shared scan snapshot when available)
+    session = find_session(session_dir)
+
     # Attempt to load notes.json from the session root
     notes_path = session_dir / "notes.json"
     notes_data = {}
-    if notes_path.exists():
+    if session.has_notes:
         try:
             with open(notes_path, "r", encoding="utf-8") as f:
                 notes_data = json.load(f)
@@ -60,13 +87,10 @@ def derive_session_metadata(session_dir: Path) -> dict:
         "clips": []
     }
 
-    # Scan for all .mp4 clips within expected subdirectories
+    # All .mp4 clips within the expected subdirectories
     for subfolder in ["hits", "misses", "montages", "outtakes"]:
-        clip_dir = session_dir / subfolder
-        if not clip_dir.exists():
-            continue
-
-        for clip_path in clip_dir.glob("*.mp4"):
+        for clip in session.categories.get(subfolder, []):
+            clip_path = clip.path
             stem = clip_path.stem.lower()
             is_vertical = stem.endswith("-vert") or stem.endswith("-vertical")
             format = "vertical" if is_vertical else "wide"
@@ -88,7 +112,8 @@ def derive_session_metadata(session_dir: Path) -> dict:
 
 def save_metadata_record(metadata: dict) -> None:
     """
-    Saves a finalized metadata record to disk for future lookup or audit.
+    Saves a finalized metadata record to the history database (and, with
+    HISTORY_JSON_EXPORT, to a JSON file) for future lookup or audit.
 
     This includes all session-level and clip-level data, plus any added URLs
     after upload to YouTube or PeerTube.
@@ -106,6 +131,12 @@ def save_metadata_record(metadata: dict) -> None:
         if not session_date or not filename:
             raise ValueError("Metadata missing required fields: session_date or filename/stem")
 
+        # The stored record carries URLs added by earlier saves of the same clip
+        stored = metadata_store.save_record(metadata, history_db_path())
+        if not HISTORY_JSON_EXPORT:
+            print(f"📁 Saved metadata record for {filename} to: {history_db_path()}")
+            return
+
         # Use YYYY.MM.DD folder for archival
         dest_dir = HISTORY_DIR / session_date.replace("-", ".")
         dest_dir.mkdir(parents=True, exist_ok=True)
@@ -113,7 +144,7 @@ def save_metadata_record(metadata: dict) -> None:
         # Save as <stem>.json
         dest_file = dest_dir / f"{Path(filename).stem}.json"
         with open(dest_file, "w", encoding="utf-8") as f:
-            json.dump(metadata, f, indent=2)
+            json.dump(stored, f, indent=2)
 
         print(f"📁 Saved metadata record to: {dest_file}")
 
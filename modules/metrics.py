@@ -0,0 +1,25 @@
+# modules/metrics.py
+#
+# Shared JSON-lines metrics log.
+# ffmpeg stages, LLM requests and YouTube/PeerTube uploads each append one
+# record per operation to METRICS_LOG_PATH, so one file shows where a run's
+# time went.
+
+import json
+from pathlib import Path
+
+from modules.config import METRICS_LOG_PATH
+
+
+def record_metrics(record: dict, metrics_path: Path | None = None) -> None:
+    """
+    Appends one JSON metrics record (one line) to the metrics log.
+    Failures are reported but never interrupt a render or upload.
+    """
+    try:
+        metrics_path = Path(metrics_path or METRICS_LOG_PATH)
+        metrics_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(metrics_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+    except Exception as e:
+        print(f"[WARN] Couldn't write metrics record: {e}")
@@ -0,0 +1,326 @@
+# modules/mezzanine.py
+#
+# Mezzanine segments for the static branded intro/outro assets.
+# Each asset is transcoded once into a segment that already matches the final
+# output's codec parameters (geometry, fps, pixel format, timescale, audio
+# layout). Montages whose probed parameters fit can then be assembled with the
+# concat demuxer and `-c copy`, so only the montage body and its music mix are
+# encoded per clip.
+
+import uuid
+import hashlib
+from pathlib import Path
+
+from modules.config import (
+    MEZZANINE_DIR,
+    INTRO_WIDE_PATH,
+    INTRO_VERTICAL_PATH,
+    OUTRO_WIDE_PATH,
+    OUTRO_VERTICAL_PATH,
+    THEME_MUSIC_PATH,
+    ENCODING_PROFILES,
+    DEBUG,
+)
+from modules.media_probe import probe_media
+from modules.storage_root import map_path
+from modules.ffmpeg_runner import run_ffmpeg
+from modules.encoding_profiles import (
+    get_profile,
+    output_geometry,
+    NATIVE_WIDE,
+    NATIVE_VERTICAL,
+    video_encode_args as profile_video_args,
+    audio_encode_args as profile_audio_args,
+)
+
+# Output parameters every mezzanine segment (and montage body) is encoded to,
+# on top of the geometry and codec settings of the selected encoding profile
+MEZZANINE_FPS = 30
+MEZZANINE_TIMESCALE = 15360  # libx264/mp4 default for 30 fps; must match for stream copy
+AUDIO_RATE = 48000
+AUDIO_CHANNELS = 2
+
+BRANDED_ASSETS = {
+    "intro_wide": (INTRO_WIDE_PATH, False),
+    "intro_vertical": (INTRO_VERTICAL_PATH, True),
+    "outro_wide": (OUTRO_WIDE_PATH, False),
+    "outro_vertical": (OUTRO_VERTICAL_PATH, True),
+}
+
+
+def video_encode_args(profile: dict) -> list[str]:
+    return [
+        *profile_video_args(profile),
+        "-profile:v", "high",
+        "-video_track_timescale", str(MEZZANINE_TIMESCALE),
+    ]
+
+
+def audio_encode_args(profile: dict) -> list[str]:
+    return [
+        *profile_audio_args(profile),
+        "-ar", str(AUDIO_RATE),
+        "-ac", str(AUDIO_CHANNELS),
+    ]
+
+
+def normalise_filter(is_vertical: bool, profile: dict) -> str:
+    """
+    Video filter chain that conforms any input to the profile's geometry and mezzanine frame rate.
+    """
+    width, height = output_geometry(profile, is_vertical)
+    return (
+        f"fps={MEZZANINE_FPS},"
+        f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
+        f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,"
+        f"setsar=1,format=yuv420p"
+    )
+
+
+def encode_segment(
+    source_path: Path,
+    output_path: Path,
+    is_vertical: bool,
+    pre_filter: str | None = None,
+    duration: float | None = None,
+    threads: int | None = None,
+    profile: str | None = None,
+):
+    """
+    Transcodes a source clip into a mezzanine segment for the given encoding profile.
+
+    Args:
+        pre_filter (str | None): Optional filter chain applied before normalisation
+            (e.g. the title drawtext chain).
+        duration (float | None): Optional input duration limit in seconds.
+
+    Notes:
+    - Sources without audio get a silent track so every segment has the same
+      stream layout, which the concat demuxer requires for stream copy.
+    """
+    encoding = get_profile(profile)
+    source_info = probe_media(source_path)
+    has_audio = source_info["has_audio"]
+    video_filter = normalise_filter(is_vertical, encoding)
+    if pre_filter:
+        video_filter = f"{pre_filter},{video_filter}"
+
+    ffmpeg_cmd = ["ffmpeg", "-y"]
+    if duration:
+        ffmpeg_cmd += ["-t", str(duration)]
+    ffmpeg_cmd += ["-i", str(source_path)]
+    if not has_audio:
+        ffmpeg_cmd += ["-f", "lavfi", "-i", f"anullsrc=r={AUDIO_RATE}:cl=stereo"]
+    ffmpeg_cmd += [
+        "-map", "0:v:0",
+        "-map", "0:a:0" if has_audio else "1:a:0",
+        "-vf", video_filter,
+        *video_encode_args(encoding),
+        *audio_encode_args(encoding),
+        "-shortest",
+    ]
+    if threads:
+        ffmpeg_cmd += ["-threads", str(threads)]
+    ffmpeg_cmd.append(str(output_path))
+
+    if DEBUG:
+        print(f"[DEBUG] mezzanine encode command: {ffmpeg_cmd}")
+    expected = min(filter(None, [duration, source_info.get("duration")]), default=None)
+    run_ffmpeg(ffmpeg_cmd, stage="mezzanine-segment", duration=expected)
+
+
+def _segment_path(label: str, source_path: Path, mezzanine_dir: Path, encoding: dict) -> Path:
+    st = Path(source_path).stat()
+    stamp = f"{source_path}:{st.st_size}:{st.st_mtime_ns}:{sorted(encoding.items())}"
+    digest = hashlib.sha256(stamp.encode("utf-8")).hexdigest()[:16]
+    return Path(mezzanine_dir) / f"{label}-{encoding['name']}-{digest}.mp4"
+
+
+def prepare_mezzanine_assets(
+    mezzanine_dir: Path = MEZZANINE_DIR,
+    threads: int | None = None,
+    profile: str | None = None,
+) -> dict:
+    """
+    One-time preparation step: transcodes each branded intro/outro into a mezzanine segment.
+    Segments are named after a hash of the source stamp and encoding profile, so an
+    updated asset or profile produces a fresh segment and unchanged ones are reused.
+
+    Returns:
+        dict: Asset label → mezzanine segment path.
+    """
+    mezzanine_dir = Path(mezzanine_dir)
+    mezzanine_dir.mkdir(parents=True, exist_ok=True)
+    encoding = get_profile(profile)
+    segments = {}
+
+    for label, (source_path, is_vertical) in BRANDED_ASSETS.items():
+        source_path = map_path(source_path)
+        segment_path = _segment_path(label, source_path, mezzanine_dir, encoding)
+        if not segment_path.exists():
+            print(f"🧱 Preparing mezzanine segment: {label} → {segment_path.name}")
+            temp_path = segment_path.with_name(f"{segment_path.stem}.{uuid.uuid4().hex}.tmp.mp4")
+            try:
+                encode_segment(source_path, temp_path, is_vertical, threads=threads, profile=encoding["name"])
+                temp_path.replace(segment_path)
+            finally:
+                if temp_path.exists():
+                    temp_path.unlink()
+        segments[label] = segment_path
+
+    return segments
+
+
+def _music_path(music_path: Path, mezzanine_dir: Path) -> Path:
+    st = Path(music_path).stat()
+    stamp = f"{music_path}:{st.st_size}:{st.st_mtime_ns}:{AUDIO_RATE}:{AUDIO_CHANNELS}"
+    digest = hashlib.sha256(stamp.encode("utf-8")).hexdigest()[:16]
+    return Path(mezzanine_dir) / f"music-{digest}.wav"
+
+
+def prepare_music(music_path: Path = THEME_MUSIC_PATH, mezzanine_dir: Path = MEZZANINE_DIR) -> Path:
+    """
+    Decodes the theme music once to PCM at the mezzanine sample rate and layout,
+    so renders mix it without re-decoding and resampling the MP3 every time.
+
+    Returns:
+        Path: The decoded WAV (named after the source stamp, like the segments).
+    """
+    mezzanine_dir = Path(mezzanine_dir)
+    mezzanine_dir.mkdir(parents=True, exist_ok=True)
+    decoded_path = _music_path(music_path, mezzanine_dir)
+    if not decoded_path.exists():
+        print(f"🎵 Decoding theme music → {decoded_path.name}")
+        temp_path = decoded_path.with_name(f"{decoded_path.stem}.{uuid.uuid4().hex}.tmp.wav")
+        try:
+            run_ffmpeg(
+                ["ffmpeg", "-y", "-i", str(music_path), "-vn",
+                 "-c:a", "pcm_s16le", "-ar", str(AUDIO_RATE), "-ac", str(AUDIO_CHANNELS), str(temp_path)],
+                stage="decode-music",
+            )
+            temp_path.replace(decoded_path)
+        finally:
+            if temp_path.exists():
+                temp_path.unlink()
+    return decoded_path
+
+
+def prepared_music(music_path: Path = THEME_MUSIC_PATH, mezzanine_dir: Path = MEZZANINE_DIR) -> Path:
+    """
+    Returns the decoded theme music if it has been prepared, else the original file.
+    """
+    try:
+        decoded_path = _music_path(music_path, mezzanine_dir)
+    except OSError:
+        return Path(music_path)
+    return decoded_path if decoded_path.exists() else Path(music_path)
+
+
+def prune_mezzanine(mezzanine_dir: Path = MEZZANINE_DIR, music_path: Path = THEME_MUSIC_PATH) -> int:
+    """
+    Deletes segments and decoded music built from asset versions that no longer exist.
+
+    Returns:
+        int: Number of files removed.
+    """
+    mezzanine_dir = Path(mezzanine_dir)
+    current = set()
+    for label, (source_path, _) in BRANDED_ASSETS.items():
+        try:
+            for name in ENCODING_PROFILES:
+                current.add(_segment_path(label, map_path(source_path), mezzanine_dir, get_profile(name)).name)
+        except OSError:
+            continue
+    try:
+        current.add(_music_path(music_path, mezzanine_dir).name)
+    except OSError:
+        pass
+
+    removed = 0
+    for path in mezzanine_dir.glob("*"):
+        # Segments are named "<label>-<profile>-<digest>.mp4"
+        derived = path.name.startswith("music-") or path.name.split("-", 1)[0] in BRANDED_ASSETS
+        if derived and path.name not in current and path.suffix in (".mp4", ".wav") and ".tmp." not in path.name:
+            path.unlink(missing_ok=True)
+            removed += 1
+            if DEBUG:
+                print(f"[DEBUG] Removed stale mezzanine file {path.name}")
+    return removed
+
+
+def can_stream_copy(montage_path: Path, is_vertical: bool) -> bool:
+    """
+    Returns True if the montage already has the native output geometry and an audio
+    track, i.e. its body can be encoded to mezzanine parameters without padding and
+    joined to the prepared segments by stream copy.
+    """
+    info = probe_media(montage_path)
+    native = NATIVE_VERTICAL if is_vertical else NATIVE_WIDE
+    return (info["width"], info["height"]) == native and info["has_audio"]
+
+
+def render_montage_stream_copy(
+    title_intro_path: Path,
+    montage_path: Path,
+    outro_segment_path: Path,
+    music_path: Path,
+    output_path: Path,
+    is_vertical: bool = False,
+    threads: int | None = None,
+    profile: str | None = None,
+):
+    """
+    Assembles the final video from mezzanine segments with the concat demuxer.
+
+    Only the montage body (with the music mix) is encoded; the title intro and outro
+    segments are stream-copied. title_intro_path and outro_segment_path must be
+    mezzanine segments prepared with the same encoding profile.
+    """
+    output_path = Path(output_path)
+    encoding = get_profile(profile)
+    job_id = uuid.uuid4().hex
+    body_path = output_path.with_name(f"{output_path.stem}.{job_id}.body.mp4")
+    list_path = output_path.with_name(f"{output_path.stem}.{job_id}.concat.txt")
+
+    filter_complex = (
+        f"[0:v:0]{normalise_filter(is_vertical, encoding)}[outv];"
+        f"[0:a:0][1:a:0]amix=inputs=2:duration=first,"
+        f"aformat=sample_rates={AUDIO_RATE}:channel_layouts=stereo[outa]"
+    )
+    body_cmd = [
+        "ffmpeg", "-y",
+        "-i", str(montage_path),  # 0 = montage content
+        "-i", str(music_path),    # 1 = background music
+        "-filter_complex", filter_complex,
+        "-map", "[outv]",
+        "-map", "[outa]",
+        *video_encode_args(encoding),
+        *audio_encode_args(encoding),
+    ]
+    if threads:
+        body_cmd += ["-threads", str(threads)]
+    body_cmd.append(str(body_path))
+
+    try:
+        run_ffmpeg(body_cmd, stage="stream-copy-body", duration=probe_media(montage_path).get("duration"))
+
+        with open(list_path, "w", encoding="utf-8") as f:
+            for segment in (title_intro_path, body_path, outro_segment_path):
+                escaped = str(Path(segment).resolve()).replace("'", r"'\''")
+                f.write(f"file '{escaped}'\n")
+
+        concat_cmd = [
+            "ffmpeg", "-y",
+            "-f", "concat", "-safe", "0",
+            "-i", str(list_path),
+            "-c", "copy",
+            "-movflags", "+faststart",
+            str(output_path),
+        ]
+        if DEBUG:
+            print(f"[DEBUG] stream-copy concat command: {concat_cmd}")
+        run_ffmpeg(concat_cmd, stage="stream-copy-concat")
+    finally:
+        for temp_path in (body_path, list_path):
+            if temp_path.exists():
+                temp_path.unlink()
@@ -0,0 +1,299 @@
+# modules/pipeline.py
+#
+# Asynchronous staged pipeline: render → thumbnail → describe → upload → archive.
+# Each stage has its own bounded queue and worker count, so clip N can upload
+# while clip N+1 renders and clip N+2's description is being generated.
+# Stage handlers are plain blocking functions; CPU-bound ones run in a process
+# pool, network/IO-bound ones in threads.
+
+import time
+import asyncio
+import tempfile
+import traceback
+from pathlib import Path
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+from modules.config import PIPELINE_CONCURRENCY, PIPELINE_QUEUE_SIZE, DEBUG
+
+STAGES = ("render", "thumbnail", "describe", "upload", "archive")
+
+# Stages whose handlers run in a process pool (everything else runs in threads)
+PROCESS_STAGES = {"render"}
+
+_SENTINEL = object()
+
+
+def parse_stage_limits(spec: str | None) -> dict:
+    """
+    Parses "render=2,upload=1" into {"render": 2, "upload": 1}.
+
+    Raises:
+        ValueError: On unknown stage names or non-positive limits.
+    """
+    limits = {}
+    for part in filter(None, (spec or "").split(",")):
+        name, _, value = part.partition("=")
+        name = name.strip()
+        if name not in STAGES:
+            raise ValueError(f"Unknown pipeline stage '{name}' (choose from {', '.join(STAGES)})")
+        limits[name] = int(value)
+        if limits[name] < 1:
+            raise ValueError(f"Stage limit for '{name}' must be >= 1")
+    return limits
+
+
+async def _stage_worker(name, handler, inbox, outbox, executor, stats):
+    loop = asyncio.get_running_loop()
+    while True:
+        job = await inbox.get()
+        if job is _SENTINEL:
+            inbox.task_done()
+            return
+
+        if job["error"] is None:
+            started = time.perf_counter()
+            try:
+                if executor is not None:
+                    job = await loop.run_in_executor(executor, handler, job)
+                else:
+                    job = await asyncio.to_thread(handler, job)
+            except Exception as e:
+                job["error"] = f"{name}: {type(e).__name__}: {e}"
+                print(f"❌ [{name}] {job['clip'].name} → {e}")
+                if DEBUG:
+                    traceback.print_exc()
+            elapsed = time.perf_counter() - started
+            job["timings"][name] = round(elapsed, 3)
+            stats[name]["busy"] += elapsed
+            stats[name]["count"] += 1
+            if job["error"] is None:
+                print(f"✅ [{name}] {job['clip'].name} ({elapsed:.1f}s)")
+
+        # Failed jobs still flow downstream (untouched) so results stay in one place
+        await outbox.put(job)
+        inbox.task_done()
+
+
+async def _iterate(clips):
+    if hasattr(clips, "__aiter__"):
+        async for clip_path in clips:
+            yield clip_path
+    else:
+        for clip_path in clips:
+            yield clip_path
+
+
+async def run_pipeline_async(
+    clips: list[Path],
+    handlers: dict,
+    concurrency: dict | None = None,
+    queue_size: int = PIPELINE_QUEUE_SIZE,
+    on_result=None,
+) -> list[dict]:
+    """
+    Runs clips through the configured stages with bounded queues between them.
+
+    Args:
+        clips (list[Path]): Montage clips to process, or an async iterator of clips
+            (e.g. watch mode) that is consumed as clips arrive.
+        handlers (dict): Stage name → blocking callable `handler(job) -> job`.
+            Stages are run in STAGES order; stages without a handler are skipped.
+        concurrency (dict | None): Stage name → worker count (defaults to PIPELINE_CONCURRENCY).
+        queue_size (int): Maximum jobs waiting in front of each stage (backpressure).
+        on_result: Optional callback invoked with each finished (or failed) job.
+
+    Returns:
+        list[dict]: One job record per clip, in completion order. Empty when clips
+            is an async iterator: a stream can run indefinitely, so its jobs are
+            only handed to on_result and not kept.
+    """
+    limits = {**PIPELINE_CONCURRENCY, **(concurrency or {})}
+    stages = [name for name in STAGES if name in handlers]
+    queues = [asyncio.Queue(maxsize=queue_size) for _ in stages]
+    done_queue = asyncio.Queue()
+    stats = {name: {"busy": 0.0, "count": 0} for name in stages}
+
+    process_pool = None
+    if any(name in PROCESS_STAGES for name in stages):
+        from modules.scheduler import process_context
+
+        process_pool = ProcessPoolExecutor(
+            max_workers=max(limits.get(n, 1) for n in PROCESS_STAGES),
+            mp_context=process_context()
+        )
+
+    workers = []
+    for index, name in enumerate(stages):
+        outbox = queues[index + 1] if index + 1 < len(stages) else done_queue
+        executor = process_pool if name in PROCESS_STAGES else None
+        workers.append([
+            asyncio.create_task(_stage_worker(name, handlers[name], queues[index], outbox, executor, stats))
+            for _ in range(limits.get(name, 1))
+        ])
+
+    async def feed():
+        try:
+            async for clip_path in _iterate(clips):
+                await queues[0].put({
+                    "clip": Path(clip_path),
+                    "error": None,
+                    "timings": {},
+                    "started": datetime.now().isoformat(timespec="seconds"),
+                })
+            # Shut stages down in order: a stage only stops once everything upstream has drained
+            for index, stage_workers in enumerate(workers):
+                for _ in stage_workers:
+                    await queues[index].put(_SENTINEL)
+                await asyncio.gather(*stage_workers)
+        finally:
+            await done_queue.put(_SENTINEL)
+
+    started = time.perf_counter()
+    feeder = asyncio.create_task(feed())
+    keep_results = not hasattr(clips, "__aiter__")
+    results = []
+    counts = {"completed": 0, "total": 0}
+    try:
+        while (job := await done_queue.get()) is not _SENTINEL:
+            counts["total"] += 1
+            counts["completed"] += job["error"] is None
+            if keep_results:
+                results.append(job)
+            if on_result:
+                on_result(job)
+        await feeder
+    finally:
+        if process_pool is not None:
+            process_pool.shutdown()
+
+    print_pipeline_summary(results, stats, limits, time.perf_counter() - started, counts)
+    return results
+
+
+def run_pipeline(clips: list[Path], handlers: dict, **kwargs) -> list[dict]:
+    """
+    Synchronous wrapper around run_pipeline_async for CLI entry points.
+    """
+    return asyncio.run(run_pipeline_async(clips, handlers, **kwargs))
+
+
+def print_pipeline_summary(results: list[dict], stats: dict, limits: dict, wall_seconds: float,
+                           counts: dict | None = None) -> None:
+    """
+    Prints per-stage utilisation. counts ({"completed", "total"}) covers jobs that
+    weren't kept in results (streamed runs); failures are listed for kept jobs only.
+    """
+    if counts is None:
+        counts = {"completed": sum(job["error"] is None for job in results), "total": len(results)}
+    print("\n📊 Pipeline summary")
+    print(f"   Clips:      {counts['completed']}/{counts['total']} completed")
+    print(f"   Wall time:  {wall_seconds:.1f}s")
+    for name, stage in stats.items():
+        # Utilisation > 1 means the stage's workers genuinely overlapped
+        utilisation = stage["busy"] / wall_seconds if wall_seconds else 0.0
+        print(
+            f"   {name:<10} workers={limits.get(name, 1)} jobs={stage['count']} "
+            f"busy={stage['busy']:.1f}s utilisation={utilisation:.2f}"
+        )
+    for job in results:
+        if job["error"]:
+            print(f"   ❌ {job['clip']} → {job['error']}")
+
+
+# ---------------------------------------------------------------------------
+# Default stage handlers (render is supplied by the caller, see main.py)
+# ---------------------------------------------------------------------------
+
+def thumbnail_stage(job: dict) -> dict:
+    from modules.thumbnail_utils import generate_thumbnail
+    from modules.thumbnail_compositor import compose_thumbnail
+    from modules.date_utils import parse_stream_date
+
+    output_path = Path(job["output"])
+    date_str = parse_stream_date(job["clip"]).strftime("%B %d, %Y").replace(" 0", " ")
+    # The picked frame is a lossless temp file, so the thumbnail is JPEG-encoded once
+    with tempfile.TemporaryDirectory(prefix="thumbnail-") as tmp_dir:
+        frame_path = generate_thumbnail(output_path, Path(tmp_dir) / f"{output_path.stem}-frame.png")
+        job["thumbnail"] = compose_thumbnail(
+            frame_path,
+            output_path.with_suffix(".jpg"),
+            date_str=date_str,
+            is_vertical=job.get("is_vertical"),
+        )
+    return job
+
+
+def describe_stage(job: dict) -> dict:
+    from modules.description_utils import generate_montage_description
+    from modules.title_utils import generate_montage_title, extract_session_metadata
+
+    job["title"] = generate_montage_title(extract_session_metadata(job["clip"]))
+    job["description"] = generate_montage_description()
+    return job
+
+
+def _upload_metadata(job: dict) -> dict:
+    return {
+        "title": job["title"],
+        "description": job["description"],
+        "privacy": "private" if DEBUG else "public",
+        "is_vertical": bool(job.get("is_vertical")),
+        "thumbnail": job.get("thumbnail"),
+    }
+
+
+def upload_stage(job: dict) -> dict:
+    """
+    Uploads to the same platforms the queue would: YouTube, plus PeerTube for wide clips.
+    """
+    from modules.upload_queue import default_platforms, default_uploaders
+
+    metadata = _upload_metadata(job)
+    uploaders = default_uploaders()
+    for platform in default_platforms(metadata["is_vertical"]):
+        job[f"{platform}_url"] = uploaders[platform](Path(job["output"]), metadata)
+    return job
+
+
+def enqueue_upload_stage(job: dict) -> dict:
+    """
+    Queues the upload instead of performing it (see modules/upload_queue.py).
+    The archive record travels with the job; the queue worker saves it with
+    each URL once that platform's upload is done, so no archive stage follows.
+    """
+    from modules.upload_queue import UploadQueue
+
+    metadata = {**_upload_metadata(job), "archive": _archive_record(job)}
+    job["upload_jobs"] = UploadQueue().enqueue(job["output"], metadata)
+    return job
+
+
+def _archive_record(job: dict) -> dict:
+    from modules.title_utils import extract_session_metadata
+
+    session_name = extract_session_metadata(job["clip"])
+    year, month, day = session_name.split(".")[:3]
+    output_path = Path(job["output"])
+    return {
+        "session_date": f"{year}-{month}-{day}",
+        "session_name": session_name,
+        "filename": output_path.name,
+        "stem": output_path.stem,
+        "source_clip": str(job["clip"]),
+        "clip_type": "montages",
+        "format": "vertical" if job.get("is_vertical") else "wide",
+        "title": job.get("title"),
+        "description": job.get("description"),
+        "thumbnail": job.get("thumbnail"),
+        "youtube_urls": [job["youtube_url"]] if job.get("youtube_url") else [],
+        "peertube_urls": [job["peertube_url"]] if job.get("peertube_url") else [],
+        "timings": job["timings"],
+    }
+
+
+def archive_stage(job: dict) -> dict:
+    from modules.metadata_utils import save_metadata_record
+
+    save_metadata_record(_archive_record(job))
+    return job
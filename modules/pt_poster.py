@@ -1,6 +1,369 @@
-def upload_to_peertube(video_path: Path, title: str, description: str) -> str:
+"""
+pt_poster.py
+
+Uploads videos to PeerTube using the resumable upload API
+(POST /api/v1/videos/upload-resumable, then chunked PUTs with Content-Range).
+
+- One pooled requests.Session is shared by every upload in the process.
+- OAuth tokens are cached on disk (PEERTUBE_TOKEN_CACHE) and refreshed with the
+  refresh token before falling back to a password grant.
+- The upload session URL is persisted under UPLOAD_SESSION_DIR, keyed by the
+  file fingerprint, so a restarted process asks the server how much it already
+  has and continues from there.
+
+Author: Llama Chile Shop
+"""
+
+import os
+import json
+import time
+import random
+import threading
+from pathlib import Path
+from datetime import datetime
+from urllib.parse import urljoin
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from modules.config import (
+    PEERTUBE_URL,
+    PEERTUBE_USERNAME,
+    PEERTUBE_PASSWORD,
+    PEERTUBE_CHANNEL_ID,
+    PEERTUBE_PRIVACY,
+    PEERTUBE_CHUNK_SIZE,
+    PEERTUBE_TOKEN_CACHE,
+    UPLOAD_SESSION_DIR,
+    UPLOAD_MAX_RETRIES,
+    DEBUG,
+)
+from modules.render_manifest import fingerprint_file
+from modules.metrics import record_metrics
+
+# PeerTube category ID for "Gaming"
+CATEGORY_ID = 7
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class PeerTubeError(RuntimeError):
+    pass
+
+
+class PeerTubeClient:
     """
-    Stub for PeerTube upload – replace with real implementation later.
+    Authenticated PeerTube API client with a pooled HTTP session.
+
+    Args:
+        base_url (str): Instance URL, e.g. "https://peertube.example".
+        username (str): Account used for the password grant.
+        password (str): Account password.
+        token_cache (Path): JSON file holding the current OAuth tokens.
+        chunk_size (int): Bytes per PUT.
+        timeout (float): Per-request timeout in seconds.
     """
-    print("⚠️ PeerTube upload not yet implemented.")
-    return "https://peertube.example.com/video-placeholder"
+
+    def __init__(self, base_url: str = PEERTUBE_URL, username: str = PEERTUBE_USERNAME,
+                 password: str = PEERTUBE_PASSWORD, token_cache: Path = PEERTUBE_TOKEN_CACHE,
+                 chunk_size: int = PEERTUBE_CHUNK_SIZE, timeout: float = 120.0):
+        if not base_url:
+            raise PeerTubeError("PEERTUBE_URL is not configured")
+        self.base_url = base_url.rstrip("/") + "/"
+        self.username = username
+        self.password = password
+        self.token_cache = Path(token_cache)
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self._token = None
+        self._token_lock = threading.Lock()
+
+    def _url(self, path: str) -> str:
+        return urljoin(self.base_url, path.lstrip("/"))
+
+    # -- OAuth ---------------------------------------------------------------
+
+    def _load_cached_token(self) -> dict | None:
+        try:
+            with open(self.token_cache, "r", encoding="utf-8") as f:
+                token = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return token if token.get("base_url") == self.base_url else None
+
+    def _store_token(self, token: dict) -> dict:
+        token = {
+            **token,
+            "base_url": self.base_url,
+            "expires_at": time.time() + token.get("expires_in", 0),
+        }
+        self.token_cache.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.token_cache.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(token, f)
+        os.replace(tmp_path, self.token_cache)
+        return token
+
+    def _request_token(self, grant: dict) -> dict:
+        client = self.session.get(self._url("/api/v1/oauth-clients/local"), timeout=self.timeout)
+        client.raise_for_status()
+        client = client.json()
+        response = self.session.post(
+            self._url("/api/v1/users/token"),
+            data={"client_id": client["client_id"], "client_secret": client["client_secret"], **grant},
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        return self._store_token(response.json())
+
+    def access_token(self, force_refresh: bool = False) -> str:
+        """
+        Returns a valid access token, refreshing or re-authenticating as needed.
+        """
+        with self._token_lock:
+            token = None if force_refresh else (self._token or self._load_cached_token())
+            if token and token.get("expires_at", 0) > time.time() + 60:
+                self._token = token
+                return token["access_token"]
+
+            refresh_token = (token or self._token or self._load_cached_token() or {}).get("refresh_token")
+            token = None
+            if refresh_token:
+                try:
+                    token = self._request_token({"grant_type": "refresh_token", "refresh_token": refresh_token})
+                except requests.HTTPError as e:
+                    if DEBUG:
+                        print(f"[DEBUG] PeerTube token refresh failed, using password grant: {e}")
+            if token is None:
+                if not (self.username and self.password):
+                    raise PeerTubeError("PEERTUBE_USERNAME / PEERTUBE_PASSWORD are not configured")
+                token = self._request_token({
+                    "grant_type": "password",
+                    "username": self.username,
+                    "password": self.password,
+                })
+            self._token = token
+            return token["access_token"]
+
+    def _authed(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Sends an authenticated request, retrying once with a fresh token on 401.
+        """
+        for attempt in range(2):
+            headers = {**kwargs.pop("headers", {}), "Authorization": f"Bearer {self.access_token(force_refresh=attempt > 0)}"}
+            response = self.session.request(method, url, headers=headers, timeout=self.timeout, **kwargs)
+            if response.status_code != 401:
+                return response
+            kwargs["headers"] = headers
+        return response
+
+    # -- resumable upload ----------------------------------------------------
+
+    def start_upload(self, video_path: Path, fields: dict) -> str:
+        """
+        Opens a resumable upload session and returns its absolute URL.
+        """
+        response = self._authed(
+            "POST",
+            self._url("/api/v1/videos/upload-resumable"),
+            json={"filename": video_path.name, **fields},
+            headers={
+                "X-Upload-Content-Length": str(video_path.stat().st_size),
+                "X-Upload-Content-Type": "video/mp4",
+            },
+        )
+        if response.status_code not in (200, 201):
+            raise PeerTubeError(f"Couldn't start upload ({response.status_code}): {response.text[:300]}")
+        return urljoin(self.base_url, response.headers["Location"])
+
+    def query_offset(self, upload_url: str, total_bytes: int) -> int | None:
+        """
+        Asks the server how many bytes of an upload session it has.
+
+        Returns:
+            int | None: Next byte to send, or None if the session no longer exists.
+        """
+        response = self._authed(
+            "PUT", upload_url,
+            headers={"Content-Range": f"bytes */{total_bytes}", "Content-Length": "0"},
+        )
+        if response.status_code in (404, 410):
+            return None
+        if response.status_code in (200, 201):
+            return total_bytes
+        return _next_offset(response)
+
+    def send_chunks(self, upload_url: str, video_path: Path, offset: int, on_progress=None) -> dict:
+        """
+        PUTs the file from `offset` in chunk_size pieces.
+
+        Returns:
+            dict: The final JSON response (contains the created video).
+        """
+        total_bytes = video_path.stat().st_size
+        with open(video_path, "rb") as f:
+            while True:
+                f.seek(offset)
+                chunk = f.read(self.chunk_size)
+                end = offset + len(chunk) - 1
+                response = self._authed(
+                    "PUT", upload_url,
+                    data=chunk,
+                    headers={
+                        "Content-Type": "application/octet-stream",
+                        "Content-Range": f"bytes {offset}-{end}/{total_bytes}",
+                    },
+                )
+                if response.status_code in (200, 201):
+                    if on_progress:
+                        on_progress(total_bytes, len(chunk))
+                    return response.json()
+                if response.status_code != 308:
+                    response.raise_for_status()
+                    raise PeerTubeError(f"Unexpected upload response {response.status_code}")
+                new_offset = _next_offset(response)
+                if on_progress:
+                    on_progress(new_offset, new_offset - offset)
+                offset = new_offset
+
+    def upload(self, video_path: Path, fields: dict, session_dir: Path = UPLOAD_SESSION_DIR,
+               max_retries: int = UPLOAD_MAX_RETRIES) -> str:
+        """
+        Uploads a video, resuming a persisted session when there is one.
+
+        Args:
+            video_path (Path): File to upload.
+            fields (dict): Video attributes (name, channelId, description, privacy, ...).
+            session_dir (Path): Where upload session URLs are persisted.
+            max_retries (int): Consecutive failures tolerated before giving up.
+
+        Returns:
+            str: Watch URL of the uploaded video.
+        """
+        video_path = Path(video_path)
+        total_bytes = video_path.stat().st_size
+        session_path = Path(session_dir) / f"peertube-{fingerprint_file(video_path)}.json"
+        upload_url = _load_session_url(session_path)
+        started = time.perf_counter()
+        sent = {"bytes": 0}
+        resumed = upload_url is not None
+        retries = 0
+
+        def on_progress(position, sent_now):
+            sent["bytes"] += sent_now
+            elapsed = time.perf_counter() - started
+            rate = sent["bytes"] / elapsed / 1024**2 if elapsed else 0.0
+            print(f"⏫ {video_path.name}: {position / total_bytes * 100:5.1f}% "
+                  f"({position / 1024**2:.0f}/{total_bytes / 1024**2:.0f} MiB, {rate:.1f} MiB/s)")
+
+        while True:
+            try:
+                offset = self.query_offset(upload_url, total_bytes) if upload_url else None
+                if offset is None:
+                    if upload_url:
+                        print(f"[WARN] Saved PeerTube session for {video_path.name} expired; restarting upload")
+                    upload_url = self.start_upload(video_path, fields)
+                    _save_session_url(session_path, video_path, upload_url)
+                    offset = 0
+                elif offset:
+                    print(f"🔁 Resuming PeerTube upload of {video_path.name} at {offset / 1024**2:.0f} MiB")
+                result = self.send_chunks(upload_url, video_path, offset, on_progress)
+                break
+            except (requests.ConnectionError, requests.Timeout, requests.HTTPError) as e:
+                status = getattr(e.response, "status_code", None)
+                if status is not None and status not in RETRYABLE_STATUS_CODES:
+                    raise
+                retries += 1
+                if retries > max_retries:
+                    print(f"❌ PeerTube upload of {video_path.name} failed after {max_retries} retries; session kept for resume")
+                    raise
+                delay = random.uniform(0, min(2 ** retries, 64))
+                print(f"[WARN] PeerTube upload error on {video_path.name} ({e}); retry {retries}/{max_retries} in {delay:.1f}s")
+                time.sleep(delay)
+
+        session_path.unlink(missing_ok=True)
+        elapsed = time.perf_counter() - started
+        record_metrics({
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "stage": "upload:peertube",
+            "output": str(video_path),
+            "wall_seconds": round(elapsed, 3),
+            "output_bytes": total_bytes,
+            "sent_bytes": sent["bytes"],
+            "resumed": resumed,
+            "mib_per_second": round(sent["bytes"] / elapsed / 1024**2, 3) if elapsed else None,
+        })
+        video = result["video"]
+        return self._url(f"/w/{video.get('shortUUID') or video['uuid']}")
+
+
+def _next_offset(response: requests.Response) -> int:
+    # 308 "Range: bytes=0-N" means bytes 0..N arrived; no Range header means nothing did
+    received = response.headers.get("Range")
+    if not received:
+        return 0
+    return int(received.split("-")[-1]) + 1
+
+
+def _load_session_url(session_path: Path) -> str | None:
+    try:
+        with open(session_path, "r", encoding="utf-8") as f:
+            return json.load(f).get("upload_url")
+    except (OSError, ValueError):
+        return None
+
+
+def _save_session_url(session_path: Path, video_path: Path, upload_url: str) -> None:
+    session_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = session_path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "upload_url": upload_url,
+            "video_path": str(video_path),
+            "created": datetime.now().isoformat(timespec="seconds"),
+        }, f)
+    os.replace(tmp_path, session_path)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> PeerTubeClient:
+    """
+    Returns the process-wide client so uploads share one connection pool and token.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = PeerTubeClient()
+        return _client
+
+
+def upload_to_peertube(video_path: Path, title: str, description: str, tags: list[str] | None = None) -> str:
+    """
+    Uploads a video to the configured PeerTube channel.
+
+    Returns:
+        str: Watch URL of the uploaded video.
+    """
+    video_path = Path(video_path)
+    print(f"📤 Uploading {video_path} to PeerTube...")
+    fields = {
+        "name": title[:120],
+        "channelId": PEERTUBE_CHANNEL_ID,
+        "description": description,
+        "privacy": PEERTUBE_PRIVACY,
+        "category": CATEGORY_ID,
+        "tags": (tags or ["Fortnite", "Gramps", "gaming"])[:5],
+        "waitTranscoding": True,
+    }
+    url = get_client().upload(video_path, fields)
+    print(f"✅ Uploaded to PeerTube: {url}")
+    return url
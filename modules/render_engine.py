@@ -1,6 +1,16 @@
-import subprocess
+import re
 from pathlib import Path
-from modules.config import DEBUG
+from modules.config import DEBUG, PROXY_SHORT_SIDE, PREVIEW_STILL_INTERVAL
+from modules.ffmpeg_runner import run_ffmpeg
+from modules.title_utils import build_title_filter, title_timing
+from modules.media_probe import probe_media, concat_normalise_filter
+from modules.encoding_profiles import get_profile, video_encode_args, audio_encode_args, scale_filter
+
+# Render paths selectable via config.RENDER_MODE / main.py --render-mode
+RENDER_MODES = ("two-pass", "single-pass", "stream-copy", "multi-output")
+
+# Output spec kinds for render_montage_multi_output
+OUTPUT_KINDS = ("video", "stills")
 
 def render_montage_clip(
     title_card_path: Path,
@@ -10,11 +20,16 @@ def render_montage_clip(
     outro_path: Path,
     music_path: Path,
     is_vertical: bool = False,
+    threads: int | None = None,
+    profile: str | None = None,
 ):
     """
     Combines intro (with title), montage, and outro into a final video.
     Uses ffmpeg for concatenation and audio overlay.
+    `threads` caps ffmpeg's worker threads when several renders run concurrently.
+    `profile` selects the encoding profile (see modules/encoding_profiles.py).
     """
+    encoding = get_profile(profile)
 
     if not title_card_path.exists():
         raise FileNotFoundError(f"[ERROR] Title card not found: {title_card_path}")
@@ -27,12 +42,17 @@ def render_montage_clip(
     if not music_path.exists():
         raise FileNotFoundError(f"[ERROR] Music track not found: {music_path}")
 
+    title_info = probe_media(title_card_path)
+    montage_info = probe_media(montage_path)
+    outro_info = probe_media(outro_path)
+
+    # Only normalise what the probed inputs actually need
     filter_complex = (
-        "[0:v:0]fps=30,setsar=1[v0];"
-        "[1:v:0]fps=30,setsar=1[v1];"
+        f"[0:v:0]{concat_normalise_filter(title_info)}[v0];"
+        f"[1:v:0]{concat_normalise_filter(montage_info)}[v1];"
         "[1:a:0]anull[a1];"
-        "[3:v:0]fps=30,setsar=1[v3];"
-        "[v0][v1][v3]concat=n=3:v=1:a=0[outv];"
+        f"[3:v:0]{concat_normalise_filter(outro_info)}[v3];"
+        f"[v0][v1][v3]concat=n=3:v=1:a=0{_scale_suffix(encoding, is_vertical)}[outv];"
         "[a1][2:a:0]amix=inputs=2:duration=first[outa]"
     )
 
@@ -46,13 +66,12 @@ def render_montage_clip(
         "-filter_complex", filter_complex,
         "-map", "[outv]",
         "-map", "[outa]",
-        "-c:v", "libx264",
-        "-preset", "ultrafast",
-        "-crf", "23",
-        "-c:a", "aac",
-        "-b:a", "192k",
-        str(output_path)
+        *video_encode_args(encoding),
+        *audio_encode_args(encoding),
     ]
+    if threads:
+        ffmpeg_cmd += ["-threads", str(threads)]
+    ffmpeg_cmd.append(str(output_path))
 
     if DEBUG:
         print(f"[DEBUG] Starting render_montage_clip")
@@ -63,4 +82,259 @@ def render_montage_clip(
         print(f"  output_dir exists? {output_path.parent.exists()}")
         print(f"[DEBUG] subprocess command: {ffmpeg_cmd}")
 
-    subprocess.run(ffmpeg_cmd, check=True)
+    run_ffmpeg(
+        ffmpeg_cmd,
+        stage="render",
+        duration=_total_duration(title_info, montage_info, outro_info),
+    )
+
+
+def _scale_suffix(encoding: dict, is_vertical: bool) -> str:
+    """
+    Returns ",scale=WxH" to append after concat for downscaling profiles, else "".
+    """
+    scale = scale_filter(encoding, is_vertical)
+    return f",{scale}" if scale else ""
+
+
+def _total_duration(*infos: dict) -> float | None:
+    """
+    Sums probed durations for progress/ETA reporting (None if any is unknown).
+    """
+    durations = [info.get("duration") for info in infos]
+    return sum(durations) if all(durations) else None
+
+
+def render_montage_single_pass(
+    stock_intro_path: Path,
+    overlay_text: list[str],
+    font_path: Path,
+    montage_path: Path,
+    output_path: Path,
+    outro_path: Path,
+    music_path: Path,
+    is_vertical: bool = False,
+    threads: int | None = None,
+    profile: str | None = None,
+):
+    """
+    Renders the final video in one ffmpeg invocation.
+
+    Unlike the two-pass path (generate_title_overlay → render_montage_clip), the title
+    drawtext and fade are applied to the stock intro inside the same filter graph as the
+    concat and music mix, so the intro is decoded and encoded exactly once and there is
+    no intermediate file or generation loss.
+    """
+    for label, path in [
+        ("Intro file", stock_intro_path),
+        ("Montage clip", montage_path),
+        ("Outro file", outro_path),
+        ("Music track", music_path),
+        ("Font file", font_path),
+    ]:
+        if not path.exists():
+            raise FileNotFoundError(f"[ERROR] {label} not found: {path}")
+
+    encoding = get_profile(profile)
+    segment_seconds, fade_start = title_timing(stock_intro_path)
+    title_filter = build_title_filter(overlay_text, font_path, fade_start=fade_start)
+    montage_info = probe_media(montage_path)
+    outro_info = probe_media(outro_path)
+
+    filter_complex = (
+        f"[0:v:0]{title_filter},{concat_normalise_filter(probe_media(stock_intro_path))}[v0];"
+        f"[1:v:0]{concat_normalise_filter(montage_info)}[v1];"
+        "[1:a:0]anull[a1];"
+        f"[3:v:0]{concat_normalise_filter(outro_info)}[v3];"
+        f"[v0][v1][v3]concat=n=3:v=1:a=0{_scale_suffix(encoding, is_vertical)}[outv];"
+        "[a1][2:a:0]amix=inputs=2:duration=first[outa]"
+    )
+
+    ffmpeg_cmd = [
+        "ffmpeg",
+        "-y",
+        "-t", str(segment_seconds),
+        "-i", str(stock_intro_path),  # 0 = stock intro, title drawn in-graph
+        "-i", str(montage_path),      # 1 = montage content
+        "-i", str(music_path),        # 2 = background music
+        "-i", str(outro_path),        # 3 = static outro
+        "-filter_complex", filter_complex,
+        "-map", "[outv]",
+        "-map", "[outa]",
+        *video_encode_args(encoding),
+        *audio_encode_args(encoding),
+    ]
+    if threads:
+        ffmpeg_cmd += ["-threads", str(threads)]
+    ffmpeg_cmd.append(str(output_path))
+
+    if DEBUG:
+        print(f"[DEBUG] Starting render_montage_single_pass")
+        print(f"[DEBUG] subprocess command: {ffmpeg_cmd}")
+
+    run_ffmpeg(
+        ffmpeg_cmd,
+        stage="render-single-pass",
+        duration=_total_duration({"duration": segment_seconds}, montage_info, outro_info),
+    )
+
+
+def default_output_specs(output_path: Path, profile: str | None = None) -> list[dict]:
+    """
+    Returns the standard multi-output set for a montage, named after output_path:
+    the final encode, a PROXY_SHORT_SIDE proxy (draft profile) and a preview
+    still every PREVIEW_STILL_INTERVAL seconds.
+    """
+    output_path = Path(output_path)
+    stem = output_path.stem
+    return [
+        {"name": "final", "kind": "video", "path": output_path, "profile": profile},
+        {"name": "proxy", "kind": "video", "path": output_path.with_name(f"{stem}-proxy.mp4"),
+         "profile": "draft", "short_side": PROXY_SHORT_SIDE},
+        {"name": "stills", "kind": "stills", "path": output_path.with_name(f"{stem}-still-%03d.jpg"),
+         "interval": PREVIEW_STILL_INTERVAL, "short_side": PROXY_SHORT_SIDE},
+    ]
+
+
+def _stills_glob(pattern: Path) -> str:
+    return re.sub(r"%0?\d*d", "*", Path(pattern).name)
+
+
+def build_output_graph(outputs: list[dict], is_vertical: bool, threads: int | None = None) -> tuple[str, list[str]]:
+    """
+    Fans the rendered "[outv]"/"[outa]" streams out to every output spec.
+
+    Each spec is a dict with "name", "kind" ("video" or "stills") and "path",
+    plus optional "profile" (encoding profile), "short_side" (overrides the
+    profile's size) and, for stills, "interval" in seconds and a printf-style
+    path such as "clip-still-%03d.jpg".
+
+    Returns:
+        tuple: (filter graph to append after the one producing [outv]/[outa],
+                ffmpeg output arguments for all specs)
+
+    Raises:
+        ValueError: On an empty list, an unknown kind or duplicate names.
+    """
+    if not outputs:
+        raise ValueError("At least one output spec is required")
+    names = [spec["name"] for spec in outputs]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Output spec names must be unique: {names}")
+    for spec in outputs:
+        if spec.get("kind") not in OUTPUT_KINDS:
+            raise ValueError(f"Unknown output kind '{spec.get('kind')}' for '{spec['name']}'")
+
+    video_count = len(outputs)
+    audio_count = sum(1 for spec in outputs if spec["kind"] == "video")
+    graph = [f"[outv]split={video_count}" + "".join(f"[s{i}]" for i in range(video_count))]
+    if audio_count:
+        graph.append(f"[outa]asplit={audio_count}" + "".join(f"[sa{i}]" for i in range(audio_count)))
+
+    args = []
+    audio_index = 0
+    for index, spec in enumerate(outputs):
+        encoding = get_profile(spec.get("profile"))
+        if "short_side" in spec:
+            encoding["short_side"] = spec["short_side"]
+        filters = []
+        if spec["kind"] == "stills":
+            filters.append(f"fps=1/{spec.get('interval', PREVIEW_STILL_INTERVAL)}")
+        scale = scale_filter(encoding, is_vertical)
+        if scale:
+            filters.append(scale)
+        graph.append(f"[s{index}]{','.join(filters) or 'null'}[o{index}]")
+
+        args += ["-map", f"[o{index}]"]
+        if spec["kind"] == "video":
+            args += ["-map", f"[sa{audio_index}]", *video_encode_args(encoding), *audio_encode_args(encoding)]
+            audio_index += 1
+        else:
+            args += ["-q:v", "3"]
+        if threads:
+            args += ["-threads", str(threads)]
+        args.append(str(spec["path"]))
+
+    return ";".join(graph), args
+
+
+def render_montage_multi_output(
+    stock_intro_path: Path,
+    overlay_text: list[str],
+    font_path: Path,
+    montage_path: Path,
+    outro_path: Path,
+    music_path: Path,
+    outputs: list[dict],
+    is_vertical: bool = False,
+    threads: int | None = None,
+) -> dict:
+    """
+    Renders every output spec from one decode of the inputs.
+
+    Builds the same graph as render_montage_single_pass (title drawtext, concat and
+    music mix), then splits the result into one branch per spec, e.g. the final
+    encode, a 540p proxy and periodic preview stills (see default_output_specs).
+
+    Returns:
+        dict: Spec name → list of files written (one per video; every still).
+    """
+    for label, path in [
+        ("Intro file", stock_intro_path),
+        ("Montage clip", montage_path),
+        ("Outro file", outro_path),
+        ("Music track", music_path),
+        ("Font file", font_path),
+    ]:
+        if not path.exists():
+            raise FileNotFoundError(f"[ERROR] {label} not found: {path}")
+
+    segment_seconds, fade_start = title_timing(stock_intro_path)
+    title_filter = build_title_filter(overlay_text, font_path, fade_start=fade_start)
+    montage_info = probe_media(montage_path)
+    outro_info = probe_media(outro_path)
+    output_graph, output_args = build_output_graph(outputs, is_vertical, threads=threads)
+
+    filter_complex = (
+        f"[0:v:0]{title_filter},{concat_normalise_filter(probe_media(stock_intro_path))}[v0];"
+        f"[1:v:0]{concat_normalise_filter(montage_info)}[v1];"
+        "[1:a:0]anull[a1];"
+        f"[3:v:0]{concat_normalise_filter(outro_info)}[v3];"
+        "[v0][v1][v3]concat=n=3:v=1:a=0[outv];"
+        "[a1][2:a:0]amix=inputs=2:duration=first[outa];"
+        f"{output_graph}"
+    )
+
+    # Stills from an earlier (possibly longer) render would otherwise linger
+    for spec in outputs:
+        if spec["kind"] == "stills":
+            for stale in Path(spec["path"]).parent.glob(_stills_glob(spec["path"])):
+                stale.unlink()
+
+    ffmpeg_cmd = [
+        "ffmpeg",
+        "-y",
+        "-t", str(segment_seconds),
+        "-i", str(stock_intro_path),  # 0 = stock intro, title drawn in-graph
+        "-i", str(montage_path),      # 1 = montage content
+        "-i", str(music_path),        # 2 = background music
+        "-i", str(outro_path),        # 3 = static outro
+        "-filter_complex", filter_complex,
+        *output_args,
+    ]
+
+    if DEBUG:
+        print(f"[DEBUG] Starting render_montage_multi_output ({', '.join(spec['name'] for spec in outputs)})")
+        print(f"[DEBUG] subprocess command: {ffmpeg_cmd}")
+
+    run_ffmpeg(
+        ffmpeg_cmd,
+        stage="render-multi-output",
+        duration=_total_duration({"duration": segment_seconds}, montage_info, outro_info),
+    )
+
+    produced = {}
+    for spec in outputs:
+        path = Path(spec["path"])
+        produced[spec["name"]] = sorted(path.parent.glob(_stills_glob(path))) if spec["kind"] == "stills" else [path]
+    return produced
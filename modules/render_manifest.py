@@ -0,0 +1,193 @@
+# modules/render_manifest.py
+#
+# Persistent manifest of rendered montage clips.
+# Each entry records the clip's size, mtime and a fast content fingerprint,
+# plus the render settings and branded asset versions used, so reruns of
+# main.py only re-render clips that are new or actually changed.
+
+import json
+import os
+import hashlib
+from pathlib import Path
+from datetime import datetime
+
+from modules.encoding_profiles import get_profile
+from modules.storage_root import map_path, cached_stat
+from modules.config import (
+    MANIFEST_PATH,
+    RENDER_MODE,
+    TITLE_TEMPLATE,
+    BRANDING_COLORS,
+    INTRO_WIDE_PATH,
+    INTRO_VERTICAL_PATH,
+    OUTRO_WIDE_PATH,
+    OUTRO_VERTICAL_PATH,
+    THEME_MUSIC_PATH,
+    FONT_PATH,
+)
+
+MANIFEST_VERSION = 1
+
+# Bytes hashed from each end of a clip for the content fingerprint
+FINGERPRINT_CHUNK = 1024 * 1024
+
+
+def fingerprint_file(path: Path) -> str:
+    """
+    Returns a fast content fingerprint for a (potentially huge) media file.
+
+    Hashes the file size plus the first and last 1 MiB instead of the whole file,
+    which is enough to tell re-exported clips apart without streaming gigabytes
+    over SMB.
+    """
+    size = path.stat().st_size
+    digest = hashlib.blake2b(str(size).encode(), digest_size=16)
+    with open(path, "rb") as f:
+        digest.update(f.read(FINGERPRINT_CHUNK))
+        if size > FINGERPRINT_CHUNK:
+            f.seek(max(size - FINGERPRINT_CHUNK, FINGERPRINT_CHUNK))
+            digest.update(f.read(FINGERPRINT_CHUNK))
+    return digest.hexdigest()
+
+
+def render_settings(render_mode: str = RENDER_MODE, profile: str | None = None) -> dict:
+    """
+    Returns the settings that affect rendered output. A change here re-renders everything.
+    """
+    return {
+        "render_mode": render_mode,
+        "profile": get_profile(profile),
+        "title_template": TITLE_TEMPLATE,
+        "branding_colors": BRANDING_COLORS,
+    }
+
+
+def asset_versions() -> dict:
+    """
+    Returns size/mtime stamps for the branded assets baked into every render.
+    Missing assets are recorded as None rather than raising.
+    """
+    versions = {}
+    for label, path in [
+        ("intro_wide", INTRO_WIDE_PATH),
+        ("intro_vertical", INTRO_VERTICAL_PATH),
+        ("outro_wide", OUTRO_WIDE_PATH),
+        ("outro_vertical", OUTRO_VERTICAL_PATH),
+        ("music", THEME_MUSIC_PATH),
+        ("font", FONT_PATH),
+    ]:
+        try:
+            st = cached_stat(map_path(path))
+        except OSError:
+            st = None
+        versions[label] = f"{st.st_size}:{st.st_mtime_ns}" if st else None
+    return versions
+
+
+def load_manifest(manifest_path: Path = MANIFEST_PATH) -> dict:
+    """
+    Loads the manifest from disk, returning an empty manifest if it is missing or unreadable.
+    """
+    manifest_path = Path(manifest_path)
+    if manifest_path.exists():
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == MANIFEST_VERSION:
+                return data
+            print(f"[WARN] Ignoring manifest with unknown version: {manifest_path}")
+        except Exception as e:
+            print(f"[WARN] Couldn't read render manifest {manifest_path}: {e}")
+    return {"version": MANIFEST_VERSION, "clips": {}}
+
+
+def save_manifest(manifest: dict, manifest_path: Path = MANIFEST_PATH) -> None:
+    """
+    Atomically writes the manifest (temp file + rename) so a crash never leaves it half-written.
+    """
+    manifest_path = Path(manifest_path)
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = manifest_path.with_suffix(manifest_path.suffix + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+
+def needs_render(manifest: dict, clip_path: Path, settings: dict, assets: dict) -> bool:
+    """
+    Decides whether a clip must be (re-)rendered.
+
+    A clip is skipped only if its manifest entry matches the current render settings
+    and asset versions and the clip itself is unchanged. Size+mtime are checked first;
+    the content fingerprint is only computed when those differ (e.g. a copy that
+    touched the mtime but not the bytes).
+    """
+    entry = manifest["clips"].get(str(clip_path))
+    if not entry:
+        return True
+    if entry.get("settings") != settings or entry.get("assets") != assets:
+        return True
+
+    st = clip_path.stat()
+    if entry.get("size") == st.st_size and entry.get("mtime_ns") == st.st_mtime_ns:
+        return False
+    if entry.get("size") != st.st_size:
+        return True
+
+    if fingerprint_file(clip_path) != entry.get("fingerprint"):
+        return True
+
+    # Same bytes, new mtime: refresh the stamp so the next run takes the fast path
+    entry["mtime_ns"] = st.st_mtime_ns
+    return False
+
+
+def record_render(manifest: dict, clip_path: Path, settings: dict, assets: dict) -> None:
+    """
+    Records a successfully rendered clip in the manifest (caller saves it).
+    """
+    st = clip_path.stat()
+    manifest["clips"][str(clip_path)] = {
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "fingerprint": fingerprint_file(clip_path),
+        "settings": settings,
+        "assets": assets,
+        "rendered_at": datetime.now().isoformat(timespec="seconds"),
+    }
+
+
+def filter_pending_clips(
+    clips: list[Path],
+    manifest: dict,
+    force: bool = False,
+    since: datetime | None = None,
+    session_date_fn=None,
+    settings: dict | None = None,
+) -> list[Path]:
+    """
+    Returns the clips that still need rendering.
+
+    Args:
+        clips (list[Path]): Candidate clips from the NAS scan.
+        manifest (dict): Loaded manifest.
+        force (bool): Re-render everything regardless of the manifest.
+        since (datetime | None): Only consider sessions on or after this date.
+        session_date_fn: Callable mapping a clip path to its stream datetime.
+        settings (dict | None): Render settings for this run (defaults to render_settings()).
+    """
+    settings = settings or render_settings()
+    assets = asset_versions()
+    pending = []
+
+    for clip_path in clips:
+        if since and session_date_fn:
+            try:
+                if session_date_fn(clip_path) < since:
+                    continue
+            except ValueError:
+                continue
+        if force or needs_render(manifest, clip_path, settings, assets):
+            pending.append(clip_path)
+
+    return pending
@@ -0,0 +1,169 @@
+# modules/scheduler.py
+#
+# Parallel render scheduler for montage clips.
+# Runs a per-clip worker across a process pool, splits the available CPU cores
+# between concurrent ffmpeg jobs via `-threads`, isolates failures per clip and
+# prints a throughput summary once the batch is done.
+
+import os
+import time
+import traceback
+import multiprocessing
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from modules.config import DEBUG
+
+
+def available_cores() -> int:
+    """
+    Returns the number of CPU cores this process may use (affinity aware where supported).
+    """
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def process_context():
+    """
+    Returns the multiprocessing context render pools are created with.
+    By the time a pool starts, the parent already runs background threads (staging
+    prefetch, upload drainer, the LLM client's loop), and a forked child can inherit
+    one of their locks mid-use and deadlock. Workers come from a forkserver instead,
+    or are spawned where forkserver isn't available (Windows).
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
+def resolve_job_count(requested: int | None, clip_count: int) -> int:
+    """
+    Decides how many clips to render concurrently.
+
+    Args:
+        requested (int | None): Value from `--jobs`. None or 0 means "auto".
+        clip_count (int): Number of clips waiting to be rendered.
+
+    Returns:
+        int: Number of concurrent render jobs (always >= 1).
+
+    Notes:
+    - libx264 scales well up to ~4-6 threads per encode, so "auto" runs one job
+      per 4 cores rather than one job per core.
+    """
+    if requested is None or requested <= 0:
+        requested = max(1, available_cores() // 4)
+    return max(1, min(requested, max(clip_count, 1)))
+
+
+def threads_per_job(jobs: int, cores: int | None = None) -> int:
+    """
+    Splits the available cores evenly between concurrent ffmpeg jobs.
+    The result is passed to ffmpeg as `-threads N`.
+    """
+    cores = cores or available_cores()
+    return max(1, cores // max(jobs, 1))
+
+
+def _run_one(worker, clip_path: Path, threads: int) -> dict:
+    """
+    Runs the worker for a single clip inside a pool process.
+    Any exception is captured so one bad clip never takes down the batch.
+    """
+    started = time.perf_counter()
+    result = {"clip": str(clip_path), "ok": True, "error": None}
+    try:
+        worker(clip_path, threads=threads)
+    except Exception as e:
+        result["ok"] = False
+        result["error"] = f"{type(e).__name__}: {e}"
+        if DEBUG:
+            traceback.print_exc()
+    result["elapsed"] = time.perf_counter() - started
+    return result
+
+
+def run_render_batch(worker, clips: list[Path], jobs: int | None = None, on_result=None) -> list[dict]:
+    """
+    Renders a batch of clips concurrently.
+
+    Args:
+        worker: Picklable callable `worker(clip_path, threads=N)` (e.g. main.process_clip).
+        clips (list[Path]): Clips to render.
+        jobs (int | None): Concurrent jobs, or None/0 for auto.
+        on_result: Optional callback invoked in the parent process with each result
+            as soon as its clip finishes (e.g. to update the render manifest).
+
+    Returns:
+        list[dict]: One result per clip with keys clip, ok, error, elapsed.
+    """
+    if not clips:
+        return []
+
+    jobs = resolve_job_count(jobs, len(clips))
+    threads = threads_per_job(jobs)
+    print(f"🧵 Rendering {len(clips)} clip(s) with {jobs} job(s) × {threads} ffmpeg thread(s)")
+
+    batch_started = time.perf_counter()
+    results = []
+
+    if jobs == 1:
+        for clip_path in clips:
+            print(f"📦 Sending clip to processor: {clip_path}")
+            results.append(_run_one(worker, clip_path, threads))
+            _report_result(results[-1], len(results), len(clips))
+            if on_result:
+                on_result(results[-1])
+    else:
+        with ProcessPoolExecutor(max_workers=jobs, mp_context=process_context()) as pool:
+            futures = {
+                pool.submit(_run_one, worker, clip_path, threads): clip_path
+                for clip_path in clips
+            }
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # The pool process itself died (e.g. killed); record and keep going
+                    result = {
+                        "clip": str(futures[future]),
+                        "ok": False,
+                        "error": f"{type(e).__name__}: {e}",
+                        "elapsed": 0.0,
+                    }
+                results.append(result)
+                _report_result(result, len(results), len(clips))
+                if on_result:
+                    on_result(result)
+
+    print_summary(results, time.perf_counter() - batch_started, jobs)
+    return results
+
+
+def _report_result(result: dict, done: int, total: int) -> None:
+    if result["ok"]:
+        print(f"✅ [{done}/{total}] {result['clip']} ({result['elapsed']:.1f}s)")
+    else:
+        print(f"❌ [{done}/{total}] {result['clip']} → {result['error']}")
+
+
+def print_summary(results: list[dict], wall_seconds: float, jobs: int) -> None:
+    """
+    Prints a throughput summary for a finished render batch.
+    """
+    succeeded = [r for r in results if r["ok"]]
+    failed = [r for r in results if not r["ok"]]
+    busy_seconds = sum(r["elapsed"] for r in results)
+    per_hour = (len(succeeded) / wall_seconds * 3600) if wall_seconds > 0 else 0.0
+    speedup = (busy_seconds / wall_seconds) if wall_seconds > 0 else 0.0
+
+    print("\n📊 Render summary")
+    print(f"   Jobs:        {jobs}")
+    print(f"   Rendered:    {len(succeeded)}/{len(results)}")
+    print(f"   Wall time:   {wall_seconds:.1f}s")
+    print(f"   Clip time:   {busy_seconds:.1f}s (parallel speedup {speedup:.2f}x)")
+    print(f"   Throughput:  {per_hour:.1f} clips/hour")
+    for r in failed:
+        print(f"   ❌ {r['clip']} → {r['error']}")
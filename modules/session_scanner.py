@@ -0,0 +1,207 @@
+# modules/session_scanner.py
+#
+# One scandir-based walk of the NAS session tree, shared by every consumer.
+# Session directories are scanned concurrently on a thread pool (each scandir
+# is an SMB round trip, so latency overlaps instead of adding up), and the
+# size/mtime the directory listing already returned are kept with each clip.
+# The result is an in-memory snapshot: sessions → categories → clips.
+
+import os
+import re
+import time
+import threading
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from modules.config import SCAN_WORKERS, SCAN_SNAPSHOT_TTL, DEBUG
+
+CATEGORIES = ("hits", "misses", "montages", "outtakes")
+
+# YYYY.MM.DD or YYYY.MM.DD.N (anything after is tolerated, as parse_stream_date does)
+SESSION_PATTERN = re.compile(r"^(\d{4})\.(\d{2})\.(\d{2})(?:\.(\d+))?")
+
+
+@dataclass
+class ClipEntry:
+    path: Path
+    size: int
+    mtime_ns: int
+
+    @property
+    def name(self) -> str:
+        return self.path.name
+
+
+@dataclass
+class SessionEntry:
+    name: str
+    path: Path
+    session_date: str
+    session_number: int
+    has_notes: bool = False
+    categories: dict[str, list[ClipEntry]] = field(default_factory=dict)
+
+
+@dataclass
+class ScanSnapshot:
+    root: Path
+    sessions: dict[str, SessionEntry]
+    stats: dict
+    taken_at: float = field(default_factory=time.monotonic)
+
+    def clips(self, category: str) -> list[ClipEntry]:
+        """
+        Returns every clip in one category across all sessions, in session order.
+        """
+        return [clip for session in self.sessions.values() for clip in session.categories.get(category, [])]
+
+    def session(self, name: str) -> SessionEntry | None:
+        return self.sessions.get(name)
+
+
+def _empty_session(path: Path, name: str) -> SessionEntry:
+    year, month, day, index = SESSION_PATTERN.match(name).groups()
+    return SessionEntry(
+        name=name,
+        path=path,
+        session_date=f"{year}-{month}-{day}",
+        session_number=int(index) if index else 1,
+    )
+
+
+def _scan_session(path: Path, name: str, categories: tuple[str, ...], counters: dict, lock: threading.Lock) -> SessionEntry:
+    session = _empty_session(path, name)
+
+    category_dirs = []
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.name == "notes.json" and entry.is_file():
+                session.has_notes = True
+            elif entry.name in categories and entry.is_dir():
+                category_dirs.append(entry)
+    scandirs = 1
+
+    for category_dir in sorted(category_dirs, key=lambda e: e.name):
+        clips = []
+        with os.scandir(category_dir.path) as entries:
+            for entry in entries:
+                if entry.name.lower().endswith(".mp4") and entry.is_file():
+                    st = entry.stat()  # free on Windows: FindNextFile already returned it
+                    clips.append(ClipEntry(Path(entry.path), st.st_size, st.st_mtime_ns))
+        scandirs += 1
+        session.categories[category_dir.name] = sorted(clips, key=lambda c: c.name)
+
+    with lock:
+        counters["scandirs"] += scandirs
+        counters["clips"] += sum(len(clips) for clips in session.categories.values())
+    return session
+
+
+def scan_sessions(root: Path, categories: tuple[str, ...] = CATEGORIES, max_workers: int = SCAN_WORKERS) -> ScanSnapshot:
+    """
+    Walks every session directory under root concurrently.
+
+    Args:
+        root (Path): NAS root holding YYYY.MM.DD[.N] session folders.
+        categories (tuple[str, ...]): Category subfolders to list.
+        max_workers (int): Session directories scanned in parallel.
+
+    Returns:
+        ScanSnapshot: Sessions (sorted by name) → categories → clips, plus timing stats.
+    """
+    root = Path(root)
+    started = time.perf_counter()
+    with os.scandir(root) as entries:
+        session_dirs = sorted(
+            (entry.name, Path(entry.path))
+            for entry in entries
+            if SESSION_PATTERN.match(entry.name) and entry.is_dir()
+        )
+    listed = time.perf_counter()
+
+    counters = {"scandirs": 1, "clips": 0}
+    lock = threading.Lock()
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        futures = [
+            pool.submit(_scan_session, path, name, categories, counters, lock)
+            for name, path in session_dirs
+        ]
+        sessions = {}
+        for future in futures:
+            try:
+                session = future.result()
+            except OSError as e:
+                # A session folder vanishing or being unreadable mid-walk shouldn't sink the scan
+                print(f"[WARN] Couldn't scan session folder: {e}")
+                continue
+            sessions[session.name] = session
+
+    wall = time.perf_counter() - started
+    stats = {
+        "sessions": len(sessions),
+        "clips": counters["clips"],
+        "scandirs": counters["scandirs"],
+        "workers": max_workers,
+        "root_list_seconds": round(listed - started, 3),
+        "wall_seconds": round(wall, 3),
+    }
+    print(f"🔍 Scanned {stats['sessions']} session(s), {stats['clips']} clip(s) "
+          f"with {stats['scandirs']} directory listings in {wall:.2f}s")
+    return ScanSnapshot(root=root, sessions=sessions, stats=stats)
+
+
+def scan_single_session(session_dir: Path, categories: tuple[str, ...] = CATEGORIES) -> SessionEntry:
+    """
+    Scans one session folder (for callers that only need that session).
+    A folder that doesn't exist (yet) is returned as a session with no clips.
+
+    Raises:
+        ValueError: If the folder name isn't a session name.
+    """
+    session_dir = Path(session_dir)
+    if not SESSION_PATTERN.match(session_dir.name):
+        raise ValueError(f"Invalid session folder format: {session_dir.name}")
+    try:
+        return _scan_session(session_dir, session_dir.name, categories, {"scandirs": 0, "clips": 0}, threading.Lock())
+    except FileNotFoundError:
+        return _empty_session(session_dir, session_dir.name)
+
+
+_snapshots: dict[str, ScanSnapshot] = {}
+_snapshots_lock = threading.Lock()
+
+
+def get_snapshot(root: Path, max_age: float = SCAN_SNAPSHOT_TTL, refresh: bool = False) -> ScanSnapshot:
+    """
+    Returns the shared snapshot for root, rescanning if it is older than max_age seconds.
+    """
+    key = str(Path(root))
+    with _snapshots_lock:
+        snapshot = _snapshots.get(key)
+        if refresh or snapshot is None or time.monotonic() - snapshot.taken_at > max_age:
+            snapshot = scan_sessions(root)
+            _snapshots[key] = snapshot
+        elif DEBUG:
+            print(f"[DEBUG] Reusing session scan of {key} ({time.monotonic() - snapshot.taken_at:.0f}s old)")
+        return snapshot
+
+
+def find_session(session_dir: Path) -> SessionEntry:
+    """
+    Returns a session from a shared snapshot of its parent if one is cached,
+    otherwise scans just that session.
+    """
+    session_dir = Path(session_dir)
+    with _snapshots_lock:
+        snapshot = _snapshots.get(str(session_dir.parent))
+    if snapshot is not None and time.monotonic() - snapshot.taken_at <= SCAN_SNAPSHOT_TTL:
+        session = snapshot.session(session_dir.name)
+        if session is not None:
+            return session
+    return scan_single_session(session_dir)
+
+
+def invalidate_snapshots() -> None:
+    with _snapshots_lock:
+        _snapshots.clear()
@@ -1,11 +1,10 @@
-import openai
 from pathlib import Path
 
-def generate_dynamic_description(notes_text: str, date: str, video_type: str) -> str:
-    """
-    Generates a YouTube description using OpenAI based on notes (if available),
-    video date, and video type.
-    """
+from modules.config import DEBUG
+from modules.description_store import get_cached_description, cache_description
+from modules.llm_client import get_client
+
+def _dynamic_description_request(notes_text: str, date: str, video_type: str) -> dict:
     base_prompt = (
         f"Write a fun, engaging YouTube description for a Fortnite {video_type} video "
         f"from {date}. Include light humor, emoticons, a call to subscribe, and relevant hashtags. "
@@ -17,30 +16,67 @@ def generate_dynamic_description(notes_text: str, date: str, video_type: str) ->
     else:
         prompt = base_prompt
 
-    response = openai.ChatCompletion.create(
-        model="gpt-4o",
-        messages=[{"role": "user", "content": prompt}],
-        temperature=0.9
-    )
+    return {
+        "model": "gpt-4o",
+        "messages": [{"role": "user", "content": prompt}],
+        "temperature": 0.9,
+        "purpose": "dynamic-description",
+    }
+
+def generate_dynamic_description(notes_text: str, date: str, video_type: str) -> str:
+    """
+    Generates a YouTube description using OpenAI based on notes (if available),
+    video date, and video type. Results are cached by notes/date/type.
+    """
+    cached = get_cached_description(notes_text, date, video_type)
+    if cached:
+        if DEBUG:
+            print(f"[DEBUG] Using cached description for {video_type} {date}")
+        return cached
+
+    description = get_client().complete_sync(**_dynamic_description_request(notes_text, date, video_type))
+    cache_description(notes_text, date, video_type, description)
+    return description
+
+def generate_dynamic_descriptions(items: list[tuple[str, str, str]]) -> list[str | Exception]:
+    """
+    Generates descriptions for a backlog of (notes_text, date, video_type) items in
+    parallel through the shared LLM client. Cached items are served without a request.
+
+    Returns:
+        list: Descriptions (or the exception for items that failed), in input order.
+    """
+    results = [get_cached_description(*item) for item in items]
+    missing = [index for index, cached in enumerate(results) if not cached]
+    generated = get_client().complete_many([_dynamic_description_request(*items[i]) for i in missing])
 
-    return response['choices'][0]['message']['content']
+    for index, description in zip(missing, generated):
+        results[index] = description
+        if isinstance(description, str):
+            cache_description(*items[index], description)
+    return results
 
 def upload_video(video_path: Path, title: str, description: str, is_vertical: bool):
     """
     Main upload dispatcher:
     - Always uploads to YouTube.
     - Uploads to PeerTube only if the video is NOT vertical.
+    Jobs go through the durable upload queue, so both platforms upload in
+    parallel and an interrupted upload is retried by the next drain. Only this
+    video's jobs are worked here; other queued uploads are left to their drain.
     """
-    print(f"📤 Uploading to YouTube: {video_path.name}")
-    yt_url = upload_to_youtube(video_path, title, description, is_short=is_vertical)
+    from modules.upload_queue import UploadQueue, drain
 
-    pt_url = None
-    if not is_vertical:
-        print(f"📤 Uploading to PeerTube: {video_path.name}")
-        # Placeholder: Implement actual PeerTube upload function.
-        pt_url = upload_to_peertube(video_path, title, description)
+    queue = UploadQueue()
+    queue.enqueue(video_path, {"title": title, "description": description, "is_vertical": is_vertical})
+    job_ids = [job["id"] for job in queue.jobs(video_path=video_path)]
+    print(f"📤 Uploading {video_path.name} ({'YouTube' if is_vertical else 'YouTube + PeerTube'})")
+    drain(queue, job_ids=job_ids)
+    # Jobs another process had already claimed finish there
+    queue.wait_for(job_ids)
 
+    urls = queue.urls_for(video_path)
     return {
-        "youtube": yt_url,
-        "peertube": pt_url,
+        "youtube": urls.get("youtube"),
+        "peertube": urls.get("peertube"),
     }
@@ -0,0 +1,334 @@
+# modules/staging_cache.py
+#
+# Local SSD staging for NAS-resident inputs and outputs.
+# ffmpeg decodes with lots of small random reads, which are slow over SMB.
+# Inputs are instead copied to STAGING_DIR with one sequential bulk read
+# (checksummed while copying and verified after), renders are written to local
+# disk, and the finished file is moved to rendered/ with one sequential write.
+# The cache is bounded by STAGING_MAX_BYTES with LRU eviction, and a Prefetcher
+# copies the next jobs' inputs while the current one renders. Inputs staged
+# through staged_inputs() carry an in-use marker until their render is done, and
+# eviction never deletes a file that has one. Failed renders and publishes
+# don't leave partial files behind, locally or as .part files on the NAS.
+
+import os
+import glob
+import json
+import time
+import shutil
+import hashlib
+import itertools
+import threading
+from pathlib import Path
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+from modules.config import STAGING_DIR, STAGING_MAX_BYTES, STAGING_COPY_BUFFER, DEBUG
+
+# A lock older than this belongs to a crashed process
+STALE_LOCK_SECONDS = 30 * 60
+# An in-use marker older than this was left by a crashed render
+STALE_IN_USE_SECONDS = 24 * 3600
+
+_hold_ids = itertools.count()
+
+
+class StagingError(RuntimeError):
+    pass
+
+
+def _staged_name(source: Path, st: os.stat_result) -> str:
+    # Keyed by source path + size + mtime: an edited source gets a fresh copy
+    key = hashlib.blake2b(f"{source}|{st.st_size}|{st.st_mtime_ns}".encode(), digest_size=10).hexdigest()
+    return f"{key}-{source.name}"
+
+
+def _copy_with_checksum(source: Path, dest: Path, buffer_size: int) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(source, "rb") as src, open(dest, "wb") as dst:
+        while chunk := src.read(buffer_size):
+            digest.update(chunk)
+            dst.write(chunk)
+    return digest.hexdigest()
+
+
+def file_checksum(path: Path, buffer_size: int = STAGING_COPY_BUFFER) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        while chunk := f.read(buffer_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _acquire_lock(lock_path: Path, timeout: float) -> None:
+    """
+    Takes an exclusive lock file, waiting for (or breaking a stale) holder.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return
+        except FileExistsError:
+            try:
+                if time.time() - lock_path.stat().st_mtime > STALE_LOCK_SECONDS:
+                    lock_path.unlink(missing_ok=True)
+                    continue
+            except FileNotFoundError:
+                continue
+            if time.monotonic() > deadline:
+                raise StagingError(f"Timed out waiting for {lock_path}")
+            time.sleep(0.5)
+
+
+def stage_file(source: Path, staging_dir: Path = STAGING_DIR, max_bytes: int = STAGING_MAX_BYTES,
+               verify: bool = False, buffer_size: int = STAGING_COPY_BUFFER, timeout: float = 3600) -> Path:
+    """
+    Returns a local copy of source, copying it into the staging cache if needed.
+
+    Args:
+        source (Path): File on the NAS.
+        staging_dir (Path): Local cache directory.
+        max_bytes (int): Cache size limit enforced after each copy.
+        verify (bool): Re-hash an existing cached copy against its recorded checksum.
+        buffer_size (int): Read/write size for the sequential copy.
+        timeout (float): Seconds to wait for another process staging the same file.
+
+    Returns:
+        Path: Local path with the same size and mtime as the source.
+    """
+    source = Path(source)
+    staging_dir = Path(staging_dir)
+    staging_dir.mkdir(parents=True, exist_ok=True)
+    st = source.stat()
+    local_path = staging_dir / _staged_name(source, st)
+    meta_path = local_path.with_name(local_path.name + ".json")
+    lock_path = local_path.with_name(local_path.name + ".lock")
+
+    cached = _valid_cached_copy(local_path, meta_path, st, verify)
+    if cached:
+        return cached
+
+    _acquire_lock(lock_path, timeout)
+    try:
+        # Another process may have staged it while we waited for the lock
+        cached = _valid_cached_copy(local_path, meta_path, st, verify)
+        if cached:
+            return cached
+
+        started = time.perf_counter()
+        tmp_path = local_path.with_name(f"{local_path.name}.{os.getpid()}.tmp")
+        checksum = _copy_with_checksum(source, tmp_path, buffer_size)
+        if file_checksum(tmp_path, buffer_size) != checksum:
+            tmp_path.unlink(missing_ok=True)
+            raise StagingError(f"Checksum mismatch staging {source}")
+        # Keep the source mtime so mtime-keyed caches (probe, intro) see the same file
+        os.utime(tmp_path, ns=(st.st_atime_ns, st.st_mtime_ns))
+        os.replace(tmp_path, local_path)
+        with open(meta_path, "w", encoding="utf-8") as f:
+            json.dump({"source": str(source), "size": st.st_size, "checksum": checksum}, f)
+        elapsed = time.perf_counter() - started
+        print(f"💽 Staged {source.name} ({st.st_size / 1024**2:.0f} MiB, "
+              f"{st.st_size / 1024**2 / elapsed if elapsed else 0:.0f} MiB/s)")
+    finally:
+        lock_path.unlink(missing_ok=True)
+
+    evict_staging_cache(staging_dir, max_bytes, keep=local_path)
+    return local_path
+
+
+def _in_use_marker(local_path: Path, token: str) -> Path:
+    return local_path.with_name(f"{local_path.name}.{token}.inuse")
+
+
+def is_in_use(local_path: Path) -> bool:
+    """
+    True while a render holds the staged file. Stale markers are removed.
+    """
+    in_use = False
+    for marker in local_path.parent.glob(f"{glob.escape(local_path.name)}.*.inuse"):
+        try:
+            if time.time() - marker.stat().st_mtime > STALE_IN_USE_SECONDS:
+                marker.unlink(missing_ok=True)
+            else:
+                in_use = True
+        except FileNotFoundError:
+            continue
+    return in_use
+
+
+@contextmanager
+def staged_inputs(sources: list[Path], staging_dir: Path = STAGING_DIR, **stage_kwargs):
+    """
+    Stages each source and keeps the copies from being evicted until the block exits.
+
+    Yields:
+        list[Path]: Local copies, in the order of sources.
+    """
+    staging_dir = Path(staging_dir)
+    staging_dir.mkdir(parents=True, exist_ok=True)
+    token = f"{os.getpid()}-{next(_hold_ids)}"
+    markers = []
+    try:
+        local_paths = []
+        for source in map(Path, sources):
+            # Marked before staging, so the copy is protected from the moment it exists
+            marker = _in_use_marker(staging_dir / _staged_name(source, source.stat()), token)
+            marker.touch()
+            markers.append(marker)
+            local_paths.append(stage_file(source, staging_dir=staging_dir, **stage_kwargs))
+        yield local_paths
+    finally:
+        for marker in markers:
+            marker.unlink(missing_ok=True)
+
+
+def _valid_cached_copy(local_path: Path, meta_path: Path, st: os.stat_result, verify: bool) -> Path | None:
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if local_path.stat().st_size != st.st_size or meta["size"] != st.st_size:
+            return None
+    except (OSError, ValueError, KeyError):
+        return None
+    if verify and file_checksum(local_path) != meta["checksum"]:
+        print(f"[WARN] Staged copy of {meta['source']} is corrupt; re-staging")
+        local_path.unlink(missing_ok=True)
+        meta_path.unlink(missing_ok=True)
+        return None
+    # The sidecar's mtime is the LRU clock (the staged file keeps the source mtime)
+    os.utime(meta_path)
+    return local_path
+
+
+def evict_staging_cache(staging_dir: Path = STAGING_DIR, max_bytes: int = STAGING_MAX_BYTES,
+                        keep: Path | None = None) -> int:
+    """
+    Deletes least-recently-used staged files until the cache fits in max_bytes.
+
+    Returns:
+        int: Number of bytes freed.
+    """
+    entries = []
+    for meta_path in Path(staging_dir).glob("*.json"):
+        local_path = meta_path.with_suffix("")
+        try:
+            entries.append((meta_path.stat().st_mtime, local_path.stat().st_size, local_path, meta_path))
+        except FileNotFoundError:
+            continue
+
+    total = sum(size for _, size, _, _ in entries)
+    freed = 0
+    for _, size, local_path, meta_path in sorted(entries):
+        if total <= max_bytes:
+            break
+        if local_path == keep or local_path.with_name(local_path.name + ".lock").exists() or is_in_use(local_path):
+            continue
+        try:
+            local_path.unlink(missing_ok=True)
+            meta_path.unlink(missing_ok=True)
+        except OSError as e:
+            # Still open by an ffmpeg (Windows won't delete it); try again next time
+            if DEBUG:
+                print(f"[DEBUG] Couldn't evict {local_path.name}: {e}")
+            continue
+        total -= size
+        freed += size
+        if DEBUG:
+            print(f"[DEBUG] Evicted staged file {local_path.name} ({size / 1024**2:.0f} MiB)")
+    return freed
+
+
+def local_output_path(final_path: Path, staging_dir: Path = STAGING_DIR) -> Path:
+    """
+    Returns where a render destined for final_path should be written locally.
+    """
+    out_dir = Path(staging_dir) / "out"
+    out_dir.mkdir(parents=True, exist_ok=True)
+    return out_dir / f"{os.getpid()}-{Path(final_path).name}"
+
+
+@contextmanager
+def discard_on_failure(local_path: Path):
+    """
+    Deletes a local render, and the extra outputs named after it, if the block raises.
+    Local renders are named by pid, so a later run would never overwrite or evict them.
+    """
+    local_path = Path(local_path)
+    try:
+        yield local_path
+    except BaseException:
+        leftovers = [local_path, *local_path.parent.glob(f"{glob.escape(local_path.stem)}-*")]
+        for path in leftovers:
+            try:
+                path.unlink(missing_ok=True)
+            except OSError as e:
+                print(f"[WARN] Couldn't remove partial render {path.name}: {e}")
+        raise
+
+
+def publish_output(local_path: Path, final_path: Path, buffer_size: int = STAGING_COPY_BUFFER) -> Path:
+    """
+    Moves a local render to its NAS destination with one sequential write.
+    The file appears at final_path atomically (copied to a .part file, then renamed).
+    """
+    local_path, final_path = Path(local_path), Path(final_path)
+    final_path.parent.mkdir(parents=True, exist_ok=True)
+    part_path = final_path.with_name(final_path.name + ".part")
+    started = time.perf_counter()
+    try:
+        with open(local_path, "rb") as src, open(part_path, "wb") as dst:
+            shutil.copyfileobj(src, dst, buffer_size)
+        os.replace(part_path, final_path)
+    except BaseException:
+        part_path.unlink(missing_ok=True)
+        raise
+    local_path.unlink()
+    size = final_path.stat().st_size
+    elapsed = time.perf_counter() - started
+    print(f"📦 Published {final_path.name} ({size / 1024**2:.0f} MiB in {elapsed:.1f}s)")
+    return final_path
+
+
+class Prefetcher:
+    """
+    Stages upcoming inputs in order, at most `lookahead` jobs ahead of the ones
+    that have finished (call done() as each job completes).
+
+    Args:
+        paths (list[Path]): Inputs in the order they will be used.
+        lookahead (int): Jobs staged ahead of completion.
+        workers (int): Concurrent copies (1 keeps NAS reads sequential).
+    """
+
+    def __init__(self, paths: list[Path], lookahead: int = 2, workers: int = 1, **stage_kwargs):
+        self.paths = [Path(p) for p in paths]
+        self.stage_kwargs = stage_kwargs
+        self._slots = threading.Semaphore(lookahead)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="prefetch")
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._feed, name="prefetch-feed", daemon=True)
+        self._thread.start()
+
+    def _feed(self):
+        for path in self.paths:
+            self._slots.acquire()
+            if self._stopped.is_set():
+                return
+            self._executor.submit(self._stage_one, path)
+
+    def _stage_one(self, path: Path):
+        try:
+            stage_file(path, **self.stage_kwargs)
+        except Exception as e:
+            # Prefetch is an optimisation: the render will stage (or fail) on its own
+            print(f"[WARN] Prefetch of {path.name} failed: {e}")
+
+    def done(self, _=None):
+        """Marks one job finished, letting the next input be prefetched."""
+        self._slots.release()
+
+    def close(self):
+        self._stopped.set()
+        self._slots.release()
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -4,21 +4,34 @@
 # This module verifies the presence and accessibility of all critical assets needed for the video processing pipeline.
 # If any required file is missing or unreadable, the script exits with an error message.
 #
+# Each asset is also fingerprinted and probed once, and the results are kept in
+# ASSET_STATE_PATH. Runs where nothing changed only compare size/mtime; when an
+# asset does change, the artifacts derived from it (mezzanine segments, decoded
+# music, thumbnail layers) are rebuilt before any clip is rendered.
+#
 # Usage:
 # Called at the beginning of main.py to ensure a clean, verified startup state.
 
 from pathlib import Path
+from datetime import datetime
+import os
 import sys
+import json
 
 # These are expected to be already set correctly in config.py
-from config import (
+from modules.config import (
     INTRO_WIDE_PATH,
     INTRO_VERTICAL_PATH,
     OUTRO_WIDE_PATH,
     OUTRO_VERTICAL_PATH,
     FONT_PATH,
-    THEME_MUSIC_PATH
+    THEME_MUSIC_PATH,
+    ASSET_STATE_PATH,
+    RENDER_MODE,
+    RENDER_PROFILE,
+    DEBUG
 )
+from modules.storage_root import map_path, is_file, cached_stat, health_check
 
 REQUIRED_PATHS = [
     ("INTRO_WIDE_PATH", INTRO_WIDE_PATH),
@@ -29,18 +42,164 @@ REQUIRED_PATHS = [
     ("THEME_MUSIC_PATH", THEME_MUSIC_PATH),
 ]
 
+# What each asset must contain to be usable
+ASSET_KINDS = {
+    "INTRO_WIDE_PATH": "video",
+    "INTRO_VERTICAL_PATH": "video",
+    "OUTRO_WIDE_PATH": "video",
+    "OUTRO_VERTICAL_PATH": "video",
+    "FONT_PATH": "font",
+    "THEME_MUSIC_PATH": "audio",
+}
+
+ASSET_STATE_VERSION = 1
+
 def resolve_path(label: str, path_str: str):
     try:
-        path = Path(path_str)
-        if not path.is_file():
+        # Mapped onto the detected NAS mount; the stat is cached for the rest of the run
+        path = map_path(path_str)
+        if not is_file(path):
             raise FileNotFoundError(f"{label} not found at {path}")
         return path
     except Exception as e:
         print(f"❌ {label} → {e}")
         sys.exit(1)
 
-def verify_assets():
+def load_asset_state(state_path: Path = ASSET_STATE_PATH) -> dict:
+    try:
+        with open(state_path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        if state.get("version") == ASSET_STATE_VERSION:
+            return state
+    except (OSError, ValueError):
+        pass
+    return {"version": ASSET_STATE_VERSION, "assets": {}}
+
+def save_asset_state(state: dict, state_path: Path = ASSET_STATE_PATH) -> None:
+    state_path = Path(state_path)
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = state_path.with_name(f"{state_path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, state_path)
+
+def _validate_asset(kind: str, path: Path) -> dict:
+    """
+    Probes an asset and checks it holds what the renders need.
+
+    Returns:
+        dict: Probe summary stored with the asset's fingerprint.
+
+    Raises:
+        ValueError: If the asset is unusable (no video stream, no audio, empty font).
+    """
+    if kind == "font":
+        size = path.stat().st_size
+        if not size:
+            raise ValueError("font file is empty")
+        return {"bytes": size}
+
+    from modules.media_probe import probe_media
+
+    info = probe_media(path)
+    if kind == "video" and not (info.get("has_video") and info.get("width") and info.get("height")):
+        raise ValueError("no usable video stream")
+    if kind == "audio" and not info.get("has_audio"):
+        raise ValueError("no audio stream")
+    keys = ("duration", "fps", "width", "height", "video_codec", "audio_codec", "sample_rate", "channels", "has_audio")
+    return {key: info.get(key) for key in keys}
+
+def check_asset(label: str, path: Path, previous: dict | None) -> tuple[dict, bool]:
+    """
+    Verifies one asset, reusing the stored result while its size and mtime are unchanged.
+
+    Returns:
+        tuple: (state entry, whether the asset's content changed since the stored state)
+
+    Raises:
+        ValueError: If the asset fails validation.
+    """
+    from modules.render_manifest import fingerprint_file
+
+    st = cached_stat(path)
+    if st is None:
+        raise FileNotFoundError(f"{label} not found at {path}")
+    if previous and (previous.get("path"), previous.get("size"), previous.get("mtime_ns")) == (str(path), st.st_size, st.st_mtime_ns):
+        return previous, False
+
+    fingerprint = fingerprint_file(path)
+    entry = {
+        "path": str(path),
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "fingerprint": fingerprint,
+        "probe": _validate_asset(ASSET_KINDS[label], path),
+        "verified": datetime.now().isoformat(timespec="seconds"),
+    }
+    return entry, previous is None or previous.get("fingerprint") != fingerprint
+
+def prewarm_assets(changed: set[str], render_mode: str = RENDER_MODE, profile: str = RENDER_PROFILE) -> None:
+    """
+    Builds the derived artifacts renders use, rebuilding those whose source changed.
+    Title intros need nothing here: their cache key already includes the intro and font stamps.
+    """
+    from modules.mezzanine import prepare_mezzanine_assets, prepare_music, prune_mezzanine
+
+    if changed:
+        removed = prune_mezzanine()
+        if removed:
+            print(f"🧹 Removed {removed} derived file(s) built from old asset versions")
+
+    prepare_music(map_path(THEME_MUSIC_PATH))
+    if render_mode == "stream-copy":
+        prepare_mezzanine_assets(profile=profile)
+
+    try:
+        from modules.thumbnail_compositor import prewarm_layers
+    except ImportError:
+        # Pillow isn't installed; thumbnails fall back to ffmpeg
+        return
+    prewarm_layers(reset="FONT_PATH" in changed)
+
+def verify_assets(prewarm: bool = True, render_mode: str = RENDER_MODE, profile: str = RENDER_PROFILE,
+                  state_path: Path = ASSET_STATE_PATH) -> dict:
+    """
+    Checks the NAS and every branded asset, then prepares derived artifacts.
+
+    Args:
+        prewarm (bool): Build mezzanine segments, decoded music and thumbnail layers.
+        render_mode (str): Segments are only prepared for "stream-copy".
+        profile (str): Encoding profile the segments are prepared for.
+        state_path (Path): Where fingerprints and probe results are stored.
+
+    Returns:
+        dict: Asset label → verified state entry.
+    """
+    health = health_check()
+    if not health["reachable"]:
+        print(f"❌ NAS root {health['root']} is not reachable")
+        sys.exit(1)
+    print(f"🗄️ NAS root {health['root']}: stat {health['stat_ms']} ms, list {health['list_ms']} ms")
+
     print("🔍 Verifying external file dependencies...")
+    state = load_asset_state(state_path)
+    changed = set()
     for label, path_str in REQUIRED_PATHS:
         resolved = resolve_path(label, path_str)
-        print(f"✅ {label} → {resolved}")
+        try:
+            entry, was_changed = check_asset(label, resolved, state["assets"].get(label))
+        except Exception as e:
+            print(f"❌ {label} → {e}")
+            sys.exit(1)
+        state["assets"][label] = entry
+        if was_changed:
+            changed.add(label)
+            print(f"🔄 {label} → {resolved} (new version {entry['fingerprint'][:12]})")
+        elif DEBUG:
+            print(f"✅ {label} → {resolved}")
+    save_asset_state(state, state_path)
+    print(f"✅ {len(REQUIRED_PATHS)} asset(s) verified, {len(changed)} changed")
+
+    if prewarm:
+        prewarm_assets(changed, render_mode=render_mode, profile=profile)
+    return state["assets"]
@@ -0,0 +1,178 @@
+# modules/storage_root.py
+#
+# Storage-root layer for the NAS.
+# The working mount (Z:, the //chong UNC share, or a Linux mount point given in
+# NAS_ROOT) is detected once per run, or re-probed every UNREACHABLE_RETRY_SECONDS
+# while none is reachable; logical "Z:/..." paths from config are mapped onto
+# it with string operations only. Stat results are cached for
+# STORAGE_STAT_TTL seconds so hot paths stop paying an SMB round trip per
+# exists() check, and health_check() reports reachability and latency.
+
+import os
+import stat
+import time
+import statistics
+import threading
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from modules.config import NAS_MOUNT_ROOT, NAS_ROOT_CANDIDATES, STORAGE_STAT_TTL, STORAGE_PROBE_TIMEOUT, DEBUG
+
+# Logical prefixes that config and stored records use for NAS paths
+LOGICAL_PREFIXES = ("z:/", "//chong/lcs/videos/eklipse/")
+# When no candidate was reachable, probe again after this many seconds (the NAS may come back)
+UNREACHABLE_RETRY_SECONDS = 30.0
+
+_root: Path | None = None
+# monotonic time of the last failed detection; None once a root has been found
+_root_failed_at: float | None = None
+_root_lock = threading.Lock()
+_stat_cache: dict[str, tuple[float, os.stat_result | None]] = {}
+_stat_lock = threading.Lock()
+
+
+def _probe_dir(path: Path, timeout: float) -> bool:
+    """
+    is_dir() with a timeout: a dead SMB mount can block for a long time.
+    """
+    pool = ThreadPoolExecutor(max_workers=1)
+    try:
+        return pool.submit(path.is_dir).result(timeout=timeout)
+    except (FutureTimeout, OSError):
+        return False
+    finally:
+        pool.shutdown(wait=False)
+
+
+def detect_root(candidates: list[str] | None = None, refresh: bool = False,
+                timeout: float = STORAGE_PROBE_TIMEOUT) -> Path:
+    """
+    Returns the first reachable NAS root, probing candidates only once per run.
+    A failed detection is only remembered for UNREACHABLE_RETRY_SECONDS.
+
+    Args:
+        candidates (list[str] | None): Roots to try in order (defaults to NAS_ROOT_CANDIDATES).
+        refresh (bool): Probe again (e.g. after a remount).
+        timeout (float): Seconds to wait on each candidate.
+
+    Returns:
+        Path: The working root, or the logical NAS_MOUNT_ROOT if none is reachable.
+    """
+    global _root, _root_failed_at
+    with _root_lock:
+        retry_due = _root_failed_at is not None and time.monotonic() - _root_failed_at >= UNREACHABLE_RETRY_SECONDS
+        if _root is not None and not refresh and not retry_due:
+            return _root
+        for candidate in candidates or NAS_ROOT_CANDIDATES:
+            started = time.perf_counter()
+            if _probe_dir(Path(candidate), timeout):
+                _root = Path(candidate)
+                _root_failed_at = None
+                print(f"🗄️ NAS root: {_root} ({(time.perf_counter() - started) * 1000:.0f} ms)")
+                break
+            if DEBUG:
+                print(f"[DEBUG] NAS root candidate not reachable: {candidate}")
+        else:
+            print(f"[WARN] No NAS root reachable (tried {', '.join(map(str, candidates or NAS_ROOT_CANDIDATES))})")
+            _root = Path(NAS_MOUNT_ROOT)
+            _root_failed_at = time.monotonic()
+        return _root
+
+
+def nas_root() -> Path:
+    return detect_root()
+
+
+def map_path(path: Path | str) -> Path:
+    """
+    Maps a logical NAS path (Z:/... or the UNC share) onto the detected root.
+    Paths outside the NAS are returned unchanged. No filesystem access.
+    """
+    text = str(path).replace("\\", "/")
+    lowered = text.lower()
+    for prefix in LOGICAL_PREFIXES:
+        if lowered.startswith(prefix):
+            return nas_root() / text[len(prefix):]
+    return Path(path)
+
+
+def cached_stat(path: Path | str, ttl: float = STORAGE_STAT_TTL) -> os.stat_result | None:
+    """
+    os.stat with a TTL cache. Returns None if the path doesn't exist.
+    """
+    key = str(path)
+    now = time.monotonic()
+    with _stat_lock:
+        hit = _stat_cache.get(key)
+        if hit and now - hit[0] < ttl:
+            return hit[1]
+    try:
+        st = os.stat(path)
+    except (FileNotFoundError, NotADirectoryError):
+        st = None
+    with _stat_lock:
+        _stat_cache[key] = (now, st)
+    return st
+
+
+def exists(path: Path | str) -> bool:
+    return cached_stat(path) is not None
+
+
+def is_file(path: Path | str) -> bool:
+    st = cached_stat(path)
+    return st is not None and stat.S_ISREG(st.st_mode)
+
+
+def resolve(path: Path | str) -> Path:
+    """
+    Maps a path onto the detected root and checks it exists (cached).
+
+    Raises:
+        FileNotFoundError: If the mapped path doesn't exist.
+    """
+    mapped = map_path(path)
+    if not exists(mapped):
+        raise FileNotFoundError(f"❌ Path not found: {path} (mapped to {mapped})")
+    return mapped
+
+
+def invalidate(path: Path | str | None = None) -> None:
+    """
+    Drops one cached stat (after writing a file) or the whole cache.
+    """
+    with _stat_lock:
+        if path is None:
+            _stat_cache.clear()
+        else:
+            _stat_cache.pop(str(path), None)
+
+
+def health_check(root: Path | None = None, samples: int = 3) -> dict:
+    """
+    Measures how the NAS root is responding.
+
+    Returns:
+        dict: reachable, root, stat_ms (median), list_ms (median) and entries.
+    """
+    root = Path(root or nas_root())
+    result = {"root": str(root), "reachable": False, "stat_ms": None, "list_ms": None, "entries": None}
+    if not _probe_dir(root, STORAGE_PROBE_TIMEOUT):
+        return result
+
+    stat_times, list_times = [], []
+    for _ in range(samples):
+        started = time.perf_counter()
+        os.stat(root)
+        stat_times.append((time.perf_counter() - started) * 1000)
+        started = time.perf_counter()
+        with os.scandir(root) as entries:
+            result["entries"] = sum(1 for _ in entries)
+        list_times.append((time.perf_counter() - started) * 1000)
+
+    result.update({
+        "reachable": True,
+        "stat_ms": round(statistics.median(stat_times), 2),
+        "list_ms": round(statistics.median(list_times), 2),
+    })
+    return result
@@ -0,0 +1,209 @@
+# modules/thumbnail_compositor.py
+#
+# In-process branded thumbnail compositor.
+# Draws the title, a date banner and the LCS logo onto a frame using the
+# BRANDING_COLORS palette and FONT_PATH font. Fonts and the static layers
+# (shading, logo, text) are cached across calls, so a whole session's
+# thumbnails are composed with Pillow without spawning an ffmpeg per image.
+
+from functools import lru_cache
+from pathlib import Path
+
+from PIL import Image, ImageDraw, ImageFilter, ImageFont
+
+from modules.config import BRANDING_COLORS, FONT_PATH, LOGO_PATH, TITLE_TEMPLATE, DEBUG
+
+WIDE_SIZE = (1280, 720)
+VERTICAL_SIZE = (720, 1280)
+
+
+def _rgba(hex_color: str, alpha: int = 255) -> tuple[int, int, int, int]:
+    value = hex_color.lstrip("#")
+    return tuple(int(value[i:i + 2], 16) for i in (0, 2, 4)) + (alpha,)
+
+
+@lru_cache(maxsize=32)
+def load_font(size: int, font_path: str = str(FONT_PATH)) -> ImageFont.FreeTypeFont:
+    """
+    Returns the branding font at the given size (parsed once per size).
+    Falls back to Pillow's default font if the brand font is missing.
+    """
+    try:
+        return ImageFont.truetype(font_path, size)
+    except OSError as e:
+        print(f"[WARN] Couldn't load font {font_path}, using default: {e}")
+        return ImageFont.load_default(size=size)
+
+
+@lru_cache(maxsize=4)
+def static_layer(size: tuple[int, int]) -> Image.Image:
+    """
+    Returns the per-orientation layer that never changes between thumbnails:
+    a brand-shade gradient behind the title area and the logo in the corner.
+    """
+    width, height = size
+    layer = Image.new("RGBA", size, (0, 0, 0, 0))
+
+    # Shade gradient over the bottom third so text stays readable on busy frames
+    shade = _rgba(BRANDING_COLORS["shadow"])
+    gradient_height = height // 3
+    gradient = Image.new("L", (1, gradient_height))
+    gradient.putdata([int(200 * y / gradient_height) for y in range(gradient_height)])
+    shade_layer = Image.new("RGBA", (width, gradient_height), shade)
+    shade_layer.putalpha(gradient.resize((width, gradient_height)))
+    layer.alpha_composite(shade_layer, (0, height - gradient_height))
+
+    logo_path = Path(LOGO_PATH)
+    if logo_path.exists():
+        with Image.open(logo_path) as logo:
+            logo = logo.convert("RGBA")
+            target = min(width, height) // 5
+            logo.thumbnail((target, target), Image.LANCZOS)
+            margin = target // 6
+            layer.alpha_composite(logo, (width - logo.width - margin, margin))
+    elif DEBUG:
+        print(f"[DEBUG] Logo not found, compositing without it: {logo_path}")
+
+    return layer
+
+
+def prewarm_layers(reset: bool = False) -> None:
+    """
+    Builds the static layers for both orientations up front.
+
+    Args:
+        reset (bool): Drop cached fonts and layers first (the font or logo changed).
+    """
+    if reset:
+        for cached in (load_font, static_layer, text_layer):
+            cached.cache_clear()
+    for size in (WIDE_SIZE, VERTICAL_SIZE):
+        static_layer(size)
+
+
+def _draw_text_with_shadow(layer: Image.Image, xy: tuple[int, int], text: str,
+                           font: ImageFont.FreeTypeFont, fill, shadow) -> None:
+    offset = max(2, font.size // 16)
+    shadow_layer = Image.new("RGBA", layer.size, (0, 0, 0, 0))
+    ImageDraw.Draw(shadow_layer).text((xy[0] + offset, xy[1] + offset), text, font=font, fill=shadow)
+    layer.alpha_composite(shadow_layer.filter(ImageFilter.GaussianBlur(offset)))
+    ImageDraw.Draw(layer).text(xy, text, font=font, fill=fill, stroke_width=offset // 2, stroke_fill=shadow)
+
+
+@lru_cache(maxsize=64)
+def text_layer(size: tuple[int, int], title: str, date_str: str) -> Image.Image:
+    """
+    Returns the title + date banner layer. Every clip of a session shares the same
+    title and date, so this is rendered once per session/orientation.
+    """
+    width, height = size
+    layer = Image.new("RGBA", size, (0, 0, 0, 0))
+    draw = ImageDraw.Draw(layer)
+    font_color = _rgba(BRANDING_COLORS["font"])
+    shadow_color = _rgba(BRANDING_COLORS["shadow"], 220)
+
+    # Title: as large as fits in 90% of the width
+    title_size = height // 7 if width > height else width // 7
+    title_font = load_font(title_size)
+    while draw.textlength(title, font=title_font) > width * 0.9 and title_size > 24:
+        title_size -= 4
+        title_font = load_font(title_size)
+    title_width = draw.textlength(title, font=title_font)
+    title_y = height - title_size * 2 - height // 12
+    _draw_text_with_shadow(layer, (int((width - title_width) / 2), title_y), title,
+                           title_font, font_color, shadow_color)
+
+    # Date banner: brand-shade box under the title
+    date_font = load_font(max(title_size // 2, 18))
+    left, top, right, bottom = draw.textbbox((0, 0), date_str, font=date_font)
+    pad = date_font.size // 3
+    banner_w, banner_h = right - left + pad * 2, bottom - top + pad * 2
+    banner_x = (width - banner_w) // 2
+    banner_y = title_y + title_size + pad
+    draw.rounded_rectangle(
+        (banner_x, banner_y, banner_x + banner_w, banner_y + banner_h),
+        radius=pad,
+        fill=_rgba(BRANDING_COLORS["shade"], 210),
+    )
+    draw.text((banner_x + pad - left, banner_y + pad - top), date_str, font=date_font,
+              fill=(255, 255, 255, 255))
+    return layer
+
+
+def _fit_frame(frame: Image.Image, size: tuple[int, int]) -> Image.Image:
+    """
+    Scales and centre-crops a frame to fill the thumbnail size.
+    """
+    width, height = size
+    scale = max(width / frame.width, height / frame.height)
+    resized = frame.resize((round(frame.width * scale), round(frame.height * scale)), Image.LANCZOS)
+    left = (resized.width - width) // 2
+    top = (resized.height - height) // 2
+    return resized.crop((left, top, left + width, top + height))
+
+
+def compose_thumbnail(
+    frame,
+    output_path: Path,
+    date_str: str,
+    title: str = TITLE_TEMPLATE["main"],
+    is_vertical: bool | None = None,
+) -> str:
+    """
+    Composites a branded thumbnail in-process.
+
+    Args:
+        frame: Source frame as a path, PIL image or RGB NumPy array.
+        output_path (Path): Where the JPEG is written.
+        date_str (str): Text for the date banner (e.g. "July 25, 2025").
+        title (str): Headline text.
+        is_vertical (bool | None): Force orientation; inferred from the frame if None.
+
+    Returns:
+        str: Path to the saved thumbnail.
+    """
+    if isinstance(frame, (str, Path)):
+        with Image.open(frame) as img:
+            source = img.convert("RGB")
+    elif isinstance(frame, Image.Image):
+        source = frame.convert("RGB")
+    else:
+        source = Image.fromarray(frame, "RGB")
+
+    if is_vertical is None:
+        is_vertical = source.height > source.width
+    size = VERTICAL_SIZE if is_vertical else WIDE_SIZE
+
+    canvas = _fit_frame(source, size).convert("RGBA")
+    canvas.alpha_composite(static_layer(size))
+    canvas.alpha_composite(text_layer(size, title, date_str))
+
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    canvas.convert("RGB").save(output_path, "JPEG", quality=90, optimize=True)
+    return str(output_path)
+
+
+def compose_session_thumbnails(items: list[dict]) -> list[str]:
+    """
+    Batch-composes thumbnails for a session in one process.
+
+    Args:
+        items (list[dict]): Each with keys frame, output_path, date_str and optionally
+            title / is_vertical (same meaning as compose_thumbnail).
+
+    Returns:
+        list[str]: Output paths, in input order.
+    """
+    outputs = []
+    for item in items:
+        outputs.append(compose_thumbnail(
+            item["frame"],
+            item["output_path"],
+            date_str=item["date_str"],
+            title=item.get("title", TITLE_TEMPLATE["main"]),
+            is_vertical=item.get("is_vertical"),
+        ))
+    if DEBUG:
+        print(f"[DEBUG] Composed {len(outputs)} thumbnail(s); text layer cache: {text_layer.cache_info()}")
+    return outputs
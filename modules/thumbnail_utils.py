@@ -2,21 +2,46 @@ import subprocess
 import os
 from pathlib import Path
 
-def generate_thumbnail(video_path: str, output_path: str) -> str:
+from modules.config import BRANDING_COLORS, THUMBNAIL_CANDIDATES, DEBUG
+from modules.ffmpeg_runner import run_ffmpeg, capture_ffmpeg
+from modules.media_probe import probe_media, is_vertical_media
+
+# Thumbnail sizes per orientation (YouTube recommends 1280x720 for wide videos)
+THUMBNAIL_SIZE_WIDE = (1280, 720)
+THUMBNAIL_SIZE_VERTICAL = (720, 1280)
+
+# Width candidate frames are scored at; small enough that NumPy scoring is ~free
+SCORING_WIDTH = 320
+
+
+def thumbnail_size(is_vertical: bool) -> tuple[int, int]:
+    return THUMBNAIL_SIZE_VERTICAL if is_vertical else THUMBNAIL_SIZE_WIDE
+
+
+def generate_thumbnail(
+    video_path: str,
+    output_path: str,
+    mode: str = "fast",
+    candidates: int = THUMBNAIL_CANDIDATES,
+) -> str:
     """
-    Generate a thumbnail image from the midpoint of the given video.
+    Generate a thumbnail image for the given video.
 
     Parameters:
         video_path (str): Path to the input video file.
-        output_path (str): Path where the thumbnail image (JPEG) should be saved.
+        output_path (str): Path where the thumbnail image should be saved (JPEG, or
+            PNG when it is an intermediate frame for the compositor).
+        mode (str): "fast" (seek to candidate keyframes and score them) or
+            "full" (ffmpeg's `thumbnail` filter over the whole decoded video).
+        candidates (int): Number of keyframe positions sampled in fast mode.
 
     Returns:
         str: Path to the generated thumbnail image.
 
     Notes:
-    - Uses FFmpeg to extract a frame using the 'thumbnail' filter.
-    - Thumbnail will be scaled to 1280x720 resolution (16:9).
+    - Thumbnail is scaled to 1280x720 for wide videos and 720x1280 for vertical ones.
     - Overwrites the output file if it already exists.
+    - Fast mode falls back to full mode if the video can't be probed.
     """
     video_path = Path(video_path)
     output_path = Path(output_path)
@@ -26,16 +51,41 @@ def generate_thumbnail(video_path: str, output_path: str) -> str:
 
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
-    cmd = [
-        "ffmpeg", "-y",  # Overwrite output if exists
-        "-i", str(video_path),
-        "-vf", "thumbnail,scale=1280:720",
-        "-frames:v", "1",
-        str(output_path)
-    ]
+    try:
+        info = probe_media(video_path)
+    except Exception as e:
+        print(f"[WARN] Couldn't probe {video_path} for thumbnail, using full decode: {e}")
+        info = {}
+    is_vertical = bool(is_vertical_media(info))
+    width, height = thumbnail_size(is_vertical)
+    scale = (
+        f"scale={width}:{height}:force_original_aspect_ratio=decrease,"
+        f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2"
+    )
+
+    if mode == "fast" and info.get("duration") and info.get("width"):
+        best_time = pick_best_frame_time(video_path, info, candidates)
+        cmd = [
+            "ffmpeg", "-y",
+            "-skip_frame", "nokey",
+            "-ss", f"{best_time:.3f}",
+            "-i", str(video_path),
+            "-vf", scale,
+            "-frames:v", "1",
+            "-q:v", "2",
+            str(output_path)
+        ]
+    else:
+        cmd = [
+            "ffmpeg", "-y",  # Overwrite output if exists
+            "-i", str(video_path),
+            "-vf", f"thumbnail,{scale}",
+            "-frames:v", "1",
+            str(output_path)
+        ]
 
     try:
-        subprocess.run(cmd, check=True)
+        run_ffmpeg(cmd, stage="thumbnail", output_path=output_path)
     except subprocess.CalledProcessError as e:
         raise RuntimeError(f"Failed to generate thumbnail: {e}") from e
 
@@ -45,6 +95,129 @@ def generate_thumbnail(video_path: str, output_path: str) -> str:
     return str(output_path)
 
 
+def candidate_times(duration: float, count: int) -> list[float]:
+    """
+    Returns evenly spaced seek positions between 10% and 90% of the video,
+    skipping the intro/outro where the branded title cards live.
+    """
+    count = max(count, 1)
+    start, end = duration * 0.10, duration * 0.90
+    if count == 1:
+        return [duration / 2]
+    step = (end - start) / (count - 1)
+    return [start + i * step for i in range(count)]
+
+
+def grab_frame_rgb(video_path: Path, seconds: float, width: int, height: int):
+    """
+    Input-seeks to `seconds` and returns the first keyframe at or after that
+    point as an RGB NumPy array (`-skip_frame nokey` discards every other frame).
+    Only keyframes are decoded; nothing is written to disk.
+    """
+    import numpy as np
+
+    cmd = [
+        "ffmpeg", "-v", "error",
+        "-skip_frame", "nokey",
+        "-ss", f"{seconds:.3f}",
+        "-i", str(video_path),
+        "-vf", f"scale={width}:{height}",
+        "-frames:v", "1",
+        "-f", "rawvideo", "-pix_fmt", "rgb24",
+        "pipe:1",
+    ]
+    raw = capture_ffmpeg(cmd, stage="thumbnail-candidate")
+    if len(raw) < width * height * 3:
+        return None
+    return np.frombuffer(raw[: width * height * 3], dtype=np.uint8).reshape(height, width, 3)
+
+
+def _hex_to_rgb(value: str) -> tuple[int, int, int]:
+    value = value.lstrip("#")
+    return tuple(int(value[i:i + 2], 16) for i in (0, 2, 4))
+
+
+def score_frame(frame) -> dict:
+    """
+    Scores an RGB frame for thumbnail suitability.
+
+    Returns:
+        dict: sharpness (variance of the Laplacian), contrast (luma std-dev),
+              brand (fraction of pixels near a brand colour) and brightness (mean luma).
+    """
+    import numpy as np
+
+    rgb = frame.astype(np.float32)
+    luma = rgb @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+    laplacian = (
+        -4 * luma[1:-1, 1:-1]
+        + luma[:-2, 1:-1] + luma[2:, 1:-1]
+        + luma[1:-1, :-2] + luma[1:-1, 2:]
+    )
+
+    brand_hits = np.zeros(luma.shape, dtype=bool)
+    for color in BRANDING_COLORS.values():
+        distance = np.linalg.norm(rgb - np.array(_hex_to_rgb(color), dtype=np.float32), axis=2)
+        brand_hits |= distance < 60
+
+    return {
+        "sharpness": float(laplacian.var()),
+        "contrast": float(luma.std()),
+        "brand": float(brand_hits.mean()),
+        "brightness": float(luma.mean()),
+    }
+
+
+def rank_scores(scores: list[dict]) -> list[float]:
+    """
+    Combines per-frame scores into one number per frame (higher is better).
+    Sharpness and contrast are normalised against the best candidate; near-black
+    or blown-out frames are heavily penalised.
+    """
+    max_sharp = max((s["sharpness"] for s in scores), default=0) or 1.0
+    max_contrast = max((s["contrast"] for s in scores), default=0) or 1.0
+    ranked = []
+    for s in scores:
+        total = (
+            0.5 * s["sharpness"] / max_sharp
+            + 0.3 * s["contrast"] / max_contrast
+            + 0.2 * min(s["brand"] * 10, 1.0)
+        )
+        if s["brightness"] < 20 or s["brightness"] > 235:
+            total *= 0.1
+        ranked.append(total)
+    return ranked
+
+
+def pick_best_frame_time(video_path: Path, info: dict, candidates: int) -> float:
+    """
+    Samples candidate keyframes, scores them in NumPy and returns the best timestamp.
+    """
+    times = candidate_times(info["duration"], candidates)
+    width = SCORING_WIDTH
+    height = max(2, int(SCORING_WIDTH * info["height"] / info["width"]) // 2 * 2)
+
+    frames = []
+    for seconds in times:
+        try:
+            frame = grab_frame_rgb(video_path, seconds, width, height)
+        except subprocess.CalledProcessError:
+            frame = None
+        if frame is not None:
+            frames.append((seconds, score_frame(frame)))
+
+    if not frames:
+        return info["duration"] / 2
+
+    ranked = rank_scores([score for _, score in frames])
+    best_index = max(range(len(frames)), key=ranked.__getitem__)
+    if DEBUG:
+        for (seconds, score), total in zip(frames, ranked):
+            print(f"[DEBUG] thumbnail candidate @{seconds:.1f}s score={total:.3f} {score}")
+    return frames[best_index][0]
+
+
 def generate_thumbnail_prompt(notes: str) -> str:
     """
     Generate a rich thumbnail prompt from a descriptive sentence.
@@ -1,7 +1,10 @@
 from pathlib import Path
-import subprocess
 from datetime import datetime
 
+from modules.media_probe import probe_media
+from modules.ffmpeg_runner import run_ffmpeg
+from modules.encoding_profiles import get_profile, video_encode_args
+
 
 def parse_stream_date(clip_path: Path) -> datetime:
     """
@@ -23,17 +26,19 @@ def extract_session_metadata(clip_path: Path) -> str:
     return clip_path.parents[1].name
 
 
-def generate_output_filename(clip_path: Path) -> str:
+def generate_output_filename(clip_path: Path, is_vertical: bool | None = None) -> str:
     """
     Generates output filename from the session name, following rules:
-    - Vertical clips get suffix `-vert`
+    - Vertical clips get suffix `-vert` (from is_vertical, else the clip's filename)
     - Suffix .N in session becomes `-videoN`
     """
     session_name = extract_session_metadata(clip_path)
     date_parts = session_name.split(".")
     base_date = "".join(date_parts[:3])  # e.g., 20250701
     suffix = f"-video{date_parts[3]}" if len(date_parts) > 3 else ""
-    vert = "-vert" if clip_path.stem.endswith(("-vert", "-vertical")) else ""
+    if is_vertical is None:
+        is_vertical = clip_path.stem.endswith(("-vert", "-vertical"))
+    vert = "-vert" if is_vertical else ""
     return f"Fortnite-montage-{base_date}{suffix}{vert}.mp4"
 
 
@@ -44,21 +49,35 @@ def format_overlay_text(title: str, subtitle: str, date_str: str) -> list[str]:
     return [title, subtitle, date_str]
 
 
-def generate_title_overlay(
-    intro_path: Path,
+# Length of the title intro segment; the text fades out over its last 0.5s
+TITLE_INTRO_SECONDS = 5
+TITLE_FADE_DURATION = 0.5
+
+
+def title_timing(intro_path: Path) -> tuple[float, float]:
+    """
+    Returns (segment_seconds, fade_start) for a title intro, based on the intro's
+    probed duration so shorter intros still fade out 0.5s before they end.
+    """
+    try:
+        duration = probe_media(intro_path).get("duration")
+    except Exception as e:
+        print(f"[WARN] Couldn't probe intro {intro_path}, assuming {TITLE_INTRO_SECONDS}s: {e}")
+        duration = None
+    seconds = min(duration or TITLE_INTRO_SECONDS, TITLE_INTRO_SECONDS)
+    return seconds, max(seconds - TITLE_FADE_DURATION, 0)
+
+
+def build_title_filter(
     overlay_text: list[str],
-    output_path: Path,
     font_path: Path,
-    is_vertical: bool = False,
-):
+    fade_start: float = TITLE_INTRO_SECONDS - TITLE_FADE_DURATION,
+    fade_duration: float = TITLE_FADE_DURATION,
+) -> str:
     """
-    Overlays title text on top of the intro clip and creates a new video segment.
-    The text fades out completely 0.5 seconds before the intro ends.
+    Builds the drawtext + fade filter chain that bakes the title into the intro.
+    Shared by the two-pass intro encode and the single-pass render graph.
     """
-    width, height = (1080, 1920) if is_vertical else (1920, 1080)
-    fade_start = 4.5
-    fade_duration = 0.5
-
     # Uniform visual settings
     fontcolor = "#f7338f"
     shadowcolor = "0x1c0c38"
@@ -85,21 +104,40 @@ def generate_title_overlay(
         drawtext_filters.append(drawtext)
 
     drawtext_filters.append(f"fade=t=out:st={fade_start}:d={fade_duration}:alpha=1")
-    drawtext_filter = ",".join(drawtext_filters)
+    return ",".join(drawtext_filters)
+
+
+def generate_title_overlay(
+    intro_path: Path,
+    overlay_text: list[str],
+    output_path: Path,
+    font_path: Path,
+    is_vertical: bool = False,
+    threads: int | None = None,
+    profile: str | None = None,
+):
+    """
+    Overlays title text on top of the intro clip and creates a new video segment.
+    The text fades out completely 0.5 seconds before the intro ends (probed duration).
+    `threads` caps ffmpeg's worker threads when several renders run concurrently.
+    `profile` selects the encoding profile (see modules/encoding_profiles.py).
+    """
+    segment_seconds, fade_start = title_timing(intro_path)
+    drawtext_filter = build_title_filter(overlay_text, font_path, fade_start=fade_start)
 
     ffmpeg_cmd = [
         "ffmpeg",
         "-y",
         "-i", str(intro_path),
         "-vf", drawtext_filter,
-        "-c:v", "libx264",
-        "-preset", "ultrafast",
-        "-t", "5",
-        "-pix_fmt", "yuv420p",
-        str(output_path)
+        *video_encode_args(get_profile(profile)),
+        "-t", str(segment_seconds),
     ]
+    if threads:
+        ffmpeg_cmd += ["-threads", str(threads)]
+    ffmpeg_cmd.append(str(output_path))
 
-    subprocess.run(ffmpeg_cmd, check=True)
+    run_ffmpeg(ffmpeg_cmd, stage="title-overlay", duration=segment_seconds)
 
 
 def generate_montage_title(session_name: str) -> str:
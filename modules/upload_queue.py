@@ -0,0 +1,414 @@
+# modules/upload_queue.py
+#
+# Durable SQLite-backed upload queue.
+# Render/pipeline stages enqueue one job per (video, platform); drain() works the
+# queue with per-platform worker limits, so YouTube and PeerTube uploads run in
+# parallel with each other (and with whatever else the process is doing).
+# Job state and resulting URLs live in the database, so a crash or restart
+# picks up exactly where it left off. Running jobs hold a lease their worker
+# keeps renewing; only jobs whose lease ran out are handed to another worker.
+
+import os
+import json
+import time
+import socket
+import sqlite3
+import threading
+from contextlib import closing
+from pathlib import Path
+from datetime import datetime
+
+from modules.config import UPLOAD_QUEUE_PATH, UPLOAD_CONCURRENCY, UPLOAD_MAX_ATTEMPTS, UPLOAD_LEASE_SECONDS, DEBUG
+
+STATES = ("pending", "running", "done", "failed")
+# Identifies this process as the holder of a running job's lease
+OWNER = f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+def default_uploaders() -> dict:
+    """
+    Platform name → `uploader(video_path, metadata) -> url` for the real services.
+    Imports are deferred so the queue itself has no API client dependencies.
+    """
+    def youtube(video_path: Path, metadata: dict) -> str:
+        from modules.yt_poster import upload_video, get_thread_service
+        return upload_video(get_thread_service(), str(video_path), dict(metadata), archive=False)
+
+    def peertube(video_path: Path, metadata: dict) -> str:
+        from modules.pt_poster import upload_to_peertube
+        return upload_to_peertube(video_path, metadata["title"], metadata["description"])
+
+    return {"youtube": youtube, "peertube": peertube}
+
+
+def default_platforms(is_vertical: bool) -> list[str]:
+    """
+    YouTube gets everything; PeerTube only gets wide videos.
+    """
+    return ["youtube"] if is_vertical else ["youtube", "peertube"]
+
+
+class UploadQueue:
+    """
+    Upload jobs persisted in SQLite. Safe to share between threads; each call
+    opens its own connection.
+
+    Args:
+        db_path (Path): Queue database location.
+        max_attempts (int): Attempts before a job is marked failed for good.
+        lease_seconds (float): How long a claimed job stays reserved without a renewal.
+    """
+
+    def __init__(self, db_path: Path = UPLOAD_QUEUE_PATH, max_attempts: int = UPLOAD_MAX_ATTEMPTS,
+                 lease_seconds: float = UPLOAD_LEASE_SECONDS):
+        self.db_path = Path(db_path)
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS upload_jobs ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " video_path TEXT NOT NULL,"
+                " platform TEXT NOT NULL,"
+                " metadata TEXT NOT NULL,"
+                " state TEXT NOT NULL DEFAULT 'pending',"
+                " attempts INTEGER NOT NULL DEFAULT 0,"
+                " url TEXT,"
+                " error TEXT,"
+                " created TEXT NOT NULL,"
+                " updated TEXT NOT NULL,"
+                " owner TEXT,"
+                " lease_until REAL,"
+                " UNIQUE (video_path, platform))"
+            )
+            # Queues created before leases existed
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(upload_jobs)")}
+            for column, kind in (("owner", "TEXT"), ("lease_until", "REAL")):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE upload_jobs ADD COLUMN {column} {kind}")
+            conn.execute("CREATE INDEX IF NOT EXISTS upload_jobs_state ON upload_jobs (platform, state)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @staticmethod
+    def _row(row: sqlite3.Row) -> dict:
+        job = dict(row)
+        job["metadata"] = json.loads(job["metadata"])
+        return job
+
+    def enqueue(self, video_path: Path, metadata: dict, platforms: list[str] | None = None) -> list[int]:
+        """
+        Adds one job per platform. Re-enqueueing a video/platform pair that is
+        already queued or done is a no-op.
+
+        Returns:
+            list[int]: IDs of newly created jobs.
+        """
+        if platforms is None:
+            platforms = default_platforms(bool(metadata.get("is_vertical")))
+        created = []
+        with closing(self._connect()) as conn:
+            for platform in platforms:
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO upload_jobs (video_path, platform, metadata, created, updated)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (str(video_path), platform, json.dumps(metadata, default=str), _now(), _now()),
+                )
+                if cursor.rowcount:
+                    created.append(cursor.lastrowid)
+        if DEBUG:
+            print(f"[DEBUG] Enqueued {Path(video_path).name} for {', '.join(platforms)} ({len(created)} new)")
+        return created
+
+    def claim(self, platform: str, job_ids: list[int] | None = None) -> dict | None:
+        """
+        Atomically moves the oldest pending job for a platform to running and
+        leases it to this process.
+
+        Args:
+            platform (str): Platform to claim a job for.
+            job_ids (list[int] | None): Only consider these jobs.
+        """
+        query = "SELECT * FROM upload_jobs WHERE platform = ? AND state = 'pending'"
+        params = [platform]
+        if job_ids is not None:
+            query += f" AND id IN ({', '.join('?' * len(job_ids))})"
+            params += job_ids
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(query + " ORDER BY id LIMIT 1", params).fetchone()
+            if row:
+                conn.execute(
+                    "UPDATE upload_jobs SET state = 'running', attempts = attempts + 1, owner = ?,"
+                    " lease_until = ?, updated = ? WHERE id = ?",
+                    (OWNER, time.time() + self.lease_seconds, _now(), row["id"]),
+                )
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+        if row is None:
+            return None
+        job = self._row(row)
+        job["attempts"] += 1
+        job["state"] = "running"
+        return job
+
+    def renew(self, job_id: int) -> None:
+        """
+        Extends the lease on a job this process is still uploading.
+        """
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "UPDATE upload_jobs SET lease_until = ? WHERE id = ? AND state = 'running'",
+                (time.time() + self.lease_seconds, job_id),
+            )
+
+    def complete(self, job_id: int, url: str) -> None:
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "UPDATE upload_jobs SET state = 'done', url = ?, error = NULL, updated = ? WHERE id = ?",
+                (url, _now(), job_id),
+            )
+
+    def fail(self, job_id: int, error: str) -> str:
+        """
+        Records a failed attempt. The job goes back to pending until it has used
+        up max_attempts.
+
+        Returns:
+            str: The job's new state.
+        """
+        with closing(self._connect()) as conn:
+            attempts = conn.execute("SELECT attempts FROM upload_jobs WHERE id = ?", (job_id,)).fetchone()[0]
+            state = "failed" if attempts >= self.max_attempts else "pending"
+            conn.execute(
+                "UPDATE upload_jobs SET state = ?, error = ?, updated = ? WHERE id = ?",
+                (state, error, _now(), job_id),
+            )
+        return state
+
+    def recover(self) -> int:
+        """
+        Returns jobs left running by a dead process to pending. Jobs whose
+        worker is still renewing its lease are left alone, so this is safe to
+        call while other drains (in this or another process) are uploading.
+        """
+        with closing(self._connect()) as conn:
+            return conn.execute(
+                "UPDATE upload_jobs SET state = 'pending', owner = NULL, lease_until = NULL, updated = ?"
+                " WHERE state = 'running' AND (lease_until IS NULL OR lease_until < ?)",
+                (_now(), time.time()),
+            ).rowcount
+
+    def retry_failed(self, platform: str | None = None) -> int:
+        with closing(self._connect()) as conn:
+            return conn.execute(
+                "UPDATE upload_jobs SET state = 'pending', attempts = 0, updated = ?"
+                " WHERE state = 'failed' AND (? IS NULL OR platform = ?)",
+                (_now(), platform, platform),
+            ).rowcount
+
+    def jobs(self, state: str | None = None, platform: str | None = None,
+             video_path: Path | None = None) -> list[dict]:
+        video_path = None if video_path is None else str(video_path)
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT * FROM upload_jobs WHERE (? IS NULL OR state = ?) AND (? IS NULL OR platform = ?)"
+                " AND (? IS NULL OR video_path = ?) ORDER BY id",
+                (state, state, platform, platform, video_path, video_path),
+            ).fetchall()
+        return [self._row(row) for row in rows]
+
+    def wait_for(self, job_ids: list[int], poll_interval: float = 5.0) -> list[dict]:
+        """
+        Blocks until every listed job is done or failed for good, e.g. while
+        another process's drain finishes an upload it had already claimed.
+
+        Returns:
+            list[dict]: The finished jobs.
+        """
+        while True:
+            finished = [job for job in self.jobs() if job["id"] in job_ids]
+            if all(job["state"] in ("done", "failed") for job in finished):
+                return finished
+            time.sleep(poll_interval)
+
+    def counts(self) -> dict:
+        """
+        Returns {platform: {state: count}}.
+        """
+        counts = {}
+        with closing(self._connect()) as conn:
+            for platform, state, n in conn.execute(
+                "SELECT platform, state, COUNT(*) FROM upload_jobs GROUP BY platform, state"
+            ):
+                counts.setdefault(platform, {})[state] = n
+        return counts
+
+    def urls_for(self, video_path: Path) -> dict:
+        """
+        Returns {platform: url} for the finished uploads of one video.
+        """
+        with closing(self._connect()) as conn:
+            rows = conn.execute(
+                "SELECT platform, url FROM upload_jobs WHERE video_path = ? AND state = 'done'",
+                (str(video_path),),
+            ).fetchall()
+        return {platform: url for platform, url in rows}
+
+
+def _upload_leased(queue: UploadQueue, job: dict, uploader) -> str:
+    """
+    Runs one upload while a heartbeat thread keeps the job's lease alive.
+    """
+    finished = threading.Event()
+
+    def keep_leased():
+        while not finished.wait(queue.lease_seconds / 3):
+            queue.renew(job["id"])
+
+    threading.Thread(target=keep_leased, name=f"upload-lease-{job['id']}", daemon=True).start()
+    metadata = {key: value for key, value in job["metadata"].items() if key != "archive"}
+    try:
+        return uploader(Path(job["video_path"]), metadata)
+    finally:
+        finished.set()
+
+
+def _archive_upload(job: dict, url: str) -> None:
+    """
+    Saves the archive record queued with the job (if any), adding the new URL.
+    The history database merges it with URLs other platforms already added.
+    """
+    record = job["metadata"].get("archive")
+    if not record:
+        return
+    from modules.metadata_utils import save_metadata_record
+
+    try:
+        save_metadata_record({**record, f"{job['platform']}_urls": [url]})
+    except RuntimeError as e:
+        print(f"[WARN] Uploaded {Path(job['video_path']).name} but could not archive it: {e}")
+
+
+def _worker(queue: UploadQueue, platform: str, uploader, wait: bool, poll_interval: float,
+            stop_event: threading.Event, stats: dict, stats_lock: threading.Lock,
+            job_ids: list[int] | None = None) -> None:
+    while True:
+        job = queue.claim(platform, job_ids)
+        if job is None:
+            if not wait or stop_event.is_set():
+                return
+            stop_event.wait(poll_interval)
+            continue
+
+        video_path = Path(job["video_path"])
+        started = time.perf_counter()
+        try:
+            url = _upload_leased(queue, job, uploader)
+        except Exception as e:
+            state = queue.fail(job["id"], f"{type(e).__name__}: {e}")
+            print(f"❌ [{platform}] {video_path.name} attempt {job['attempts']} failed ({state}): {e}")
+            with stats_lock:
+                stats[platform]["failed"] += 1
+            continue
+
+        queue.complete(job["id"], url)
+        _archive_upload(job, url)
+        elapsed = time.perf_counter() - started
+        print(f"✅ [{platform}] {video_path.name} → {url} ({elapsed:.1f}s)")
+        with stats_lock:
+            stats[platform]["done"] += 1
+
+
+def drain(
+    queue: UploadQueue | None = None,
+    uploaders: dict | None = None,
+    concurrency: dict | None = None,
+    wait: bool = False,
+    poll_interval: float = 5.0,
+    stop_event: threading.Event | None = None,
+    job_ids: list[int] | None = None,
+) -> dict:
+    """
+    Works the queue with per-platform worker threads.
+
+    Args:
+        queue (UploadQueue | None): Queue to drain (default database if None).
+        uploaders (dict | None): Platform → `uploader(video_path, metadata) -> url`.
+        concurrency (dict | None): Platform → worker count (defaults to UPLOAD_CONCURRENCY).
+        wait (bool): Keep polling for new jobs until stop_event is set, instead of
+            returning once the queue is empty.
+        poll_interval (float): Seconds between polls of an empty queue when waiting.
+        stop_event (threading.Event | None): Set to make waiting workers exit once
+            the queue is empty.
+        job_ids (list[int] | None): Only work these jobs (default: everything queued).
+
+    Returns:
+        dict: Platform → {"done": n, "failed": n} for this drain.
+    """
+    queue = queue or UploadQueue()
+    uploaders = uploaders or default_uploaders()
+    limits = {**UPLOAD_CONCURRENCY, **(concurrency or {})}
+    stop_event = stop_event or threading.Event()
+
+    recovered = queue.recover()
+    if recovered:
+        print(f"🔁 Re-queued {recovered} upload(s) interrupted by a previous run")
+
+    stats = {platform: {"done": 0, "failed": 0} for platform in uploaders}
+    stats_lock = threading.Lock()
+    threads = [
+        threading.Thread(
+            target=_worker,
+            args=(queue, platform, uploader, wait, poll_interval, stop_event, stats, stats_lock, job_ids),
+            name=f"upload-{platform}-{index}",
+            daemon=True,
+        )
+        for platform, uploader in uploaders.items()
+        for index in range(limits.get(platform, 1))
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    print_queue_summary(queue, stats)
+    return stats
+
+
+def drain_in_background(queue: UploadQueue | None = None, **kwargs) -> tuple[threading.Thread, threading.Event]:
+    """
+    Starts drain(wait=True) on a daemon thread.
+
+    Returns:
+        tuple: (thread, stop_event). Set the event and join the thread to finish
+            everything queued so far and stop.
+    """
+    stop_event = threading.Event()
+    thread = threading.Thread(
+        target=drain,
+        kwargs={"queue": queue, "wait": True, "stop_event": stop_event, **kwargs},
+        name="upload-drain",
+        daemon=True,
+    )
+    thread.start()
+    return thread, stop_event
+
+
+def print_queue_summary(queue: UploadQueue, stats: dict) -> None:
+    print("\n📦 Upload queue")
+    for platform, result in stats.items():
+        print(f"   {platform:<10} uploaded={result['done']} failed={result['failed']}")
+    for platform, states in queue.counts().items():
+        print(f"   {platform:<10} " + " ".join(f"{state}={states.get(state, 0)}" for state in STATES))
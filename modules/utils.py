@@ -13,32 +13,27 @@ DATE_PATTERN = re.compile(r"^(\d{4})\.(\d{2})\.(\d{2})(?:\.(\d{1,2}))?$")
 
 def scan_for_new_clips(base_path: Path, subfolder: str) -> list[Path]:
     """
-    Recursively scan base_path for any files under a named subfolder
+    Scan base_path for any files under a named subfolder
     (e.g. 'montages', 'hits', etc).
-    Returns a list of all video files found.
+    Returns a list of all video files found (from the shared session snapshot).
     """
-    matching_clips = []
+    from modules.session_scanner import get_snapshot
 
-    for session_dir in base_path.iterdir():
-        if session_dir.is_dir() and session_dir.name.count(".") >= 2:
-            target_dir = session_dir / subfolder
-            if target_dir.exists():
-                for f in target_dir.glob("*.mp4"):
-                    matching_clips.append(f)
+    return [clip.path for clip in get_snapshot(base_path).clips(subfolder)]
 
-    return matching_clips
-
-def run_ffmpeg(cmd: list[str]) -> None:
+def run_ffmpeg(cmd: list[str], stage: str = "ffmpeg") -> None:
     """
     Execute an ffmpeg command, logging output and raising if the command fails.
+    Progress and metrics are handled by modules.ffmpeg_runner.
     """
     import subprocess
     from textwrap import indent
+    from modules.ffmpeg_runner import run_ffmpeg as run_with_progress
 
     print(f"\n🛠️  Running ffmpeg:\n{indent(' '.join(cmd), '    ')}\n")
 
     try:
-        subprocess.run(cmd, check=True)
+        run_with_progress(cmd, stage=stage)
     except subprocess.CalledProcessError as e:
         print(f"❌ FFmpeg failed with error: {e}")
         raise
@@ -6,16 +6,30 @@ This module handles the upload of videos to YouTube using the YouTube Data API v
 It supports setting metadata such as title, description, tags, category, and privacy settings.
 It also ensures that the game title "Fortnite" is included in the metadata to trigger proper categorization.
 
+Uploads are sent in YOUTUBE_CHUNK_SIZE chunks. The resumable session URI is
+persisted under UPLOAD_SESSION_DIR, keyed by the file's fingerprint, so a
+restarted process resumes mid-file instead of starting over.
+
+The Google client libraries are imported inside the functions that use them,
+so importing this module (e.g. from the pipeline) stays cheap for render-only runs.
+
 Author: gramps@llamachile.shop
 """
 
 import os
-import google.auth
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaFileUpload
+import json
+import time
+import random
+import socket
+import threading
+import http.client
+from pathlib import Path
+from datetime import datetime
 
-from modules.config import OPENAI_API_KEY, DEBUG
-from modules.archive import save_metadata_record
+from modules.config import DEBUG, YOUTUBE_CHUNK_SIZE, UPLOAD_SESSION_DIR, UPLOAD_MAX_RETRIES
+from modules.metadata_utils import save_metadata_record
+from modules.render_manifest import fingerprint_file
+from modules.metrics import record_metrics
 
 # Category ID for "Gaming" on YouTube (required for accurate categorization)
 CATEGORY_ID = "20"
@@ -29,6 +43,10 @@ DEFAULT_TAGS = [
 # Default visibility setting
 DEFAULT_PRIVACY = "public"
 
+# Server errors worth retrying (with exponential backoff)
+RETRYABLE_STATUS_CODES = {500, 502, 503, 504}
+RETRYABLE_EXCEPTIONS = (http.client.HTTPException, ConnectionError, socket.timeout, TimeoutError)
+
 def ensure_fortnite_tag(metadata):
     """
     Ensures that the word 'Fortnite' appears in at least one of the following:
@@ -44,7 +62,7 @@ def ensure_fortnite_tag(metadata):
        not any("fortnite" in tag.lower() for tag in metadata.get("tags", [])):
         metadata.setdefault("tags", []).append("Fortnite")
 
-def upload_video(youtube, video_path, metadata):
+def upload_video(youtube, video_path, metadata, archive=True):
     """
     Uploads a video to YouTube with the provided metadata.
 
@@ -52,10 +70,13 @@ def upload_video(youtube, video_path, metadata):
         youtube: Authenticated YouTube API service object.
         video_path: Path to the video file to be uploaded.
         metadata: Dictionary containing video metadata fields.
+        archive: Save the metadata record after upload. Callers that archive
+            in a later stage (see modules/pipeline.py) pass False.
 
     Returns:
         str: URL of the uploaded YouTube video.
     """
+    from googleapiclient.http import MediaFileUpload
 
     # Ensure the 'Fortnite' keyword is present somewhere in metadata
     ensure_fortnite_tag(metadata)
@@ -73,8 +94,8 @@ def upload_video(youtube, video_path, metadata):
         }
     }
 
-    # Wrap the video file in a MediaFileUpload object
-    media = MediaFileUpload(video_path, mimetype="video/*", resumable=True)
+    # Wrap the video file in a chunked, resumable MediaFileUpload
+    media = MediaFileUpload(video_path, mimetype="video/*", chunksize=YOUTUBE_CHUNK_SIZE, resumable=True)
 
     print(f"📤 Uploading {video_path} to YouTube...")
 
@@ -85,7 +106,7 @@ def upload_video(youtube, video_path, metadata):
         media_body=media
     )
 
-    response = request.execute()
+    response = upload_resumable(request, Path(video_path))
     video_id = response["id"]
     youtube_url = f"https://www.youtube.com/watch?v={video_id}"
 
@@ -95,11 +116,134 @@ def upload_video(youtube, video_path, metadata):
     metadata.setdefault("youtube_url", []).append(youtube_url)
 
     # Persist the metadata archive only if we're not in DEBUG mode
-    if not DEBUG:
-        save_metadata_record(video_path, metadata)
+    if archive and not DEBUG:
+        save_metadata_record(metadata)
 
     return youtube_url
 
+def _session_path(video_path: Path, session_dir: Path) -> Path:
+    return Path(session_dir) / f"youtube-{fingerprint_file(video_path)}.json"
+
+
+def _load_session_uri(session_path: Path) -> str | None:
+    try:
+        with open(session_path, "r", encoding="utf-8") as f:
+            return json.load(f).get("resumable_uri")
+    except (OSError, ValueError):
+        return None
+
+
+def _save_session_uri(session_path: Path, video_path: Path, uri: str) -> None:
+    session_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = session_path.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "resumable_uri": uri,
+            "video_path": str(video_path),
+            "created": datetime.now().isoformat(timespec="seconds"),
+        }, f)
+    os.replace(tmp_path, session_path)
+
+
+def upload_resumable(request, video_path: Path, session_dir: Path = UPLOAD_SESSION_DIR,
+                     max_retries: int = UPLOAD_MAX_RETRIES) -> dict:
+    """
+    Drives a resumable insert request chunk by chunk.
+
+    Persists the session URI after the first chunk and resumes from it when a
+    previous process died mid-upload. 5xx responses and dropped connections are
+    retried with jittered exponential backoff; progress and throughput are printed
+    and recorded in the metrics log.
+
+    Args:
+        request: googleapiclient HttpRequest with a resumable media body.
+        video_path (Path): File being uploaded (keys the persisted session).
+        session_dir (Path): Where session URIs are stored.
+        max_retries (int): Consecutive failures tolerated before giving up.
+
+    Returns:
+        dict: The API response for the created video.
+    """
+    from googleapiclient.errors import HttpError
+
+    video_path = Path(video_path)
+    total_bytes = video_path.stat().st_size
+    session_path = _session_path(video_path, session_dir)
+
+    saved_uri = _load_session_uri(session_path)
+    resumed = saved_uri is not None
+    if resumed:
+        print(f"🔁 Resuming YouTube upload session for {video_path.name}")
+        request.resumable_uri = saved_uri
+        # Makes the next next_chunk() ask the server how much it already has
+        request._in_error_state = True
+
+    started = time.perf_counter()
+    sent_bytes = 0
+    retries = 0
+    response = None
+
+    while response is None:
+        before = request.resumable_progress
+        try:
+            status, response = request.next_chunk(num_retries=0)
+        except HttpError as e:
+            code = e.resp.status
+            if resumed and code in (404, 410):
+                # Session expired server-side: start a fresh one
+                print(f"[WARN] Saved upload session for {video_path.name} expired; restarting upload")
+                session_path.unlink(missing_ok=True)
+                request.resumable_uri = None
+                request.resumable_progress = 0
+                request._in_error_state = False
+                resumed = False
+                continue
+            if code not in RETRYABLE_STATUS_CODES:
+                raise
+            error = e
+        except RETRYABLE_EXCEPTIONS as e:
+            error = e
+        else:
+            retries = 0
+            if request.resumable_uri and _load_session_uri(session_path) != request.resumable_uri:
+                _save_session_uri(session_path, video_path, request.resumable_uri)
+            progress = request.resumable_progress if response is None else total_bytes
+            # On resume the first jump includes what the server already had; count one chunk at most
+            sent_bytes += max(0, min(progress - before, YOUTUBE_CHUNK_SIZE))
+            elapsed = time.perf_counter() - started
+            rate = sent_bytes / elapsed / 1024**2 if elapsed else 0.0
+            print(f"⏫ {video_path.name}: {progress / total_bytes * 100:5.1f}% "
+                  f"({progress / 1024**2:.0f}/{total_bytes / 1024**2:.0f} MiB, {rate:.1f} MiB/s)")
+            continue
+
+        retries += 1
+        # Our side of the connection may be gone; resync progress with the server on the next call
+        request._in_error_state = request.resumable_uri is not None
+        if retries > max_retries:
+            print(f"❌ Upload of {video_path.name} failed after {max_retries} retries; session kept for resume")
+            raise error
+        delay = random.uniform(0, min(2 ** retries, 64))
+        print(f"[WARN] Upload error on {video_path.name} ({error}); retry {retries}/{max_retries} in {delay:.1f}s")
+        time.sleep(delay)
+
+    session_path.unlink(missing_ok=True)
+    elapsed = time.perf_counter() - started
+    stats = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "stage": "upload:youtube",
+        "output": str(video_path),
+        "wall_seconds": round(elapsed, 3),
+        "output_bytes": total_bytes,
+        "sent_bytes": sent_bytes,
+        "resumed": resumed,
+        "mib_per_second": round(sent_bytes / elapsed / 1024**2, 3) if elapsed else None,
+    }
+    record_metrics(stats)
+    print(f"📈 {video_path.name}: {sent_bytes / 1024**2:.0f} MiB in {elapsed:.1f}s "
+          f"({stats['mib_per_second']} MiB/s)")
+    return response
+
+
 def get_authenticated_service():
     """
     Returns an authenticated YouTube API service using Application Default Credentials.
@@ -109,7 +253,24 @@ def get_authenticated_service():
     Returns:
         googleapiclient.discovery.Resource: The YouTube API client object.
     """
+    import google.auth
+    from googleapiclient.discovery import build
+
     credentials, _ = google.auth.default(
         scopes=["https://www.googleapis.com/auth/youtube.upload"]
     )
     return build("youtube", "v3", credentials=credentials)
+
+
+# httplib2 connections aren't thread-safe, so each upload thread gets its own service
+_thread_services = threading.local()
+
+
+def get_thread_service():
+    """
+    Authenticates once per thread; concurrent upload workers never share a connection.
+    """
+    service = getattr(_thread_services, "service", None)
+    if service is None:
+        service = _thread_services.service = get_authenticated_service()
+    return service
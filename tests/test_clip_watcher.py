@@ -0,0 +1,71 @@
+# tests/test_clip_watcher.py
+"""
+Unit tests for watch mode: settle detection, polling and feeding the pipeline a stream.
+"""
+
+import asyncio
+from datetime import date
+
+from modules.clip_watcher import ClipWatcher, StabilityTracker
+from modules.pipeline import run_pipeline
+
+
+def _session(tmp_path, name=None):
+    montages = tmp_path / (name or date.today().strftime("%Y.%m.%d")) / "montages"
+    montages.mkdir(parents=True)
+    return montages
+
+
+def test_stability_tracker_waits_for_settle(tmp_path):
+    tracker = StabilityTracker(settle=30)
+    path = tmp_path / "clip.mp4"
+    assert not tracker.observe(path, 100, 1, now=0)
+    assert not tracker.observe(path, 200, 2, now=20)  # still growing: clock restarts
+    assert not tracker.observe(path, 200, 2, now=40)
+    assert tracker.observe(path, 200, 2, now=51)
+    assert not StabilityTracker(settle=0).observe(path, 0, 1, now=0)
+
+
+def test_poll_emits_clip_once_it_settles(tmp_path):
+    montages = _session(tmp_path)
+    clip = montages / "highlight.mp4"
+    clip.write_bytes(b"partial")
+
+    watcher = ClipWatcher(tmp_path, backend="polling", settle=30, full_rescan=3600)
+    assert watcher.poll(now=0) == []
+    clip.write_bytes(b"partial and then some")
+    assert watcher.poll(now=20) == []
+    assert watcher.poll(now=40) == []
+    assert watcher.poll(now=71) == [clip]
+    # Emitted once, until it changes again
+    assert watcher.poll(now=200) == []
+
+
+def test_poll_skips_unwanted_and_old_sessions(tmp_path):
+    montages = _session(tmp_path)
+    (montages / "done.mp4").write_bytes(b"x")
+    (montages / "new.mp4").write_bytes(b"x")
+    watcher = ClipWatcher(tmp_path, wanted=lambda p: p.name != "done.mp4", backend="polling", settle=0)
+    watcher.poll(now=0)
+    assert watcher.poll(now=1) == [montages / "new.mp4"]
+
+    # Old sessions are only seen by the periodic full rescan
+    old = _session(tmp_path, "2020.01.01")
+    (old / "late.mp4").write_bytes(b"x")
+    assert watcher.poll(now=2) == []
+    watcher.full_rescan = 0
+    watcher.poll(now=3)
+    assert watcher.poll(now=4) == [old / "late.mp4"]
+
+
+def test_pipeline_consumes_async_stream(tmp_path):
+    async def clips():
+        for name in ("a.mp4", "b.mp4"):
+            await asyncio.sleep(0)
+            yield tmp_path / name
+
+    seen = []
+    results = run_pipeline(clips(), {"describe": lambda job: job}, on_result=seen.append)
+    assert sorted(job["clip"].name for job in seen) == ["a.mp4", "b.mp4"]
+    assert all(job["error"] is None for job in seen)
+    assert results == []  # a stream's jobs only go to on_result
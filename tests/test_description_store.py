@@ -0,0 +1,40 @@
+# tests/test_description_store.py
+"""
+Unit tests for the description pool and notes-keyed description cache.
+"""
+
+from modules.description_store import (
+    DescriptionPool,
+    notes_cache_key,
+    get_cached_description,
+    cache_description,
+)
+
+
+def test_pool_serves_oldest_and_refills_when_low(tmp_path):
+    counter = iter(range(100))
+    pool = DescriptionPool(lambda: f"desc {next(counter)}", db_path=tmp_path / "d.sqlite3", target=4, low_water=3)
+
+    assert pool.refill() == 4
+    assert pool.take() == "desc 0"
+    assert pool.take() == "desc 1"  # drops below low water → background refill
+    pool.wait_for_refill(timeout=5)
+    assert pool.size() == 4
+
+
+def test_pool_refill_gives_up_after_consecutive_failures(tmp_path):
+    def broken():
+        raise TimeoutError("stand-in endpoint down")
+
+    pool = DescriptionPool(broken, db_path=tmp_path / "d.sqlite3", target=5)
+    assert pool.refill(max_failures=2) == 0
+    assert pool.take() is None
+
+
+def test_notes_cache_ignores_whitespace_only_edits(tmp_path):
+    db_path = tmp_path / "d.sqlite3"
+    assert notes_cache_key("big  win\n", "2025-07-25", "montage") == notes_cache_key("big win", "2025-07-25", "montage")
+
+    cache_description("big win", "2025-07-25", "montage", "Victory Royale!", db_path=db_path)
+    assert get_cached_description(" big win ", "2025-07-25", "montage", db_path=db_path) == "Victory Royale!"
+    assert get_cached_description("big win", "2025-07-25", "short", db_path=db_path) is None
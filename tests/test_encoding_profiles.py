@@ -0,0 +1,44 @@
+# tests/test_encoding_profiles.py
+"""
+Unit tests for the encoding profile helpers shared by every render path.
+"""
+
+import pytest
+
+from modules.config import RENDER_PROFILE
+from modules.encoding_profiles import (
+    get_profile,
+    video_encode_args,
+    audio_encode_args,
+    output_geometry,
+    scale_filter,
+)
+
+
+def test_get_profile_names_and_defaults():
+    assert get_profile("draft")["name"] == "draft"
+    assert get_profile()["name"] == RENDER_PROFILE
+    with pytest.raises(ValueError, match="Unknown encoding profile 'huge'"):
+        get_profile("huge")
+
+
+def test_codec_args_follow_the_profile():
+    draft = get_profile("draft")
+    assert video_encode_args(draft) == ["-c:v", "libx264", "-preset", "ultrafast", "-crf", "30", "-pix_fmt", "yuv420p"]
+    assert audio_encode_args(draft) == ["-c:a", "aac", "-b:a", "96k"]
+
+
+@pytest.mark.parametrize("name, is_vertical, geometry, scale", [
+    ("draft", False, (960, 540), "scale=960:540"),
+    ("draft", True, (540, 960), "scale=540:960"),
+    ("preview", False, (1280, 720), "scale=1280:720"),
+    ("archive", True, (1080, 1920), None),
+])
+def test_geometry_and_scale_filter(name, is_vertical, geometry, scale):
+    profile = get_profile(name)
+    assert output_geometry(profile, is_vertical) == geometry
+    assert scale_filter(profile, is_vertical) == scale
+
+
+def test_odd_dimensions_are_rounded_down_to_even():
+    assert output_geometry({"short_side": 361}, is_vertical=False) == (640, 360)
@@ -0,0 +1,76 @@
+# tests/test_ffmpeg_runner.py
+"""
+Unit tests for the progress-reporting ffmpeg runner.
+
+A tiny shell script stands in for ffmpeg and emits `-progress` style output.
+"""
+
+import os
+import json
+import stat
+import subprocess
+
+import pytest
+
+from modules import ffmpeg_runner, metrics
+from modules.ffmpeg_runner import run_ffmpeg
+
+FAKE_FFMPEG = """#!/bin/sh
+out="$(eval echo \\${$#})"
+printf 'frame=30\\nfps=60.0\\nout_time_us=1000000\\nspeed=2.0x\\nprogress=continue\\n'
+printf 'frame=60\\nfps=60.0\\nout_time_us=2000000\\nspeed=2.0x\\nprogress=end\\n'
+printf 'x%.0s' $(seq 1 128) > "$out"
+echo "some log line" >&2
+exit ${FAKE_EXIT:-0}
+"""
+
+
+@pytest.fixture
+def fake_ffmpeg(tmp_path, monkeypatch):
+    script = tmp_path / "ffmpeg"
+    script.write_text(FAKE_FFMPEG)
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setattr(metrics, "METRICS_LOG_PATH", tmp_path / "metrics.jsonl")
+    return script
+
+
+def test_metrics_record_written_per_stage(tmp_path, fake_ffmpeg):
+    output = tmp_path / "out.mp4"
+    record = run_ffmpeg([str(fake_ffmpeg), "-i", "in.mp4", str(output)], stage="render", duration=2.0)
+
+    assert record["stage"] == "render"
+    assert record["media_seconds"] == 2.0
+    assert record["output_bytes"] == 128
+    assert record["realtime_factor"] > 0
+
+    lines = (tmp_path / "metrics.jsonl").read_text().splitlines()
+    assert json.loads(lines[-1])["stage"] == "render"
+
+
+def test_failure_raises_with_stderr_tail(tmp_path, fake_ffmpeg, monkeypatch):
+    monkeypatch.setenv("FAKE_EXIT", "1")
+    with pytest.raises(subprocess.CalledProcessError) as excinfo:
+        run_ffmpeg([str(fake_ffmpeg), str(tmp_path / "out.mp4")], stage="render")
+    assert "some log line" in excinfo.value.stderr
+
+
+def test_interrupted_progress_loop_kills_ffmpeg(tmp_path, fake_ffmpeg, monkeypatch):
+    hanging = tmp_path / "ffmpeg-hang"
+    hanging.write_text(
+        "#!/bin/sh\n"
+        f"echo $$ > {tmp_path / 'pid'}\n"
+        "printf 'out_time_us=1000000\\nspeed=1.0x\\nprogress=continue\\n'\n"
+        "exec sleep 30\n"
+    )
+    hanging.chmod(hanging.stat().st_mode | stat.S_IEXEC)
+
+    def interrupted(value):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(ffmpeg_runner, "_parse_speed", interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        run_ffmpeg([str(hanging), str(tmp_path / "out.mp4")], stage="render")
+
+    pid = int((tmp_path / "pid").read_text())
+    with pytest.raises(ProcessLookupError):
+        os.kill(pid, 0)  # killed and reaped, not left running as a zombie
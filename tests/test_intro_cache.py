@@ -0,0 +1,80 @@
+# tests/test_intro_cache.py
+"""
+Unit tests for the title intro cache: key derivation, cache hits and LRU eviction.
+"""
+
+import os
+
+from modules import intro_cache
+from modules.intro_cache import intro_cache_key, get_title_intro, evict_intro_cache
+
+
+def _assets(tmp_path):
+    intro = tmp_path / "intro.mp4"
+    font = tmp_path / "font.ttf"
+    intro.write_bytes(b"intro")
+    font.write_bytes(b"font")
+    return intro, font
+
+
+def test_cache_key_covers_every_input(tmp_path):
+    intro, font = _assets(tmp_path)
+    base = intro_cache_key(intro, ["Title", "July 1"], font, is_vertical=False)
+
+    assert intro_cache_key(intro, ["Title", "July 1"], font, is_vertical=False) == base
+    variants = [
+        intro_cache_key(intro, ["Title", "July 2"], font, is_vertical=False),
+        intro_cache_key(intro, ["Title", "July 1"], font, is_vertical=True),
+        intro_cache_key(intro, ["Title", "July 1"], font, is_vertical=False, mezzanine=True),
+        intro_cache_key(intro, ["Title", "July 1"], font, is_vertical=False, profile="draft"),
+    ]
+    assert len({base, *variants}) == 5
+
+    # A replaced intro (new size/mtime) gets a new key
+    intro.write_bytes(b"new intro")
+    assert intro_cache_key(intro, ["Title", "July 1"], font, is_vertical=False) != base
+
+
+def test_title_intro_is_rendered_once_per_key(tmp_path, monkeypatch):
+    intro, font = _assets(tmp_path)
+    renders = []
+
+    def fake_overlay(intro_path, overlay_text, output_path, **kwargs):
+        renders.append(overlay_text)
+        output_path.write_bytes(b"rendered")
+
+    monkeypatch.setattr(intro_cache, "generate_title_overlay", fake_overlay)
+    cache_dir = tmp_path / "cache"
+
+    first = get_title_intro(intro, ["Title"], font, cache_dir=cache_dir)
+    second = get_title_intro(intro, ["Title"], font, cache_dir=cache_dir)
+
+    assert first == second
+    assert first.read_bytes() == b"rendered"
+    assert renders == [["Title"]]
+    assert not list(cache_dir.glob("*.tmp.mp4"))
+
+
+def test_eviction_drops_least_recently_used_first(tmp_path):
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    paths = []
+    for age, name in enumerate(["newest", "middle", "oldest"]):
+        path = cache_dir / f"{name}.mp4"
+        path.write_bytes(b"x" * 100)
+        os.utime(path, (1_000_000 - age * 100, 1_000_000 - age * 100))
+        paths.append(path)
+    in_progress = cache_dir / "key.abc.tmp.mp4"
+    in_progress.write_bytes(b"x" * 100)
+    os.utime(in_progress, (1, 1))
+    newest, middle, oldest = paths
+
+    assert evict_intro_cache(cache_dir, max_bytes=250) == 100
+    assert not oldest.exists()
+    assert middle.exists() and newest.exists()
+    assert in_progress.exists()  # temp files belong to running encodes
+
+    # The intro just rendered is never evicted, even when it is the oldest
+    assert evict_intro_cache(cache_dir, max_bytes=150, keep=middle) == 100
+    assert middle.exists()
+    assert not newest.exists()
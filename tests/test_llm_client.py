@@ -0,0 +1,77 @@
+# tests/test_llm_client.py
+"""
+Unit tests for the shared rate-limited LLM client.
+"""
+
+import time
+import threading
+
+import pytest
+
+from modules import metrics
+from modules.llm_client import LLMClient
+
+
+class FlakyTransport:
+    """Fails the first `failures` calls with a retryable error, then answers."""
+
+    def __init__(self, failures=0, delay=0.0):
+        self.failures = failures
+        self.delay = delay
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, model, messages, timeout, **params):
+        with self.lock:
+            self.calls += 1
+            call = self.calls
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.delay)
+            if call <= self.failures:
+                raise ConnectionError("stand-in endpoint reset")
+            return f"{messages[0]['content']}!", {"prompt_tokens": 3, "completion_tokens": 5}
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+
+@pytest.fixture(autouse=True)
+def metrics_log(tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics, "METRICS_LOG_PATH", tmp_path / "metrics.jsonl")
+
+
+def test_retries_transient_errors_then_succeeds():
+    transport = FlakyTransport(failures=2)
+    client = LLMClient(transport, backoff_base=0.01, requests_per_minute=6000, burst=10)
+
+    text = client.complete_sync([{"role": "user", "content": "hi"}], model="test")
+
+    assert text == "hi!"
+    assert transport.calls == 3
+    summary = client.metrics_summary()
+    assert summary["retries"] == 2 and summary["succeeded"] == 1
+    assert summary["completion_tokens"] == 5
+
+
+def test_complete_many_respects_concurrency_cap():
+    transport = FlakyTransport(delay=0.05)
+    client = LLMClient(transport, max_concurrency=3, requests_per_minute=60000, burst=50)
+
+    requests = [{"messages": [{"role": "user", "content": str(i)}], "model": "test"} for i in range(12)]
+    results = client.complete_many(requests)
+
+    assert results == [f"{i}!" for i in range(12)]
+    assert transport.max_in_flight == 3
+
+
+def test_deadline_stops_retrying():
+    transport = FlakyTransport(failures=100, delay=0.05)
+    client = LLMClient(transport, backoff_base=0.05, max_retries=50, requests_per_minute=60000, burst=50)
+
+    with pytest.raises((ConnectionError, TimeoutError)):
+        client.complete_sync([{"role": "user", "content": "hi"}], model="test", deadline=0.3)
+    assert transport.calls < 10
@@ -0,0 +1,38 @@
+# tests/test_media_probe.py
+"""
+Unit tests for the cached media probe.
+"""
+
+import os
+
+from modules import media_probe
+from modules.media_probe import probe_media, concat_normalise_filter
+
+
+def test_probe_runs_once_per_file_version(tmp_path, monkeypatch):
+    clip = tmp_path / "clip.mp4"
+    clip.write_bytes(b"not really a video")
+    cache_path = tmp_path / "probe.sqlite3"
+    calls = []
+
+    def fake_ffprobe(path):
+        calls.append(path)
+        return {"duration": 12.5, "width": 1920, "height": 1080, "fps": 60.0, "has_audio": True}
+
+    monkeypatch.setattr(media_probe, "_run_ffprobe", fake_ffprobe)
+
+    assert probe_media(clip, cache_path)["duration"] == 12.5
+    media_probe._memory_cache.clear()  # simulate a fresh process
+    assert probe_media(clip, cache_path)["width"] == 1920
+    assert len(calls) == 1
+
+    st = clip.stat()
+    os.utime(clip, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    probe_media(clip, cache_path)
+    assert len(calls) == 2
+
+
+def test_concat_normalise_filter_skips_satisfied_steps():
+    assert concat_normalise_filter({"fps": 30.0, "sar": "1:1"}) == "null"
+    assert concat_normalise_filter({"fps": 60.0, "sar": "1:1"}) == "fps=30"
+    assert concat_normalise_filter({"fps": None, "sar": None}) == "fps=30,setsar=1"
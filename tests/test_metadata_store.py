@@ -0,0 +1,72 @@
+# tests/test_metadata_store.py
+"""
+Unit tests for the indexed SQLite metadata history.
+"""
+
+import json
+
+from modules.metadata_store import (
+    save_record,
+    find_clip,
+    find_by_url,
+    query_clips,
+    import_json_tree,
+    export_json_tree,
+)
+
+
+def _record(date, stem, clip_type="montages", format="wide", youtube=(), peertube=()):
+    return {
+        "session_date": date,
+        "stem": stem,
+        "filename": f"{stem}.mp4",
+        "clip_type": clip_type,
+        "format": format,
+        "youtube_urls": list(youtube),
+        "peertube_urls": list(peertube),
+    }
+
+
+def test_queries_by_date_type_format_and_url(tmp_path):
+    db = tmp_path / "history.sqlite3"
+    save_record(_record("2025-07-01", "a", youtube=["https://youtu.be/a"]), db)
+    save_record(_record("2025-07-10", "b", format="vertical"), db)
+    save_record(_record("2025-08-01", "c", clip_type="hits", peertube=["https://pt.example/w/c"]), db)
+
+    assert [c["stem"] for c in query_clips(db, start_date="2025-07-01", end_date="2025-07-31")] == ["a", "b"]
+    assert [c["stem"] for c in query_clips(db, format="vertical")] == ["b"]
+    assert [c["stem"] for c in query_clips(db, uploaded=False)] == ["b"]
+    assert [c["stem"] for c in query_clips(db, uploaded=True, platform="peertube")] == ["c"]
+    assert find_by_url(db, "https://youtu.be/a")["stem"] == "a"
+    assert find_by_url(db, "https://youtu.be/missing") is None
+
+
+def test_resaving_merges_upload_urls(tmp_path):
+    db = tmp_path / "history.sqlite3"
+    save_record(_record("2025-07-01", "a", youtube=["https://youtu.be/a"]), db)
+    save_record({**_record("2025-07-01", "a", peertube=["https://pt.example/w/a"]), "title": "Updated"}, db)
+
+    [clip] = find_clip(db, "a")
+    assert clip["title"] == "Updated"
+    assert clip["urls"] == {"youtube": ["https://youtu.be/a"], "peertube": ["https://pt.example/w/a"]}
+    assert clip["record"]["youtube_urls"] == ["https://youtu.be/a"]
+
+    export_json_tree(db, tmp_path / "export")
+    exported = json.loads((tmp_path / "export" / "2025.07.01" / "a.json").read_text())
+    assert (exported["youtube_urls"], exported["peertube_urls"]) == (["https://youtu.be/a"], ["https://pt.example/w/a"])
+
+
+def test_json_tree_import_export_roundtrip(tmp_path):
+    history = tmp_path / "processed"
+    (history / "2025.07.25").mkdir(parents=True)
+    record = {**_record("2025-07-25", "clip-1", youtube=["https://youtu.be/x"]), "session_number": 2}
+    (history / "2025.07.25" / "clip-1.json").write_text(json.dumps(record))
+    (history / "2025.07.25" / "broken.json").write_text("{not json")
+    db = tmp_path / "history.sqlite3"
+
+    assert import_json_tree(history, db) == {"imported": 1, "skipped": 1}
+    assert find_clip(db, "clip-1")[0]["session_name"] == "2025.07.25.2"
+
+    assert export_json_tree(db, tmp_path / "export") == 1
+    exported = json.loads((tmp_path / "export" / "2025.07.25" / "clip-1.json").read_text())
+    assert exported["youtube_urls"] == ["https://youtu.be/x"]
@@ -0,0 +1,89 @@
+# tests/test_mezzanine.py
+"""
+Unit tests for mezzanine segments and stream-copy assembly, with probing and ffmpeg faked.
+"""
+
+from pathlib import Path
+
+from modules import mezzanine
+from modules.mezzanine import can_stream_copy, encode_segment, render_montage_stream_copy, AUDIO_RATE
+
+
+def _fake_probe(monkeypatch, **info):
+    monkeypatch.setattr(mezzanine, "probe_media", lambda path: {"duration": 10.0, **info})
+
+
+def _capture_ffmpeg(monkeypatch):
+    calls = []
+
+    def fake_run(cmd, stage, duration=None, **kwargs):
+        call = {"cmd": cmd, "stage": stage, "duration": duration}
+        if "concat" in cmd:
+            call["list"] = Path(cmd[cmd.index("-i") + 1]).read_text()
+        calls.append(call)
+
+    monkeypatch.setattr(mezzanine, "run_ffmpeg", fake_run)
+    return calls
+
+
+def test_can_stream_copy_needs_native_geometry_and_audio(monkeypatch):
+    _fake_probe(monkeypatch, width=1920, height=1080, has_audio=True)
+    assert can_stream_copy(Path("wide.mp4"), is_vertical=False)
+    assert not can_stream_copy(Path("wide.mp4"), is_vertical=True)
+
+    _fake_probe(monkeypatch, width=1920, height=1080, has_audio=False)
+    assert not can_stream_copy(Path("silent.mp4"), is_vertical=False)
+
+    _fake_probe(monkeypatch, width=1280, height=720, has_audio=True)
+    assert not can_stream_copy(Path("small.mp4"), is_vertical=False)
+
+
+def test_encode_segment_adds_silence_to_sources_without_audio(monkeypatch):
+    _fake_probe(monkeypatch, has_audio=False)
+    calls = _capture_ffmpeg(monkeypatch)
+
+    encode_segment(Path("outro.mp4"), Path("seg.mp4"), is_vertical=False, pre_filter="drawtext=x", duration=4.0,
+                   profile="final")
+
+    [call] = calls
+    cmd = call["cmd"]
+    assert cmd[cmd.index("-t") + 1] == "4.0"
+    lavfi = cmd.index("lavfi")
+    assert cmd[lavfi - 1:lavfi + 3] == ["-f", "lavfi", "-i", f"anullsrc=r={AUDIO_RATE}:cl=stereo"]
+    assert cmd[cmd.index("-map") + 1:cmd.index("-map") + 4] == ["0:v:0", "-map", "1:a:0"]
+    assert cmd[cmd.index("-vf") + 1].startswith("drawtext=x,fps=30,scale=1920:1080")
+    assert "-shortest" in cmd
+    assert call["duration"] == 4.0  # the shorter of the limit and the probed duration
+
+
+def test_encode_segment_keeps_source_audio(monkeypatch):
+    _fake_probe(monkeypatch, has_audio=True)
+    calls = _capture_ffmpeg(monkeypatch)
+
+    encode_segment(Path("intro.mp4"), Path("seg.mp4"), is_vertical=True, profile="draft")
+
+    cmd = calls[0]["cmd"]
+    assert "lavfi" not in cmd
+    assert cmd[cmd.index("-map") + 3] == "0:a:0"
+    assert "scale=540:960" in cmd[cmd.index("-vf") + 1]
+
+
+def test_stream_copy_concat_list_and_cleanup(tmp_path, monkeypatch):
+    _fake_probe(monkeypatch, has_audio=True)
+    calls = _capture_ffmpeg(monkeypatch)
+    intro = tmp_path / "it's intro.mp4"
+    outro = tmp_path / "outro.mp4"
+    output = tmp_path / "out.mp4"
+
+    render_montage_stream_copy(intro, tmp_path / "montage.mp4", outro, tmp_path / "music.wav", output)
+
+    body, concat = calls
+    body_path = Path(body["cmd"][-1])
+    assert body["stage"] == "stream-copy-body"
+    assert concat["list"].splitlines() == [
+        f"file '{tmp_path.resolve()}/it'\\''s intro.mp4'",
+        f"file '{body_path.resolve()}'",
+        f"file '{outro.resolve()}'",
+    ]
+    assert concat["cmd"][-5:] == ["-c", "copy", "-movflags", "+faststart", str(output)]
+    assert not list(tmp_path.iterdir())  # body and concat list removed
@@ -0,0 +1,79 @@
+# tests/test_pipeline.py
+"""
+Unit tests for the asynchronous staged pipeline.
+"""
+
+import time
+import threading
+from pathlib import Path
+
+from modules.pipeline import run_pipeline, parse_stage_limits
+
+import pytest
+
+
+def test_stages_overlap_and_failures_skip_downstream():
+    active = {"describe": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def thumbnail(job):
+        job["thumbnail"] = f"{job['clip'].stem}.jpg"
+        return job
+
+    def describe(job):
+        with lock:
+            active["describe"] += 1
+            active["peak"] = max(active["peak"], active["describe"])
+        time.sleep(0.05)
+        with lock:
+            active["describe"] -= 1
+        if job["clip"].stem == "bad":
+            raise RuntimeError("LLM timeout")
+        job["description"] = "copy"
+        return job
+
+    def archive(job):
+        job["archived"] = True
+        return job
+
+    clips = [Path("a.mp4"), Path("bad.mp4"), Path("c.mp4"), Path("d.mp4")]
+    results = run_pipeline(
+        clips,
+        {"thumbnail": thumbnail, "describe": describe, "archive": archive},
+        concurrency={"thumbnail": 1, "describe": 3, "archive": 1},
+        queue_size=1,
+    )
+
+    by_clip = {job["clip"].stem: job for job in results}
+    assert len(results) == 4
+    assert active["peak"] > 1
+    assert by_clip["bad"]["error"].startswith("describe")
+    assert "archived" not in by_clip["bad"]
+    assert all(by_clip[name].get("archived") for name in ("a", "c", "d"))
+
+
+def test_parse_stage_limits():
+    assert parse_stage_limits("render=2, upload=1") == {"render": 2, "upload": 1}
+    assert parse_stage_limits(None) == {}
+    with pytest.raises(ValueError):
+        parse_stage_limits("encode=2")
+
+
+def test_upload_stage_matches_queue_platforms(monkeypatch):
+    from modules import pipeline, upload_queue
+
+    calls = []
+    monkeypatch.setattr(upload_queue, "default_uploaders", lambda: {
+        platform: (lambda path, metadata, platform=platform: calls.append(platform) or f"https://{platform}/{path.stem}")
+        for platform in ("youtube", "peertube")
+    })
+    monkeypatch.setattr("modules.title_utils.extract_session_metadata", lambda clip: "2025.06.01")
+    base = {"title": "t", "description": "d", "timings": {}, "clip": Path("c.mp4")}
+
+    wide = pipeline.upload_stage({**base, "output": "wide.mp4", "is_vertical": False})
+    vertical = pipeline.upload_stage({**base, "output": "vert.mp4", "is_vertical": True})
+
+    assert calls == ["youtube", "peertube", "youtube"]
+    assert pipeline._archive_record(wide)["peertube_urls"] == ["https://peertube/wide"]
+    assert pipeline._archive_record(vertical)["peertube_urls"] == []
+    assert "peertube_url" not in vertical
@@ -0,0 +1,114 @@
+# tests/test_pt_poster.py
+"""
+Exercises the PeerTube resumable uploader against a local stand-in server.
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("requests")
+
+from modules import metrics, pt_poster
+from modules.pt_poster import PeerTubeClient
+
+
+class StandInPeerTube(BaseHTTPRequestHandler):
+    """Implements just enough of PeerTube's OAuth and resumable upload API."""
+
+    state = None  # set per test
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, body=None, headers=None):
+        payload = json.dumps(body).encode() if body is not None else b""
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        self._reply(200, {"client_id": "cid", "client_secret": "secret"})
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.path == "/api/v1/users/token":
+            self.state["token_requests"] += 1
+            self._reply(200, {"access_token": "tok", "refresh_token": "ref", "expires_in": 3600})
+        else:
+            assert self.headers["Authorization"] == "Bearer tok"
+            self.state["fields"] = json.loads(body)
+            self.state["total"] = int(self.headers["X-Upload-Content-Length"])
+            self._reply(201, headers={"Location": "/api/v1/videos/upload-resumable?upload_id=u1"})
+
+    def do_PUT(self):
+        state = self.state
+        data = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        content_range = self.headers["Content-Range"]
+        if content_range.startswith("bytes */"):
+            state["queries"] += 1
+        else:
+            state["puts"] += 1
+            if state["puts"] == state.get("fail_on_put"):
+                return self._reply(503)
+            start = int(content_range.split()[1].split("-")[0])
+            assert start == len(state["received"])
+            state["received"] += data
+        if len(state["received"]) >= state["total"]:
+            return self._reply(200, {"video": {"id": 1, "uuid": "uuid-1", "shortUUID": "abc"}})
+        headers = {"Range": f"bytes=0-{len(state['received']) - 1}"} if state["received"] else {}
+        self._reply(308, headers=headers)
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics, "METRICS_LOG_PATH", tmp_path / "metrics.jsonl")
+    monkeypatch.setattr(pt_poster.time, "sleep", lambda _: None)
+    StandInPeerTube.state = {"token_requests": 0, "queries": 0, "puts": 0, "received": b""}
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), StandInPeerTube)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_port}", StandInPeerTube.state
+    httpd.shutdown()
+
+
+def test_chunked_upload_retries_and_reuses_cached_token(server, tmp_path):
+    base_url, state = server
+    video = tmp_path / "clip.mp4"
+    video.write_bytes(bytes(range(256)) * 40)  # 10 KiB → 3 chunks of 4 KiB
+    state["fail_on_put"] = 2
+
+    client = PeerTubeClient(base_url, "gramps", "pw", token_cache=tmp_path / "token.json", chunk_size=4096)
+    url = client.upload(video, {"name": "Highlights", "channelId": 1}, session_dir=tmp_path / "sessions")
+
+    assert url == f"{base_url}/w/abc"
+    assert state["received"] == video.read_bytes()
+    assert state["fields"]["filename"] == "clip.mp4"
+    assert state["queries"] == 1  # resynced with the server after the 503
+    assert not list((tmp_path / "sessions").iterdir())
+
+    fresh = PeerTubeClient(base_url, "gramps", "pw", token_cache=tmp_path / "token.json")
+    assert fresh.access_token() == "tok"
+    assert state["token_requests"] == 1
+
+
+def test_upload_resumes_persisted_session(server, tmp_path):
+    base_url, state = server
+    video = tmp_path / "clip.mp4"
+    video.write_bytes(b"x" * 10_000)
+    sessions = tmp_path / "sessions"
+    client = PeerTubeClient(base_url, "gramps", "pw", token_cache=tmp_path / "token.json", chunk_size=4096)
+
+    # A previous process opened the session and sent the first chunk before dying
+    upload_url = client.start_upload(video, {"name": "Highlights"})
+    pt_poster._save_session_url(sessions / f"peertube-{pt_poster.fingerprint_file(video)}.json", video, upload_url)
+    state["received"] = b"x" * 4096
+
+    client.upload(video, {"name": "Highlights"}, session_dir=sessions)
+
+    assert len(state["received"]) == 10_000
+    assert state["puts"] == 2
@@ -0,0 +1,102 @@
+# tests/test_render_engine.py
+"""
+Unit tests for the single-pass and multi-output graphs built by render_engine.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from modules.render_engine import build_output_graph, default_output_specs, _stills_glob
+
+
+def test_default_specs_split_into_final_proxy_and_stills():
+    graph, args = build_output_graph(default_output_specs(Path("out/clip.mp4"), profile="final"), is_vertical=False)
+
+    assert "[outv]split=3[s0][s1][s2]" in graph
+    assert "[outa]asplit=2[sa0][sa1]" in graph
+    assert "[s0]null[o0]" in graph                      # final stays at native size
+    assert "[s1]scale=960:540[o1]" in graph             # 540p proxy
+    assert "[s2]fps=1/10.0,scale=960:540[o2]" in graph  # periodic stills
+
+    outputs = [arg for arg in args if arg.endswith((".mp4", ".jpg"))]
+    assert outputs == [str(Path("out/clip.mp4")), str(Path("out/clip-proxy.mp4")), str(Path("out/clip-still-%03d.jpg"))]
+    # Stills get no audio map
+    assert args.count("-map") == 5
+
+
+def test_vertical_proxy_geometry_and_threads():
+    specs = [{"name": "proxy", "kind": "video", "path": "p.mp4", "profile": "draft", "short_side": 540}]
+    graph, args = build_output_graph(specs, is_vertical=True, threads=4)
+    assert "[s0]scale=540:960[o0]" in graph
+    assert args[-3:] == ["-threads", "4", "p.mp4"]
+
+
+def test_invalid_specs_are_rejected():
+    with pytest.raises(ValueError):
+        build_output_graph([], is_vertical=False)
+    with pytest.raises(ValueError):
+        build_output_graph([{"name": "x", "kind": "gif", "path": "x.gif"}], is_vertical=False)
+    with pytest.raises(ValueError):
+        build_output_graph([{"name": "a", "kind": "video", "path": "a.mp4"}] * 2, is_vertical=False)
+
+
+def test_stills_glob():
+    assert _stills_glob(Path("out/clip-still-%03d.jpg")) == "clip-still-*.jpg"
+
+
+def test_single_pass_graph_fuses_title_concat_and_music(tmp_path, monkeypatch):
+    from modules import render_engine
+
+    paths = {name: tmp_path / name for name in ("intro.mp4", "montage.mp4", "outro.mp4", "music.wav", "font.ttf")}
+    for path in paths.values():
+        path.write_bytes(b"x")
+    infos = {
+        "intro.mp4": {"duration": 4.0, "fps": 30.0, "sar": "1:1"},
+        "montage.mp4": {"duration": 60.0, "fps": 60.0, "sar": "1:1"},
+        "outro.mp4": {"duration": 6.0, "fps": 30.0, "sar": None},
+    }
+    calls = []
+    monkeypatch.setattr(render_engine, "probe_media", lambda path: infos[Path(path).name])
+    monkeypatch.setattr(render_engine, "title_timing", lambda path: (4.0, 3.5))
+    monkeypatch.setattr(render_engine, "run_ffmpeg", lambda cmd, **kwargs: calls.append((cmd, kwargs)))
+
+    render_engine.render_montage_single_pass(
+        stock_intro_path=paths["intro.mp4"],
+        overlay_text=["Title"],
+        font_path=paths["font.ttf"],
+        montage_path=paths["montage.mp4"],
+        output_path=tmp_path / "out.mp4",
+        outro_path=paths["outro.mp4"],
+        music_path=paths["music.wav"],
+        is_vertical=True,
+        threads=2,
+        profile="draft",
+    )
+
+    [(cmd, kwargs)] = calls
+    graph = cmd[cmd.index("-filter_complex") + 1]
+    assert cmd[cmd.index("-t") + 1] == "4.0"
+    assert graph.startswith("[0:v:0]drawtext=text='Title':")
+    assert "fade=t=out:st=3.5:d=0.5:alpha=1,null[v0]" in graph  # intro already 30 fps, square pixels
+    assert "[1:v:0]fps=30[v1]" in graph
+    assert "[3:v:0]setsar=1[v3]" in graph
+    assert "[v0][v1][v3]concat=n=3:v=1:a=0,scale=540:960[outv]" in graph
+    assert "[a1][2:a:0]amix=inputs=2:duration=first[outa]" in graph
+    assert cmd[-3:] == ["-threads", "2", str(tmp_path / "out.mp4")]
+    assert kwargs == {"stage": "render-single-pass", "duration": 70.0}
+
+
+def test_single_pass_requires_every_input(tmp_path):
+    from modules.render_engine import render_montage_single_pass
+
+    with pytest.raises(FileNotFoundError, match="Intro file"):
+        render_montage_single_pass(
+            stock_intro_path=tmp_path / "missing.mp4",
+            overlay_text=["Title"],
+            font_path=tmp_path / "font.ttf",
+            montage_path=tmp_path / "montage.mp4",
+            output_path=tmp_path / "out.mp4",
+            outro_path=tmp_path / "outro.mp4",
+            music_path=tmp_path / "music.wav",
+        )
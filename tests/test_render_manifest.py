@@ -0,0 +1,61 @@
+# tests/test_render_manifest.py
+"""
+Unit tests for the processed-clip render manifest.
+"""
+
+import os
+from pathlib import Path
+
+from modules.render_manifest import (
+    load_manifest,
+    save_manifest,
+    needs_render,
+    record_render,
+)
+
+SETTINGS = {"preset": "slow", "crf": 18}
+ASSETS = {"intro_wide": "1:1"}
+
+
+def _make_clip(tmp_path: Path, payload: bytes = b"montage-bytes") -> Path:
+    clip = tmp_path / "2025.07.25" / "montages" / "clip.mp4"
+    clip.parent.mkdir(parents=True)
+    clip.write_bytes(payload)
+    return clip
+
+
+def test_rendered_clip_is_skipped_after_reload(tmp_path):
+    clip = _make_clip(tmp_path)
+    manifest_path = tmp_path / "manifest.json"
+
+    manifest = load_manifest(manifest_path)
+    assert needs_render(manifest, clip, SETTINGS, ASSETS)
+
+    record_render(manifest, clip, SETTINGS, ASSETS)
+    save_manifest(manifest, manifest_path)
+
+    reloaded = load_manifest(manifest_path)
+    assert not needs_render(reloaded, clip, SETTINGS, ASSETS)
+
+
+def test_touched_but_identical_clip_is_skipped(tmp_path):
+    clip = _make_clip(tmp_path)
+    manifest = load_manifest(tmp_path / "manifest.json")
+    record_render(manifest, clip, SETTINGS, ASSETS)
+
+    st = clip.stat()
+    os.utime(clip, ns=(st.st_atime_ns, st.st_mtime_ns + 5_000_000_000))
+
+    assert not needs_render(manifest, clip, SETTINGS, ASSETS)
+
+
+def test_changed_clip_or_settings_trigger_rerender(tmp_path):
+    clip = _make_clip(tmp_path)
+    manifest = load_manifest(tmp_path / "manifest.json")
+    record_render(manifest, clip, SETTINGS, ASSETS)
+
+    assert needs_render(manifest, clip, {**SETTINGS, "crf": 23}, ASSETS)
+    assert needs_render(manifest, clip, SETTINGS, {"intro_wide": "2:2"})
+
+    clip.write_bytes(b"re-exported montage with more bytes")
+    assert needs_render(manifest, clip, SETTINGS, ASSETS)
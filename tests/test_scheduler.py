@@ -0,0 +1,50 @@
+# tests/test_scheduler.py
+"""
+Unit tests for the parallel render scheduler.
+"""
+
+import threading
+from pathlib import Path
+
+from modules.scheduler import resolve_job_count, threads_per_job, run_render_batch
+
+
+def _flaky_worker(clip_path: Path, threads: int | None = None):
+    if "bad" in clip_path.name:
+        raise RuntimeError("ffmpeg exploded")
+
+
+# Held by the test while the pool starts; a forked child would inherit it locked
+_parent_lock = threading.Lock()
+
+
+def _locking_worker(clip_path: Path, threads: int | None = None):
+    if not _parent_lock.acquire(timeout=5):
+        raise RuntimeError("inherited a held lock")
+    _parent_lock.release()
+
+
+def test_thread_budget_splits_cores():
+    assert threads_per_job(jobs=4, cores=16) == 4
+    assert threads_per_job(jobs=3, cores=16) == 5
+    assert threads_per_job(jobs=32, cores=16) == 1
+
+
+def test_job_count_never_exceeds_clip_count():
+    assert resolve_job_count(8, clip_count=2) == 2
+    assert resolve_job_count(None, clip_count=5) >= 1
+
+
+def test_failures_are_isolated_per_clip():
+    clips = [Path("good-1.mp4"), Path("bad-2.mp4"), Path("good-3.mp4")]
+    results = run_render_batch(_flaky_worker, clips, jobs=1)
+
+    assert [r["ok"] for r in results] == [True, False, True]
+    assert "ffmpeg exploded" in results[1]["error"]
+
+
+def test_pool_workers_do_not_inherit_held_locks():
+    with _parent_lock:
+        results = run_render_batch(_locking_worker, [Path("a.mp4"), Path("b.mp4")], jobs=2)
+
+    assert [r["ok"] for r in results] == [True, True]
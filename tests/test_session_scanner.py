@@ -0,0 +1,63 @@
+# tests/test_session_scanner.py
+"""
+Unit tests for the shared scandir-based session scanner.
+"""
+
+import json
+
+from modules import session_scanner
+from modules.session_scanner import scan_sessions, get_snapshot
+from modules.metadata_utils import derive_session_metadata
+
+
+def _make_tree(root):
+    for session, category, name in (
+        ("2025.07.24", "montages", "m1.mp4"),
+        ("2025.07.25.2", "montages", "m2-vert.mp4"),
+        ("2025.07.25.2", "hits", "h1.mp4"),
+        ("2025.07.25.2", "hits", "notes.txt"),
+    ):
+        (root / session / category).mkdir(parents=True, exist_ok=True)
+        (root / session / category / name).write_bytes(b"x" * 10)
+    (root / "2025.07.25.2" / "notes.json").write_text(json.dumps({"highlight": "Victory"}))
+    (root / "assets").mkdir()
+
+
+def test_snapshot_lists_sessions_categories_and_clips(tmp_path):
+    _make_tree(tmp_path)
+
+    snapshot = scan_sessions(tmp_path, max_workers=4)
+
+    assert list(snapshot.sessions) == ["2025.07.24", "2025.07.25.2"]
+    session = snapshot.session("2025.07.25.2")
+    assert (session.session_date, session.session_number, session.has_notes) == ("2025-07-25", 2, True)
+    assert [clip.name for clip in snapshot.clips("montages")] == ["m1.mp4", "m2-vert.mp4"]
+    assert [clip.size for clip in snapshot.clips("hits")] == [10]
+    assert snapshot.stats["scandirs"] == 1 + 2 + 3  # root, two sessions, three category folders
+
+
+def test_consumers_share_one_snapshot(tmp_path, monkeypatch):
+    _make_tree(tmp_path)
+    session_scanner.invalidate_snapshots()
+    scans = []
+    real_scan = session_scanner.scan_sessions
+    monkeypatch.setattr(session_scanner, "scan_sessions", lambda root: scans.append(root) or real_scan(root))
+
+    get_snapshot(tmp_path)
+    get_snapshot(tmp_path)
+    metadata = derive_session_metadata(tmp_path / "2025.07.25.2")
+
+    assert len(scans) == 1
+    assert metadata["highlight"] == "Victory"
+    assert sorted(clip["filename"] for clip in metadata["clips"]) == ["h1.mp4", "m2-vert.mp4"]
+    session_scanner.invalidate_snapshots()
+
+
+def test_missing_session_folder_has_no_clips(tmp_path):
+    session_scanner.invalidate_snapshots()
+
+    session = session_scanner.find_session(tmp_path / "2025.08.01.3")
+    metadata = derive_session_metadata(tmp_path / "2025.08.01.3")
+
+    assert (session.session_date, session.session_number, session.categories) == ("2025-08-01", 3, {})
+    assert metadata["clips"] == []
@@ -0,0 +1,141 @@
+# tests/test_staging_cache.py
+"""
+Unit tests for the local staging cache.
+"""
+
+import os
+import time
+
+import pytest
+
+from modules.staging_cache import (
+    stage_file,
+    staged_inputs,
+    evict_staging_cache,
+    publish_output,
+    local_output_path,
+    discard_on_failure,
+    Prefetcher,
+)
+
+
+def _source(tmp_path, name, size):
+    path = tmp_path / "nas" / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(os.urandom(size))
+    return path
+
+
+def test_stage_copies_once_and_keeps_source_mtime(tmp_path):
+    source = _source(tmp_path, "montage.mp4", 5000)
+    staging = tmp_path / "staging"
+
+    local = stage_file(source, staging_dir=staging, buffer_size=1024)
+    assert local.read_bytes() == source.read_bytes()
+    assert local.stat().st_mtime_ns == source.stat().st_mtime_ns
+
+    copied_at = local.stat().st_ctime_ns
+    assert stage_file(source, staging_dir=staging) == local
+    assert local.stat().st_ctime_ns == copied_at  # reused, not re-copied
+
+
+def test_verify_restages_corrupt_copy(tmp_path):
+    source = _source(tmp_path, "montage.mp4", 4096)
+    staging = tmp_path / "staging"
+    local = stage_file(source, staging_dir=staging)
+    with open(local, "r+b") as f:
+        f.write(b"\0" * 16)
+
+    assert stage_file(source, staging_dir=staging, verify=True).read_bytes() == source.read_bytes()
+
+
+def test_lru_eviction_keeps_recently_used(tmp_path):
+    staging = tmp_path / "staging"
+    a, b, c = (_source(tmp_path, f"{n}.mp4", 1000) for n in "abc")
+    local_a = stage_file(a, staging_dir=staging)
+    time.sleep(0.02)
+    local_b = stage_file(b, staging_dir=staging)
+    time.sleep(0.02)
+    stage_file(a, staging_dir=staging)  # touch a: b is now least recently used
+    time.sleep(0.02)
+    stage_file(c, staging_dir=staging, max_bytes=2500)
+
+    assert local_a.exists()
+    assert not local_b.exists()
+
+
+def test_eviction_skips_inputs_of_running_renders(tmp_path):
+    staging = tmp_path / "staging"
+    a, b = (_source(tmp_path, f"{n}.mp4", 1000) for n in "ab")
+
+    with staged_inputs([a], staging_dir=staging) as [local_a]:
+        time.sleep(0.02)
+        local_b = stage_file(b, staging_dir=staging, max_bytes=1500)
+        assert local_a.exists()  # least recently used, but still being rendered
+
+    evict_staging_cache(staging, max_bytes=1500)
+    assert not local_a.exists()
+    assert local_b.exists()
+    assert not list(staging.glob("*.inuse"))
+
+
+def test_publish_moves_render_to_destination(tmp_path):
+    final = tmp_path / "nas" / "rendered" / "out.mp4"
+    local = local_output_path(final, staging_dir=tmp_path / "staging")
+    local.write_bytes(b"rendered")
+
+    publish_output(local, final)
+
+    assert final.read_bytes() == b"rendered"
+    assert not local.exists()
+    assert not final.with_name("out.mp4.part").exists()
+
+
+def test_failed_publish_leaves_no_part_file(tmp_path, monkeypatch):
+    final = tmp_path / "nas" / "rendered" / "out.mp4"
+    local = local_output_path(final, staging_dir=tmp_path / "staging")
+    local.write_bytes(b"rendered")
+
+    def broken_copy(src, dst, length=0):
+        dst.write(b"ren")
+        raise OSError("NAS went away")
+
+    monkeypatch.setattr("modules.staging_cache.shutil.copyfileobj", broken_copy)
+    with pytest.raises(OSError):
+        publish_output(local, final)
+
+    assert not final.exists()
+    assert not final.with_name("out.mp4.part").exists()
+
+
+def test_failed_render_discards_local_outputs(tmp_path):
+    staging = tmp_path / "staging"
+    local = local_output_path(tmp_path / "nas" / "out.mp4", staging_dir=staging)
+    other = local_output_path(tmp_path / "nas" / "other.mp4", staging_dir=staging)
+    other.write_bytes(b"kept")
+
+    with pytest.raises(RuntimeError):
+        with discard_on_failure(local):
+            local.write_bytes(b"partial")
+            local.with_name(f"{local.stem}-proxy.mp4").write_bytes(b"partial")
+            raise RuntimeError("ffmpeg failed")
+
+    assert sorted(p.name for p in (staging / "out").iterdir()) == [other.name]
+
+
+def test_prefetcher_stays_within_lookahead(tmp_path):
+    staging = tmp_path / "staging"
+    sources = [_source(tmp_path, f"{n}.mp4", 100) for n in range(4)]
+
+    prefetcher = Prefetcher(sources, lookahead=2, staging_dir=staging)
+    deadline = time.monotonic() + 5
+    while len(list(staging.glob("*.mp4.json"))) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.1)
+    assert len(list(staging.glob("*.mp4.json"))) == 2
+
+    prefetcher.done()
+    while len(list(staging.glob("*.mp4.json"))) < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(list(staging.glob("*.mp4.json"))) == 3
+    prefetcher.close()
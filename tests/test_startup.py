@@ -0,0 +1,60 @@
+# tests/test_startup.py
+"""
+Unit tests for asset verification state and stale derived-artifact cleanup.
+"""
+
+import os
+
+from modules import startup
+from modules.storage_root import invalidate
+from modules.mezzanine import prune_mezzanine, prepared_music, _music_path
+
+
+def test_check_asset_reuses_state_until_content_changes(tmp_path, monkeypatch):
+    font = tmp_path / "brand.otf"
+    font.write_bytes(b"font-v1")
+
+    entry, changed = startup.check_asset("FONT_PATH", font, None)
+    assert changed and entry["probe"] == {"bytes": 7}
+
+    # Unchanged size/mtime: the stored entry is reused without re-fingerprinting
+    monkeypatch.setattr("modules.render_manifest.fingerprint_file", lambda path: 1 / 0)
+    assert startup.check_asset("FONT_PATH", font, entry) == (entry, False)
+    monkeypatch.undo()
+
+    # Touched but identical bytes: re-verified, not reported as changed
+    os.utime(font, ns=(entry["mtime_ns"] + 10**9, entry["mtime_ns"] + 10**9))
+    invalidate(font)
+    touched, changed = startup.check_asset("FONT_PATH", font, entry)
+    assert not changed and touched["mtime_ns"] != entry["mtime_ns"]
+
+    font.write_bytes(b"font-v2!")
+    invalidate(font)
+    assert startup.check_asset("FONT_PATH", font, touched)[1]
+
+
+def test_asset_state_roundtrip(tmp_path):
+    state_path = tmp_path / "asset_state.json"
+    assert startup.load_asset_state(state_path)["assets"] == {}
+    state = {"version": startup.ASSET_STATE_VERSION, "assets": {"FONT_PATH": {"fingerprint": "abc"}}}
+    startup.save_asset_state(state, state_path)
+    assert startup.load_asset_state(state_path) == state
+
+
+def test_prune_mezzanine_removes_stale_derived_files(tmp_path):
+    music = tmp_path / "theme.mp3"
+    music.write_bytes(b"mp3")
+    mezzanine_dir = tmp_path / "mezzanine"
+    mezzanine_dir.mkdir()
+    current_music = _music_path(music, mezzanine_dir)
+    current_music.write_bytes(b"pcm")
+    stale = [mezzanine_dir / "intro_wide-final-0123456789abcdef.mp4", mezzanine_dir / "music-0000000000000000.wav"]
+    kept = [current_music, mezzanine_dir / "intro_wide-final-0123.abcd.tmp.mp4", mezzanine_dir / "notes.txt"]
+    for path in stale + kept[1:]:
+        path.write_bytes(b"x")
+
+    assert prune_mezzanine(mezzanine_dir, music_path=music) == 2
+    assert all(not path.exists() for path in stale)
+    assert all(path.exists() for path in kept)
+    assert prepared_music(music, mezzanine_dir) == current_music
+    assert prepared_music(music, tmp_path / "empty") == music
@@ -0,0 +1,29 @@
+# tests/test_startup_imports.py
+"""
+Render-only startup must not pull in the LLM or upload client libraries.
+"""
+
+import sys
+import json
+import subprocess
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+HEAVY_MODULES = ["openai", "googleapiclient", "google.auth", "requests", "PIL", "asyncio"]
+
+
+@pytest.mark.parametrize("module", ["main", "upload_youtube_montage", "modules"])
+def test_entry_point_imports_stay_light(module):
+    probe = f"import sys, json; import {module}; print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    result = subprocess.run([sys.executable, "-c", probe], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True)
+    assert json.loads(result.stdout.strip().splitlines()[-1]) == []
+
+
+def test_plan_and_watch_are_exclusive():
+    import main
+
+    assert main.parse_args(["--dry-run"]).plan
+    with pytest.raises(SystemExit):
+        main.parse_args(["--plan", "--watch"])
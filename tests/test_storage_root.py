@@ -0,0 +1,73 @@
+# tests/test_storage_root.py
+"""
+Unit tests for NAS root detection, path mapping and the cached stat layer.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from modules import storage_root
+
+
+@pytest.fixture(autouse=True)
+def reset_root():
+    yield
+    storage_root._root = None
+    storage_root._root_failed_at = None
+    storage_root.invalidate()
+
+
+def test_detect_root_skips_unreachable_candidates(tmp_path):
+    missing = tmp_path / "offline"
+    root = storage_root.detect_root([str(missing), str(tmp_path)], refresh=True, timeout=1)
+    assert root == tmp_path
+    # Detected once: later calls don't probe again
+    assert storage_root.detect_root([str(missing)]) == tmp_path
+
+
+def test_unreachable_root_is_probed_again(tmp_path, monkeypatch):
+    nas = tmp_path / "nas"
+    assert storage_root.detect_root([str(nas)], refresh=True, timeout=1) == Path(storage_root.NAS_MOUNT_ROOT)
+    nas.mkdir()
+    # Still within the retry window: the failure is reused
+    assert storage_root.detect_root([str(nas)]) != nas
+    monkeypatch.setattr(storage_root, "UNREACHABLE_RETRY_SECONDS", 0)
+    assert storage_root.detect_root([str(nas)]) == nas
+
+
+def test_map_path_onto_detected_root(tmp_path):
+    storage_root.detect_root([str(tmp_path)], refresh=True)
+    assert storage_root.map_path("Z:/assets/intro.mp4") == tmp_path / "assets" / "intro.mp4"
+    assert storage_root.map_path("Z:\\assets\\intro.mp4") == tmp_path / "assets" / "intro.mp4"
+    assert storage_root.map_path("//chong/LCS/Videos/eklipse/2024.01.01") == tmp_path / "2024.01.01"
+    assert storage_root.map_path(tmp_path / "local.mp4") == tmp_path / "local.mp4"
+
+
+def test_cached_stat_until_invalidated(tmp_path):
+    path = tmp_path / "clip.mp4"
+    assert not storage_root.exists(path)
+    path.write_bytes(b"x")
+    # Negative result is still cached
+    assert not storage_root.exists(path)
+    storage_root.invalidate(path)
+    assert storage_root.is_file(path)
+    assert storage_root.cached_stat(path, ttl=0).st_size == 1
+
+
+def test_resolve_raises_for_missing(tmp_path):
+    storage_root.detect_root([str(tmp_path)], refresh=True)
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "assets" / "logo.png").write_bytes(b"png")
+    assert storage_root.resolve("Z:/assets/logo.png") == tmp_path / "assets" / "logo.png"
+    with pytest.raises(FileNotFoundError):
+        storage_root.resolve("Z:/assets/missing.png")
+
+
+def test_health_check(tmp_path):
+    (tmp_path / "2024.01.01").mkdir()
+    health = storage_root.health_check(tmp_path, samples=2)
+    assert health["reachable"]
+    assert health["entries"] == 1
+    assert health["stat_ms"] >= 0 and health["list_ms"] >= 0
+    assert not storage_root.health_check(tmp_path / "offline")["reachable"]
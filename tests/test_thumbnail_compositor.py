@@ -0,0 +1,28 @@
+# tests/test_thumbnail_compositor.py
+"""
+Unit tests for the in-process branded thumbnail compositor.
+"""
+
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+
+from modules import thumbnail_compositor
+from modules.thumbnail_compositor import compose_session_thumbnails, WIDE_SIZE, VERTICAL_SIZE
+
+
+def test_session_batch_reuses_cached_layers(tmp_path):
+    thumbnail_compositor.text_layer.cache_clear()
+    items = [
+        {"frame": Image.new("RGB", (1920, 1080), "navy"), "output_path": tmp_path / "a.jpg", "date_str": "July 25, 2025"},
+        {"frame": Image.new("RGB", (1920, 1080), "teal"), "output_path": tmp_path / "b.jpg", "date_str": "July 25, 2025"},
+        {"frame": Image.new("RGB", (1080, 1920), "gray"), "output_path": tmp_path / "c.jpg", "date_str": "July 25, 2025"},
+    ]
+
+    outputs = compose_session_thumbnails(items)
+
+    with Image.open(outputs[0]) as wide, Image.open(outputs[2]) as vertical:
+        assert wide.size == WIDE_SIZE
+        assert vertical.size == VERTICAL_SIZE
+    info = thumbnail_compositor.text_layer.cache_info()
+    assert (info.misses, info.hits) == (2, 1)
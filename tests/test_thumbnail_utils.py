@@ -0,0 +1,30 @@
+# tests/test_thumbnail_utils.py
+"""
+Unit tests for the fast thumbnail picker's sampling and ranking.
+"""
+
+import pytest
+
+from modules.thumbnail_utils import candidate_times, rank_scores, thumbnail_size
+
+
+def test_candidates_skip_intro_and_outro():
+    times = candidate_times(100.0, 5)
+    assert times[0] == pytest.approx(10.0)
+    assert times[-1] == pytest.approx(90.0)
+    assert len(times) == 5
+
+
+def test_ranking_prefers_sharp_frames_and_rejects_black_ones():
+    scores = [
+        {"sharpness": 10.0, "contrast": 40.0, "brand": 0.0, "brightness": 120.0},
+        {"sharpness": 90.0, "contrast": 45.0, "brand": 0.05, "brightness": 110.0},
+        {"sharpness": 100.0, "contrast": 50.0, "brand": 0.1, "brightness": 5.0},
+    ]
+    ranked = rank_scores(scores)
+    assert max(range(3), key=ranked.__getitem__) == 1
+
+
+def test_vertical_thumbnails_keep_portrait_aspect():
+    assert thumbnail_size(is_vertical=True) == (720, 1280)
+    assert thumbnail_size(is_vertical=False) == (1280, 720)
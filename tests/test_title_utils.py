@@ -0,0 +1,27 @@
+# tests/test_title_utils.py
+"""
+Unit tests for the title overlay filter shared by the intro encodes and the single-pass graph.
+"""
+
+from pathlib import Path
+
+from modules.title_utils import build_title_filter, TITLE_INTRO_SECONDS, TITLE_FADE_DURATION
+
+
+def test_one_drawtext_per_line_then_fade():
+    chain = build_title_filter(["Fortnite Highlights", "with Gramps", "July 1, 2025"], Path("fonts/font.ttf"))
+    filters = chain.split(",drawtext=")
+
+    assert chain.startswith("drawtext=text='Fortnite Highlights':")
+    assert len(filters) == 3
+    assert "y=(h/2)-90+80:" in filters[1]
+    assert "y=(h/2)-90+160:" in filters[2]
+    assert chain.endswith(f"fade=t=out:st={TITLE_INTRO_SECONDS - TITLE_FADE_DURATION}:d={TITLE_FADE_DURATION}:alpha=1")
+
+
+def test_fade_timing_and_windows_font_path():
+    chain = build_title_filter(["Title"], "C:\\Fonts\\font.ttf", fade_start=2.5, fade_duration=1.0)
+
+    assert "fontfile='C:\\\\Fonts\\\\font.ttf'" in chain
+    assert chain.endswith("fade=t=out:st=2.5:d=1.0:alpha=1")
+    assert chain.count("drawtext=") == 1
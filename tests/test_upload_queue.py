@@ -0,0 +1,105 @@
+# tests/test_upload_queue.py
+"""
+Unit tests for the durable upload queue, using fake uploaders.
+"""
+
+import threading
+
+from modules.upload_queue import UploadQueue, drain
+
+
+def test_drain_uploads_each_platform_in_parallel(tmp_path):
+    queue = UploadQueue(tmp_path / "queue.sqlite3")
+    queue.enqueue(tmp_path / "wide.mp4", {"title": "t", "description": "d", "is_vertical": False})
+    queue.enqueue(tmp_path / "short.mp4", {"title": "t", "description": "d", "is_vertical": True})
+    both_running = threading.Barrier(2, timeout=5)
+
+    def youtube(path, metadata):
+        if path.name == "wide.mp4":
+            both_running.wait()  # only returns if PeerTube is uploading at the same time
+        return f"https://youtu.be/{path.stem}"
+
+    def peertube(path, metadata):
+        both_running.wait()
+        return f"https://peertube.example/{path.stem}"
+
+    stats = drain(queue, uploaders={"youtube": youtube, "peertube": peertube}, concurrency={"youtube": 1})
+
+    assert stats == {"youtube": {"done": 2, "failed": 0}, "peertube": {"done": 1, "failed": 0}}
+    assert queue.urls_for(tmp_path / "wide.mp4") == {
+        "youtube": "https://youtu.be/wide",
+        "peertube": "https://peertube.example/wide",
+    }
+    assert queue.urls_for(tmp_path / "short.mp4") == {"youtube": "https://youtu.be/short"}
+
+
+def test_failed_jobs_retry_until_max_attempts(tmp_path):
+    queue = UploadQueue(tmp_path / "queue.sqlite3", max_attempts=2)
+    queue.enqueue(tmp_path / "clip.mp4", {"title": "t", "description": "d"}, platforms=["youtube"])
+
+    def broken(path, metadata):
+        raise ConnectionError("quota exceeded")
+
+    assert drain(queue, uploaders={"youtube": broken})["youtube"]["failed"] == 2
+    [job] = queue.jobs()
+    assert (job["state"], job["attempts"]) == ("failed", 2)
+    assert "quota exceeded" in job["error"]
+
+
+def test_running_jobs_are_recovered_after_restart(tmp_path):
+    db_path = tmp_path / "queue.sqlite3"
+    crashed = UploadQueue(db_path, lease_seconds=0)
+    crashed.enqueue(tmp_path / "clip.mp4", {"title": "t", "description": "d"}, platforms=["youtube"])
+    assert crashed.claim("youtube") is not None  # process dies mid-upload, its lease runs out
+
+    restarted = UploadQueue(db_path)
+    stats = drain(restarted, uploaders={"youtube": lambda path, metadata: "https://youtu.be/clip"})
+
+    assert stats["youtube"]["done"] == 1
+    assert restarted.jobs()[0]["state"] == "done"
+
+
+def test_drain_leaves_leased_and_unrelated_jobs_alone(tmp_path):
+    queue = UploadQueue(tmp_path / "queue.sqlite3")
+    queue.enqueue(tmp_path / "busy.mp4", {"title": "t", "description": "d"}, platforms=["youtube"])
+    queue.enqueue(tmp_path / "other.mp4", {"title": "t", "description": "d"}, platforms=["youtube"])
+    queue.enqueue(tmp_path / "mine.mp4", {"title": "t", "description": "d"}, platforms=["youtube"])
+    assert queue.claim("youtube")["video_path"] == str(tmp_path / "busy.mp4")  # another drain is uploading it
+    mine = [job["id"] for job in queue.jobs(video_path=tmp_path / "mine.mp4")]
+
+    uploaded = []
+
+    def youtube(path, metadata):
+        uploaded.append(path.name)
+        return f"https://youtu.be/{path.stem}"
+
+    drain(queue, uploaders={"youtube": youtube}, job_ids=mine)
+
+    assert uploaded == ["mine.mp4"]
+    assert [job["state"] for job in queue.jobs()] == ["running", "pending", "done"]
+    assert [job["state"] for job in queue.wait_for(mine, poll_interval=0)] == ["done"]
+
+
+def test_queued_archive_record_is_saved_with_each_url(tmp_path, monkeypatch):
+    import modules.metadata_utils as metadata_utils
+
+    saved = []
+    monkeypatch.setattr(metadata_utils, "save_metadata_record", saved.append)
+    queue = UploadQueue(tmp_path / "queue.sqlite3")
+    archive = {"session_date": "2025-07-01", "filename": "wide.mp4", "youtube_urls": [], "peertube_urls": []}
+    queue.enqueue(tmp_path / "wide.mp4", {"title": "t", "description": "d", "archive": archive})
+    seen = []
+
+    def uploader(platform):
+        def upload(path, metadata):
+            seen.append(metadata)
+            return f"https://{platform}.example/{path.stem}"
+        return upload
+
+    drain(queue, uploaders={"youtube": uploader("youtube"), "peertube": uploader("peertube")})
+
+    assert all("archive" not in metadata for metadata in seen)
+    assert sorted((record["youtube_urls"], record["peertube_urls"]) for record in saved) == [
+        ([], ["https://peertube.example/wide"]),
+        (["https://youtube.example/wide"], []),
+    ]
@@ -0,0 +1,85 @@
+# tests/test_yt_poster.py
+"""
+Unit tests for the chunked, resumable YouTube upload loop.
+"""
+
+import pytest
+
+pytest.importorskip("googleapiclient")
+httplib2 = pytest.importorskip("httplib2")
+
+from googleapiclient.errors import HttpError
+
+from modules import yt_poster, metrics
+from modules.yt_poster import upload_resumable, _session_path, _load_session_uri
+
+
+class FakeRequest:
+    """Mimics HttpRequest.next_chunk for a file uploaded in fixed chunks."""
+
+    def __init__(self, total, chunk, fail_at=()):
+        self.total = total
+        self.chunk = chunk
+        self.fail_at = list(fail_at)
+        self.resumable_uri = None
+        self.resumable_progress = 0
+        self._in_error_state = False
+        self.calls = 0
+
+    def next_chunk(self, num_retries=0):
+        self.calls += 1
+        if self.fail_at and self.fail_at[0] == self.calls:
+            self.fail_at.pop(0)
+            raise HttpError(httplib2.Response({"status": 503}), b"backend error")
+        self.resumable_uri = self.resumable_uri or "https://upload.example/session/1"
+        self.resumable_progress = min(self.resumable_progress + self.chunk, self.total)
+        if self.resumable_progress >= self.total:
+            return None, {"id": "abc123"}
+        return object(), None
+
+
+@pytest.fixture(autouse=True)
+def quiet(tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics, "METRICS_LOG_PATH", tmp_path / "metrics.jsonl")
+    monkeypatch.setattr(yt_poster.time, "sleep", lambda _: None)
+
+
+def test_upload_retries_5xx_and_clears_session(tmp_path):
+    video = tmp_path / "clip.mp4"
+    video.write_bytes(b"x" * 1000)
+    request = FakeRequest(total=1000, chunk=256, fail_at=[2])
+
+    response = upload_resumable(request, video, session_dir=tmp_path / "sessions")
+
+    assert response == {"id": "abc123"}
+    assert request.calls == 5
+    assert not _session_path(video, tmp_path / "sessions").exists()
+
+
+def test_upload_resumes_from_persisted_session(tmp_path):
+    video = tmp_path / "clip.mp4"
+    video.write_bytes(b"x" * 1000)
+    sessions = tmp_path / "sessions"
+
+    crashing = FakeRequest(total=1000, chunk=256, fail_at=[3, 4, 5])
+    with pytest.raises(HttpError):
+        upload_resumable(crashing, video, session_dir=sessions, max_retries=2)
+    assert _load_session_uri(_session_path(video, sessions)) == "https://upload.example/session/1"
+
+    resumed = FakeRequest(total=1000, chunk=256)
+    upload_resumable(resumed, video, session_dir=sessions)
+    assert resumed._in_error_state is True  # asked the server for its offset first
+
+
+def test_each_thread_gets_its_own_service(monkeypatch):
+    import threading
+
+    monkeypatch.setattr(yt_poster, "_thread_services", threading.local())
+    monkeypatch.setattr(yt_poster, "get_authenticated_service", object)
+    services = []
+    worker = threading.Thread(target=lambda: services.append(yt_poster.get_thread_service()))
+    worker.start()
+    worker.join()
+
+    assert yt_poster.get_thread_service() is yt_poster.get_thread_service()
+    assert services[0] is not yt_poster.get_thread_service()
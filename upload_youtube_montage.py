@@ -17,27 +17,32 @@ Created: 2025-07-22
 
 import os
 import sys
+import argparse
 from pathlib import Path
 
 from modules.config import DEBUG
-from modules.yt_poster import upload_video
-from modules.description_utils import generate_montage_description
-from authorize_youtube import get_authenticated_service
 
 
-def main():
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Upload a rendered Fortnite montage video to YouTube.")
+    parser.add_argument("video_path", type=Path, help="Path to the rendered video")
+    parser.add_argument(
+        "--dry-run", action="store_true",
+        help="Show what would be uploaded without loading the OpenAI or YouTube clients"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     """
     Entry point to handle YouTube upload of montage video.
     Usage:
-        python upload_montage_youtube.py <video_path>
+        python upload_montage_youtube.py <video_path> [--dry-run]
     """
-
-    if len(sys.argv) != 2:
-        print("Usage: python upload_montage_youtube.py <path_to_rendered_video>")
-        sys.exit(1)
+    args = parse_args(argv)
 
     # Extract stream date from parent directory (Z:\2025.06.20)
-    video_path = Path(sys.argv[1])
+    video_path = args.video_path
     stream_date = video_path.parents[1].name  # '2025.06.20'
 
     if not os.path.isfile(video_path):
@@ -47,6 +52,15 @@ def main():
     video_name = os.path.basename(video_path)
     is_vertical = "-vert" in video_path.stem or "-vertical" in video_path.stem
 
+    if args.dry_run:
+        print(f"📝 Would upload {video_name} ({'vertical' if is_vertical else 'wide'}, "
+              f"stream {stream_date}, {'private' if DEBUG else 'public'})")
+        return
+
+    # Network clients are only loaded for a real upload
+    from modules.yt_poster import upload_video
+    from modules.description_utils import generate_montage_description
+
     # Generate a dynamic, humorous montage description
     description = generate_montage_description()
 